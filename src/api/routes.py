@@ -1,12 +1,22 @@
 """API route handlers"""
 from fastapi import HTTPException, APIRouter
-from typing import Dict, Any, Callable
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import Dict, Any, Callable, Optional
 from datetime import datetime
+import asyncio
+import json
+import math
 import os
 
-from models import QueryRequest, QueryResponse, HealthResponse
-from services import QueryRouter, QueryProcessor, DataQueryEngine
-from database import MongoDBCache
+from models import QueryRequest, QueryResponse, HealthResponse, BatchQueryRequest, BatchQueryResponse
+from services import (
+    QueryRouter, QueryProcessor, DataQueryEngine, SingleFlight, SnapshotManager,
+    response_cache, product_catalog, http_client, circuit_breakers
+)
+from database import (
+    MongoDBCache, data_result_cache, historical_rainfall_store, daily_rainfall_store, apeda_production_store
+)
 from config.settings import settings
 
 # Try to import LangGraph agent
@@ -19,7 +29,39 @@ except ImportError as e:
     print(f"⚠️ LangGraph Agent not available: {e}")
 
 
-def create_routes(app, data_cache: dict, mongodb_cache: MongoDBCache, get_query_engine: Callable):
+def json_safe(value: Any) -> Any:
+    """NaN and infinities become null (json.dumps would write bare NaN, which JSON.parse rejects)"""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {key: json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_safe(item) for item in value]
+    return value
+
+
+def incomplete_sources(results: dict) -> list:
+    """Sources of an execute_query result that timed out or failed"""
+    timings = results.get('metadata', {}).get('source_timings', {})
+    return [name for name, timing in timings.items() if timing['status'] != 'ok']
+
+
+def empty_sources(results: dict) -> list:
+    """Sources of an execute_query result that came back with no result entries
+    
+    The handlers catch their own upstream failures and return [], so an outage
+    looks like an 'ok' source with nothing in it.
+    """
+    timings = results.get('metadata', {}).get('source_timings', {})
+    return [name for name in timings if not results.get(name)]
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Encode one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(json_safe(data), default=str, allow_nan=False)}\n\n"
+
+
+def create_routes(app, snapshots: SnapshotManager, mongodb_cache: MongoDBCache, get_query_engine: Callable):
     """Create and configure all API routes"""
     
     router = APIRouter()
@@ -33,6 +75,164 @@ def create_routes(app, data_cache: dict, mongodb_cache: MongoDBCache, get_query_
         except Exception as e:
             print(f"⚠️ Failed to initialize LangGraph Agent: {e}")
     
+    def format_cached_response(question: str, cached: dict) -> dict:
+        """Build the response payload from a cache entry"""
+        # Ensure data_sources is list of dicts
+        cached_sources = cached.get('data_sources', [])
+        if cached_sources and isinstance(cached_sources[0], str):
+            # Convert old format (list of strings) to new format (list of dicts)
+            cached_sources = [{"name": src, "type": "cached"} for src in cached_sources]
+        
+        return {
+            'question': question,
+            'answer': cached['answer'],
+            'data_sources': cached_sources,
+            'query_params': cached['query_params'],
+            'raw_results': cached.get('raw_results', {})
+        }
+    
+    # Identical questions that arrive while the first is still being answered
+    # wait for that answer instead of running the agent again
+    single_flight = SingleFlight()
+    
+    async def fetch_data(params: dict) -> tuple:
+        """
+        execute_query through the params-level data cache: a reworded question that
+        routes to the same params reuses the fetched results. Partial results (a
+        source timed out, failed or returned nothing) are not stored, so an
+        upstream outage is not served as "no data" for the whole CACHE_TTL.
+        """
+        # Version before engine: a refresh in between only stores newer data under the older key
+        version = snapshots.current.version if snapshots.current else None
+        query_engine = get_query_engine()
+        data_key = data_result_cache.query_key(params, version)
+        
+        cached = data_result_cache.get(data_key)
+        if cached is not None:
+            results, sources = cached
+            print(f"⚡ DATA CACHE HIT (key: {data_key[:12]}...), skipping data fetch")
+            if 'metadata' in results:
+                results = {**results, 'metadata': {**results['metadata'], 'data_cache_hit': True}}
+            return results, sources
+        
+        results, sources = await run_in_threadpool(query_engine.execute_query, params)
+        if not incomplete_sources(results) and not empty_sources(results):
+            ttl = data_result_cache.ttl_seconds(params.get('data_needed') or [])
+            data_result_cache.set(data_key, (results, sources), ttl)
+        return results, sources
+    
+    async def finalize_agent_result(question: str, query_hash: str, result: dict) -> dict:
+        """Format an agent result for the response model and cache it"""
+        answer = result.get('answer', 'No answer generated')
+        sources = result.get('sources_used', [])
+        reasoning_steps = result.get('reasoning_steps', 0)
+        
+        print(f"✅ Agent completed in {reasoning_steps} steps")
+        print(f"✅ Sources used: {sources}")
+        
+        # Format sources as list of dicts for response model
+        formatted_sources = [
+            {"name": src, "type": "agent_tool"}
+            for src in sources
+        ] if sources else [{"name": "LangGraph Agent", "type": "agent"}]
+        
+        # Format for frontend compatibility
+        query_params = {
+            'agent_mode': True,
+            'tools_used': sources,
+            'reasoning_steps': reasoning_steps
+        }
+        
+        # Cache the response (only if not an error)
+        if not ("error" in answer.lower() or "please try again" in answer.lower()):
+            print("\n💾 CACHING RESPONSE...")
+            await mongodb_cache.cache_response(
+                query_hash, 
+                question, 
+                query_params, 
+                answer, 
+                formatted_sources,  # Cache formatted sources
+                {'agent_result': True}
+            )
+        else:
+            print("\n⚠️ SKIPPING CACHE: Error response detected")
+        
+        return {
+            'question': question,
+            'answer': answer,
+            'data_sources': formatted_sources,  # Use formatted sources
+            'query_params': query_params,
+            'raw_results': {'agent_mode': True, 'reasoning_steps': reasoning_steps}
+        }
+    
+    async def compute_answer(question: str, query_hash: str, api_key: Optional[str]) -> dict:
+        """
+        Answer an uncached question and store the answer in the cache.
+        Uses the LangGraph agent, falling back to the two-model architecture.
+        """
+        # Try LangGraph Agent first (has web search capability)
+        if langgraph_agent is not None:
+            print("\n🤖 USING LANGGRAPH AGENTIC WORKFLOW...")
+            try:
+                result = await langgraph_agent.aquery(question)
+                return await finalize_agent_result(question, query_hash, result)
+            
+            except Exception as agent_error:
+                print(f"⚠️ LangGraph Agent failed: {agent_error}")
+                print("⚠️ Falling back to two-model architecture...")
+        
+        return await compute_two_model_answer(question, query_hash, api_key)
+    
+    async def compute_two_model_answer(question: str, query_hash: str, api_key: Optional[str]) -> dict:
+        """Answer with the original two-model architecture (router + answer model) and cache it"""
+        print("\n🔀 USING TWO-MODEL ARCHITECTURE (fallback)...")
+        
+        # Get API keys
+        routing_api_key = settings.GEMINI_ROUTING_KEY
+        answer_api_key = api_key or settings.GEMINI_API_KEY
+        
+        if not routing_api_key or not answer_api_key:
+            raise HTTPException(
+                status_code=400, 
+                detail="Gemini API keys required. Set SECRET_KEY and API_GUESSING_MODELKEY in .env file."
+            )
+        
+        # STEP 1: Route the query
+        print("\n🔀 STEP 1: ROUTING QUERY TO CORRECT APIs...")
+        # The two-model path uses blocking SDK calls, so keep them off the event loop
+        router_model = QueryRouter(routing_api_key)
+        params = await run_in_threadpool(router_model.route_query, question)
+        print(f"✅ Routing complete. APIs to use: {params.get('data_needed', [])}")
+        
+        # STEP 2: Execute query on data
+        print("\n📊 STEP 2: FETCHING DATA FROM APIs...")
+        results, sources = await fetch_data(params)
+        print(f"✅ Data fetched. Results size: {len(str(results))} chars, Sources: {len(sources)}")
+        
+        # STEP 3: Generate natural language answer
+        print("\n💡 STEP 3: GENERATING NATURAL LANGUAGE ANSWER...")
+        processor = QueryProcessor(answer_api_key)
+        answer = await run_in_threadpool(processor.generate_answer, question, results, sources)
+        print(f"✅ Answer generated: {answer[:100]}...")
+        
+        # STEP 4: Cache the response (only if not an error and every source answered)
+        incomplete = incomplete_sources(results)
+        if incomplete:
+            print(f"\n⚠️ SKIPPING CACHE: Partial results (timed out or failed: {', '.join(incomplete)})")
+        elif not ("error" in answer.lower() or "please try again" in answer.lower()):
+            print("\n💾 STEP 4: CACHING RESPONSE FOR FUTURE USE...")
+            await mongodb_cache.cache_response(query_hash, question, params, answer, sources, results)
+        else:
+            print("\n⚠️ SKIPPING CACHE: Error response detected")
+        
+        return {
+            'question': question,
+            'answer': answer,
+            'data_sources': sources,
+            'query_params': params,
+            'raw_results': results
+        }
+    
     @router.post("/api/query", response_model=QueryResponse)
     async def process_query(request: QueryRequest):
         """
@@ -56,119 +256,16 @@ def create_routes(app, data_cache: dict, mongodb_cache: MongoDBCache, get_query_
             cached = await mongodb_cache.get_cached_response(query_hash)
             if cached:
                 print(f"⚡ RETURNING CACHED RESPONSE (saved ~3-4 seconds!)")
-                # Ensure data_sources is list of dicts
-                cached_sources = cached.get('data_sources', [])
-                if cached_sources and isinstance(cached_sources[0], str):
-                    # Convert old format (list of strings) to new format (list of dicts)
-                    cached_sources = [{"name": src, "type": "cached"} for src in cached_sources]
-                
-                return {
-                    'question': request.question,
-                    'answer': cached['answer'],
-                    'data_sources': cached_sources,
-                    'query_params': cached['query_params'],
-                    'raw_results': cached.get('raw_results', {})
-                }
+                return format_cached_response(request.question, cached)
             
             print(f"❌ Cache miss. Processing query...")
             
-            # Try LangGraph Agent first (has web search capability)
-            if langgraph_agent is not None:
-                print("\n🤖 USING LANGGRAPH AGENTIC WORKFLOW...")
-                try:
-                    result = langgraph_agent.query(request.question)
-                    
-                    answer = result.get('answer', 'No answer generated')
-                    sources = result.get('sources_used', [])
-                    reasoning_steps = result.get('reasoning_steps', 0)
-                    
-                    print(f"✅ Agent completed in {reasoning_steps} steps")
-                    print(f"✅ Sources used: {sources}")
-                    
-                    # Format sources as list of dicts for response model
-                    formatted_sources = [
-                        {"name": src, "type": "agent_tool"}
-                        for src in sources
-                    ] if sources else [{"name": "LangGraph Agent", "type": "agent"}]
-                    
-                    # Format for frontend compatibility
-                    query_params = {
-                        'agent_mode': True,
-                        'tools_used': sources,
-                        'reasoning_steps': reasoning_steps
-                    }
-                    
-                    # Cache the response (only if not an error)
-                    if not ("error" in answer.lower() or "please try again" in answer.lower()):
-                        print("\n💾 CACHING RESPONSE...")
-                        await mongodb_cache.cache_response(
-                            query_hash, 
-                            request.question, 
-                            query_params, 
-                            answer, 
-                            formatted_sources,  # Cache formatted sources
-                            {'agent_result': True}
-                        )
-                    else:
-                        print("\n⚠️ SKIPPING CACHE: Error response detected")
-                    
-                    return {
-                        'question': request.question,
-                        'answer': answer,
-                        'data_sources': formatted_sources,  # Use formatted sources
-                        'query_params': query_params,
-                        'raw_results': {'agent_mode': True, 'reasoning_steps': reasoning_steps}
-                    }
-                    
-                except Exception as agent_error:
-                    print(f"⚠️ LangGraph Agent failed: {agent_error}")
-                    print("⚠️ Falling back to two-model architecture...")
-            
-            # Fallback to original two-model architecture
-            print("\n🔀 USING TWO-MODEL ARCHITECTURE (fallback)...")
-            
-            # Get API keys
-            routing_api_key = settings.GEMINI_ROUTING_KEY
-            answer_api_key = request.api_key or settings.GEMINI_API_KEY
-            
-            if not routing_api_key or not answer_api_key:
-                raise HTTPException(
-                    status_code=400, 
-                    detail="Gemini API keys required. Set SECRET_KEY and API_GUESSING_MODELKEY in .env file."
-                )
-            
-            # STEP 1: Route the query
-            print("\n🔀 STEP 1: ROUTING QUERY TO CORRECT APIs...")
-            router_model = QueryRouter(routing_api_key)
-            params = router_model.route_query(request.question)
-            print(f"✅ Routing complete. APIs to use: {params.get('data_needed', [])}")
-            
-            # STEP 2: Execute query on data
-            print("\n📊 STEP 2: FETCHING DATA FROM APIs...")
-            query_engine = get_query_engine()
-            results, sources = query_engine.execute_query(params)
-            print(f"✅ Data fetched. Results size: {len(str(results))} chars, Sources: {len(sources)}")
-            
-            # STEP 3: Generate natural language answer
-            print("\n💡 STEP 3: GENERATING NATURAL LANGUAGE ANSWER...")
-            processor = QueryProcessor(answer_api_key)
-            answer = processor.generate_answer(request.question, results, sources)
-            print(f"✅ Answer generated: {answer[:100]}...")
-            
-            # STEP 4: Cache the response (only if not an error)
-            if not ("error" in answer.lower() or "please try again" in answer.lower()):
-                print("\n💾 STEP 4: CACHING RESPONSE FOR FUTURE USE...")
-                await mongodb_cache.cache_response(query_hash, request.question, params, answer, sources, results)
-            else:
-                print("\n⚠️ SKIPPING CACHE: Error response detected")
-            
-            return {
-                'question': request.question,
-                'answer': answer,
-                'data_sources': sources,
-                'query_params': params,
-                'raw_results': results
-            }
+            result = await single_flight.do(
+                query_hash,
+                lambda: compute_answer(request.question, query_hash, request.api_key)
+            )
+            # Coalesced callers share the leader's result but keep their own wording
+            return {**result, 'question': request.question}
             
         except HTTPException:
             raise
@@ -178,6 +275,150 @@ def create_routes(app, data_cache: dict, mongodb_cache: MongoDBCache, get_query_
             traceback.print_exc()
             raise HTTPException(status_code=500, detail=str(e))
     
+    @router.post("/api/query/batch", response_model=BatchQueryResponse)
+    async def process_batch(request: BatchQueryRequest):
+        """
+        Answer a list of questions in one call.
+        Cached answers come from a single bulk lookup; the misses go through the
+        agent with bounded concurrency. Each item carries its own status, so one
+        failing question does not fail the batch. Results keep request order.
+        """
+        if len(request.questions) > settings.BATCH_MAX_QUESTIONS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Too many questions: {len(request.questions)} (max {settings.BATCH_MAX_QUESTIONS})"
+            )
+        
+        print(f"\n{'='*60}")
+        print(f"DEBUG: BATCH OF {len(request.questions)} QUESTIONS RECEIVED")
+        print(f"{'='*60}\n")
+        
+        query_hashes = [mongodb_cache.generate_cache_key(q) for q in request.questions]
+        cached_entries = await mongodb_cache.get_cached_responses(query_hashes)
+        
+        concurrency = min(request.max_concurrency or settings.BATCH_MAX_CONCURRENCY,
+                          settings.BATCH_MAX_CONCURRENCY)
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def bounded_compute(question: str, query_hash: str) -> dict:
+            # Acquired only by the single-flight leader, so duplicates don't hold slots
+            async with semaphore:
+                return await compute_answer(question, query_hash, request.api_key)
+        
+        async def answer_item(index: int, question: str, query_hash: str) -> dict:
+            item = {'index': index, 'question': question}
+            
+            if not question or not question.strip():
+                return {**item, 'status': 'error', 'error': 'No question provided'}
+            
+            if query_hash in cached_entries:
+                response = format_cached_response(question, cached_entries[query_hash])
+                return {**response, **item, 'status': 'cached'}
+            
+            try:
+                result = await single_flight.do(query_hash, lambda: bounded_compute(question, query_hash))
+                return {**result, **item, 'status': 'ok'}
+            except HTTPException as e:
+                return {**item, 'status': 'error', 'error': str(e.detail)}
+            except Exception as e:
+                print(f"DEBUG: Batch item {index} failed: {e}")
+                return {**item, 'status': 'error', 'error': str(e)}
+        
+        results = await asyncio.gather(*[
+            answer_item(index, question, query_hash)
+            for index, (question, query_hash) in enumerate(zip(request.questions, query_hashes))
+        ])
+        
+        statuses = [item['status'] for item in results]
+        print(f"✅ Batch done: {statuses.count('cached')} cached, {statuses.count('ok')} answered, "
+              f"{statuses.count('error')} failed")
+        
+        return {
+            'total': len(results),
+            'cached': statuses.count('cached'),
+            'succeeded': statuses.count('cached') + statuses.count('ok'),
+            'failed': statuses.count('error'),
+            'results': results
+        }
+    
+    @router.post("/api/query/stream")
+    async def stream_query(request: QueryRequest):
+        """
+        Server-sent-events variant of /api/query.
+        Streams agent progress (steps, tool calls, sources) and then the answer
+        token by token; the final 'done' event carries the full QueryResponse.
+        If the agent fails mid-stream a 'fallback' event is sent and the
+        two-model answer follows in one token.
+        """
+        if not request.question:
+            raise HTTPException(status_code=400, detail="No question provided")
+        
+        query_hash = mongodb_cache.generate_cache_key(request.question)
+        
+        async def event_stream():
+            yield format_sse("start", {"question": request.question})
+            
+            try:
+                cached = await mongodb_cache.get_cached_response(query_hash)
+                if cached:
+                    print(f"⚡ STREAMING CACHED RESPONSE (key: {query_hash[:12]}...)")
+                    response = format_cached_response(request.question, cached)
+                    yield format_sse("sources", {"sources": response['data_sources']})
+                    yield format_sse("token", {"text": response['answer']})
+                    yield format_sse("done", {**response, "cached": True})
+                    return
+                
+                if langgraph_agent is None:
+                    # No agent to stream from: answer in one piece via the two-model path
+                    result = await single_flight.do(
+                        query_hash,
+                        lambda: compute_answer(request.question, query_hash, request.api_key)
+                    )
+                    yield format_sse("token", {"text": result['answer']})
+                    yield format_sse("done", {**result, 'question': request.question, "cached": False})
+                    return
+                
+                print(f"\n📡 STREAMING AGENT ANSWER: {request.question}")
+                result = None
+                try:
+                    async for event, data in langgraph_agent.astream(request.question):
+                        if event == "done":
+                            result = data
+                        else:
+                            yield format_sse(event, data)
+                    if result is None:
+                        raise RuntimeError("agent stream ended without a result")
+                except Exception as agent_error:
+                    # Same fallback as /api/query; the client drops any tokens streamed so far
+                    print(f"⚠️ LangGraph Agent stream failed: {agent_error}")
+                    print("⚠️ Falling back to two-model architecture...")
+                    yield format_sse("fallback", {"reason": str(agent_error)})
+                    result = await single_flight.do(
+                        query_hash,
+                        lambda: compute_two_model_answer(request.question, query_hash, request.api_key)
+                    )
+                    yield format_sse("token", {"text": result['answer']})
+                    yield format_sse("done", {**result, 'question': request.question, "cached": False})
+                    return
+                
+                # Cache the assembled answer just like /api/query does
+                response = await finalize_agent_result(request.question, query_hash, result)
+                yield format_sse("done", {**response, "cached": False})
+            
+            except HTTPException as e:
+                yield format_sse("error", {"status_code": e.status_code, "detail": e.detail})
+            except Exception as e:
+                print(f"\nDEBUG: ERROR in stream_query: {str(e)}")
+                import traceback
+                traceback.print_exc()
+                yield format_sse("error", {"status_code": 500, "detail": str(e)})
+        
+        return StreamingResponse(
+            event_stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    
     @router.get("/api/health", response_model=HealthResponse)
     async def health_check():
         """Health check endpoint with cache statistics"""
@@ -190,15 +431,35 @@ def create_routes(app, data_cache: dict, mongodb_cache: MongoDBCache, get_query_
             except Exception as e:
                 print(f"Error getting cache stats: {e}")
                 cache_stats = {"error": str(e)}
+        else:
+            # The in-memory tier keeps working without MongoDB
+            cache_stats = {"tiers": mongodb_cache.get_tier_stats()}
+        
+        ingestor = getattr(app.state, 'daily_rainfall_ingestor', None)
+        apeda_warmup = getattr(app.state, 'apeda_warmup', None)
+        
+        snapshot = snapshots.current
         
         return {
             'status': 'healthy',
-            'data_loaded': data_cache['crop_production'] is not None,
-            'last_updated': data_cache['last_updated'].isoformat() if data_cache['last_updated'] else None,
-            'crop_records': len(data_cache['crop_production']) if data_cache['crop_production'] is not None else 0,
-            'rainfall_records': len(data_cache['rainfall']) if data_cache['rainfall'] is not None else 0,
+            'data_loaded': snapshot is not None,
+            'last_updated': snapshot.loaded_at.isoformat() if snapshot else None,
+            'crop_records': len(snapshot.crop_production) if snapshot else 0,
+            'rainfall_records': len(snapshot.rainfall) if snapshot else 0,
+            'snapshot': snapshots.get_stats(),
             'mongodb_connected': mongodb_connected,
-            'cache_stats': cache_stats
+            'cache_stats': cache_stats,
+            'coalescing_stats': single_flight.get_stats(),
+            'data_cache_stats': data_result_cache.get_stats(),
+            'upstream_rate_limits': http_client.get_stats(),
+            'circuit_breakers': circuit_breakers.get_stats(),
+            'warehouse_stats': {
+                'historical_rainfall': historical_rainfall_store.get_stats(),
+                'daily_rainfall': (ingestor.get_stats() if ingestor else daily_rainfall_store.get_stats()),
+                'apeda_production': (apeda_warmup.get_stats() if apeda_warmup else apeda_production_store.get_stats()),
+                'http_response_cache': response_cache.get_stats(),
+                'product_catalog': product_catalog.get_stats()
+            }
         }
     
     @router.get("/api/datasets")
@@ -236,24 +497,34 @@ def create_routes(app, data_cache: dict, mongodb_cache: MongoDBCache, get_query_
     
     @router.post("/api/cache/clear")
     async def clear_cache(confirm: bool = False):
-        """Clear all cached queries (requires confirmation)"""
-        if not mongodb_cache.is_connected():
-            raise HTTPException(status_code=503, detail="MongoDB not connected")
+        """Clear all cached queries (requires confirmation)
         
+        The in-process tiers are cleared even while MongoDB is down, since they
+        are the only caches serving then; MongoDB is only needed for its own delete.
+        """
         if not confirm:
             return {
                 "message": "Are you sure? This will delete all cached queries.",
                 "hint": "Add ?confirm=true to the URL to confirm deletion"
             }
         
-        try:
-            deleted_count = await mongodb_cache.clear_cache()
-            return {
-                "message": "Cache cleared successfully",
-                "deleted_count": deleted_count
-            }
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Error clearing cache: {str(e)}")
+        l1_cleared = mongodb_cache.clear_l1()
+        data_cache_cleared = data_result_cache.clear()
+        
+        deleted_count = None
+        if mongodb_cache.is_connected():
+            try:
+                deleted_count = await mongodb_cache.clear_cache()
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Error clearing cache: {str(e)}")
+        
+        return {
+            "message": "Cache cleared successfully" if deleted_count is not None
+                       else "In-process caches cleared (MongoDB not connected)",
+            "deleted_count": deleted_count,
+            "l1_cleared": l1_cleared,
+            "data_cache_cleared": data_cache_cleared
+        }
     
     @router.delete("/api/cache/expired")
     async def delete_expired_cache():
@@ -1,25 +1,21 @@
 
+import asyncio
 import uvicorn
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
-from datetime import datetime
 
 # Import modules
 from config.settings import settings
-from database import MongoDBCache
-from services import DataGovIntegration, DataQueryEngine
+from database import MongoDBCache, historical_rainfall_store, apeda_production_store
+from services import (
+    DataGovIntegration, DataQueryEngine, DailyRainfallIngestor, ApedaWarmup, SnapshotManager,
+    http_client, product_catalog, circuit_breakers, as_prefetch
+)
 from api import create_routes
 
 
-# Data cache
-data_cache = {
-    'crop_production': None,
-    'rainfall': None,
-    'last_updated': None
-}
-
 # Initialize MongoDB cache
 mongodb_cache = MongoDBCache()
 
@@ -27,16 +23,31 @@ mongodb_cache = MongoDBCache()
 data_integration = DataGovIntegration()
 
 
-def load_data():
-    """Load and cache data from data.gov.in"""
-    global data_cache
-    
+def load_data() -> dict:
+    """Build fresh crop and rainfall frames from data.gov.in (runs in a worker thread)"""
     print("Loading data from data.gov.in...")
-    data_cache['crop_production'] = data_integration.fetch_crop_production_data()
-    data_cache['rainfall'] = data_integration.fetch_rainfall_data()
-    data_cache['last_updated'] = datetime.now()
-    print(f"Data loaded successfully. Crop records: {len(data_cache['crop_production'])}, "
-          f"Rainfall records: {len(data_cache['rainfall'])}")
+    return {
+        'crop_production': data_integration.fetch_crop_production_data(),
+        'rainfall': data_integration.fetch_rainfall_data()
+    }
+
+
+# Versioned data snapshot, rebuilt in the background and swapped atomically
+snapshots = SnapshotManager(load_data, data_integration)
+
+
+def load_local_stores():
+    """Load the on-disk catalog and warehouse copies"""
+    # APEDA product codes come from disk; fetched (and persisted) on first use if missing
+    product_catalog.load()
+    apeda_production_store.load()
+    
+    # Historical rainfall is served from the local warehouse; a missing or stale copy is
+    # ingested in the background so startup never waits on the network
+    if data_integration.api_key:
+        historical_rainfall_store.start(
+            lambda: data_integration.fetch_all_records(DataGovIntegration.HISTORICAL_RAINFALL_RESOURCE_ID)
+        )
 
 
 @asynccontextmanager
@@ -49,14 +60,45 @@ async def lifespan(app: FastAPI):
     # Connect to MongoDB
     await mongodb_cache.connect()
     
-    # Load data
-    load_data()
+    # Load data (off the event loop) and publish snapshot v1
+    await snapshots.refresh()
+    await as_prefetch(asyncio.to_thread(load_local_stores))
+    
+    # Background jobs run at prefetch priority so live queries get the upstream quota first
+    # Keep the APEDA product catalog fresh (fetched right away if there is no local copy)
+    background_tasks = [
+        asyncio.create_task(as_prefetch(product_catalog.run_refresher(
+            lambda: data_integration.aio.fetch_product_categories(use_cache=False)
+        )))
+    ]
+    
+    # Probe open circuit breakers so user requests never pay for the half-open trial
+    background_tasks.append(asyncio.create_task(as_prefetch(circuit_breakers.run_prober())))
+    
+    # Rebuild the data snapshot on a schedule; requests keep using the old one meanwhile
+    if settings.DATA_REFRESH_MINUTES > 0:
+        background_tasks.append(asyncio.create_task(
+            as_prefetch(snapshots.run_refresher(settings.DATA_REFRESH_MINUTES * 60))
+        ))
+    
+    # Build/top up the daily rainfall warehouse without blocking startup
+    if settings.DAILY_RAINFALL_INGEST and data_integration.api_key:
+        app.state.daily_rainfall_ingestor = DailyRainfallIngestor(data_integration.aio)
+        background_tasks.append(asyncio.create_task(as_prefetch(app.state.daily_rainfall_ingestor.run())))
+    
+    # Precompute APEDA reports so the agent's lookups are answered locally
+    if settings.APEDA_WARMUP:
+        app.state.apeda_warmup = ApedaWarmup(data_integration.aio)
+        background_tasks.append(asyncio.create_task(as_prefetch(app.state.apeda_warmup.run())))
     print("="*60 + "\n")
     
     yield
     
     # Cleanup
+    for task in background_tasks:
+        task.cancel()
     await mongodb_cache.disconnect()
+    http_client.close()
 
 
 # Create FastAPI application
@@ -77,15 +119,15 @@ app.add_middleware(
 
 # Note: Query engine will be created after data is loaded
 # Create and register all API routes (query_engine is passed but created on-demand)
-def get_query_engine():
-    """Get query engine with loaded data"""
-    return DataQueryEngine(
-        data_cache['crop_production'],
-        data_cache['rainfall'],
-        data_integration
-    )
+def get_query_engine() -> DataQueryEngine:
+    """The query engine of the current data snapshot (built once per snapshot)"""
+    snapshot = snapshots.current
+    if snapshot is None:
+        raise RuntimeError("Data is still loading")
+    
+    return snapshot.query_engine
 
-create_routes(app, data_cache, mongodb_cache, get_query_engine)
+create_routes(app, snapshots, mongodb_cache, get_query_engine)
 
 
 @app.get("/")
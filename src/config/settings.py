@@ -31,6 +31,38 @@ class Settings:
         self.PORT = int(os.getenv('PORT', 8000))
         self.DEBUG = os.getenv('DEBUG', 'True').lower() == 'true'
         
+        # Concurrency Configuration
+        # Max blocking tool/LLM calls the agent runs at once, per worker process
+        self.AGENT_TOOL_WORKERS = int(os.getenv('AGENT_TOOL_WORKERS', 8))
+        # Pooled async HTTP client for data.gov.in / APEDA (keep-alive connections)
+        self.HTTP_MAX_CONNECTIONS = int(os.getenv('HTTP_MAX_CONNECTIONS', 20))
+        self.HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv('HTTP_MAX_CONNECTIONS_PER_HOST', 6))
+        # Requests per second allowed to each throttled upstream (0 = unlimited); interactive
+        # calls are served before background prefetch/ingestion when the budget runs short
+        self.UPSTREAM_RATE_LIMITS = {
+            'api.data.gov.in': float(os.getenv('DATA_GOV_REQUESTS_PER_SECOND', 5)),
+            'agriexchange.apeda.gov.in': float(os.getenv('APEDA_REQUESTS_PER_SECOND', 5))
+        }
+        # Circuit breakers (APEDA, data.gov.in, Google CSE, Chroma Cloud): open after this many
+        # consecutive failures, then probe the upstream again every CIRCUIT_RESET_SECONDS
+        self.CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', 5))
+        self.CIRCUIT_RESET_SECONDS = float(os.getenv('CIRCUIT_RESET_SECONDS', 30))
+        # DataQueryEngine.execute_query fetches the requested sources concurrently;
+        # a source slower than QUERY_SOURCE_TIMEOUT (seconds) is dropped from the answer
+        self.QUERY_SOURCE_WORKERS = int(os.getenv('QUERY_SOURCE_WORKERS', 8))
+        self.QUERY_SOURCE_TIMEOUT = float(os.getenv('QUERY_SOURCE_TIMEOUT', 25))
+        # Rows per query result kept for the answer prompt (top rows by the result's measure;
+        # the rest are summarized, 0 = keep every row)
+        self.RESULT_MAX_ROWS = int(os.getenv('RESULT_MAX_ROWS', 50))
+        # Resolved filter sets (bitmap masks, year lists) memoized per snapshot's query engine
+        self.QUERY_FILTER_CACHE_SIZE = int(os.getenv('QUERY_FILTER_CACHE_SIZE', 512))
+        # Daily rainfall planner: rows per data.gov.in page and max rows per planned call
+        self.DAILY_RAINFALL_PAGE_SIZE = int(os.getenv('DAILY_RAINFALL_PAGE_SIZE', 1000))
+        self.DAILY_RAINFALL_MAX_ROWS = int(os.getenv('DAILY_RAINFALL_MAX_ROWS', 5000))
+        # /api/query/batch: max questions per request and uncached questions answered at once
+        self.BATCH_MAX_QUESTIONS = int(os.getenv('BATCH_MAX_QUESTIONS', 200))
+        self.BATCH_MAX_CONCURRENCY = int(os.getenv('BATCH_MAX_CONCURRENCY', 4))
+        
         # Cache TTL Configuration (in days)
         self.CACHE_TTL = {
             'apeda_production': 180,  # 6 months
@@ -40,6 +72,60 @@ class Settings:
             'default': 90             # Default 3 months
         }
         
+        # Minutes between background rebuilds of the in-memory data snapshot (0 = never)
+        self.DATA_REFRESH_MINUTES = float(os.getenv('DATA_REFRESH_MINUTES', 60))
+        # Crop/rainfall execution: 'pandas' (bitmap index + cubes) or 'duckdb' (embedded SQL,
+        # needs the duckdb package; falls back to pandas if missing or a query fails)
+        self.QUERY_ENGINE = os.getenv('QUERY_ENGINE', 'pandas').lower()
+        self.SQL_ENGINE_THREADS = int(os.getenv('SQL_ENGINE_THREADS', 0))  # 0 = one per core
+        
+        # Local Parquet warehouse for static datasets (historical rainfall 1901-2015)
+        self.WAREHOUSE_DIR = os.getenv(
+            'WAREHOUSE_DIR', str(pathlib.Path(__file__).parent.parent.parent / 'warehouse')
+        )
+        self.HISTORICAL_RAINFALL_REFRESH_DAYS = int(os.getenv('HISTORICAL_RAINFALL_REFRESH_DAYS', 30))
+        # Background ingest of daily district rainfall (2019-2024), then periodic top-ups
+        self.DAILY_RAINFALL_INGEST = os.getenv('DAILY_RAINFALL_INGEST', 'true').lower() == 'true'
+        self.DAILY_RAINFALL_INGEST_PARALLEL = int(os.getenv('DAILY_RAINFALL_INGEST_PARALLEL', 8))
+        self.DAILY_RAINFALL_TOPUP_HOURS = float(os.getenv('DAILY_RAINFALL_TOPUP_HOURS', 6))
+        
+        # APEDA product catalog is re-fetched in the background after this many hours
+        self.PRODUCT_CATALOG_REFRESH_HOURS = float(os.getenv('PRODUCT_CATALOG_REFRESH_HOURS', 24 * 7))
+        
+        # Background warm-up of APEDA reports (every year x category, plus every catalog
+        # product when APEDA_WARMUP_PRODUCTS) into the warehouse, served without network calls
+        self.APEDA_WARMUP = os.getenv('APEDA_WARMUP', 'true').lower() == 'true'
+        self.APEDA_WARMUP_PRODUCTS = os.getenv('APEDA_WARMUP_PRODUCTS', 'true').lower() == 'true'
+        self.APEDA_WARMUP_YEARS = [
+            year.strip()
+            for year in os.getenv('APEDA_WARMUP_YEARS', '2023-24,2022-23,2021-22,2020-21,2019-20').split(',')
+            if year.strip()
+        ]
+        # An APEDA report that came back empty is re-requested after this long (an empty
+        # answer may be transient, so it is not pinned even for closed years)
+        self.APEDA_EMPTY_RETRY_HOURS = float(os.getenv('APEDA_EMPTY_RETRY_HOURS', 24))
+        
+        # On-disk cache of upstream API responses (gzip, shared by all workers)
+        self.HTTP_CACHE_ENABLED = os.getenv('HTTP_CACHE_ENABLED', 'true').lower() == 'true'
+        self.HTTP_CACHE_DIR = os.getenv('HTTP_CACHE_DIR', os.path.join(self.WAREHOUSE_DIR, 'http_cache'))
+        # Response TTLs in hours (None = never expires)
+        self.HTTP_CACHE_TTL_HOURS = {
+            'apeda_closed_year': None,         # Financial years that ended over a year ago
+            'apeda_open_year': 6,              # Current / recently ended financial year
+            'apeda_products': 24 * 7,          # Product code lists
+            'historical_rainfall': None,       # Static 1901-2015 dataset
+            'daily_rainfall_closed_year': 24 * 30,
+            'daily_rainfall_open_year': 6
+        }
+        
+        # In-process L1 answer cache in front of MongoDB (entries per worker)
+        self.L1_CACHE_MAX_ENTRIES = int(os.getenv('L1_CACHE_MAX_ENTRIES', 1000))
+        # Fetched data (execute_query results, agent tool outputs) keyed by canonical params,
+        # so reworded questions skip data I/O (entries per worker, 0 = disabled)
+        self.DATA_CACHE_MAX_ENTRIES = int(os.getenv('DATA_CACHE_MAX_ENTRIES', 500))
+        # Web search results are news, not datasets: kept for hours instead of CACHE_TTL days
+        self.WEB_SEARCH_CACHE_HOURS = float(os.getenv('WEB_SEARCH_CACHE_HOURS', 6))
+        
         self._validate()
     
     def _validate(self):
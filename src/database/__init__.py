@@ -1,4 +1,14 @@
 """Database module"""
 from .mongodb import MongoDBCache
+from .memory_cache import LRUTTLCache
+from .data_cache import DataResultCache, data_result_cache
+from .warehouse import (
+    HistoricalRainfallStore, DailyRainfallStore, ApedaProductionStore,
+    historical_rainfall_store, daily_rainfall_store, apeda_production_store
+)
 
-__all__ = ['MongoDBCache']
+__all__ = [
+    'MongoDBCache', 'LRUTTLCache', 'DataResultCache', 'data_result_cache',
+    'HistoricalRainfallStore', 'DailyRainfallStore', 'ApedaProductionStore',
+    'historical_rainfall_store', 'daily_rainfall_store', 'apeda_production_store'
+]
@@ -0,0 +1,111 @@
+"""In-process cache of fetched data, keyed by canonical query params instead of question text"""
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from config.settings import settings
+from database.memory_cache import LRUTTLCache
+
+
+class DataResultCache:
+    """
+    Second cache below the answer cache. The answer cache keys on the question
+    text, so two wordings of one question both fetch the same data; this one
+    keys on what the router or agent asked for (execute_query params or a tool
+    call's arguments), so a reworded question skips all data I/O and only pays
+    for answer generation.
+
+    Keys ignore case, extra whitespace, empty values and list order (except
+    the order of crops, see query_key). Entries live for the shortest
+    CACHE_TTL of the data types involved.
+    """
+    
+    # Router params that change what execute_query fetches
+    QUERY_PARAMS = (
+        'states', 'districts', 'crops', 'seasons', 'years', 'data_needed',
+        'comparison_type', 'aggregation', 'apeda_category', 'product_code'
+    )
+    
+    def __init__(self, max_entries: Optional[int] = None):
+        self.entries = LRUTTLCache(settings.DATA_CACHE_MAX_ENTRIES if max_entries is None else max_entries)
+        self._lock = threading.Lock()
+        self.stats = {'query': {'hits': 0, 'misses': 0}, 'tool': {'hits': 0, 'misses': 0}}
+    
+    @staticmethod
+    def _canonical(value: Any) -> Any:
+        """Lowercased, stripped strings; lists deduplicated and sorted; empty values dropped"""
+        if isinstance(value, str):
+            return ' '.join(value.lower().split()) or None
+        if isinstance(value, (list, tuple, set)):
+            items = {json.dumps(DataResultCache._canonical(item), sort_keys=True) for item in value}
+            items.discard('null')
+            return sorted(items) or None
+        if isinstance(value, dict):
+            canonical = {key: DataResultCache._canonical(item) for key, item in value.items()}
+            return {key: item for key, item in canonical.items() if item is not None} or None
+        return value
+    
+    @classmethod
+    def make_key(cls, kind: str, params: Dict[str, Any], *extra: Any) -> str:
+        """Stable key of one kind ('query' or 'tool:<name>') over canonical params"""
+        canonical = json.dumps({
+            'kind': kind,
+            'params': cls._canonical(params) or {},
+            'extra': [str(value) for value in extra]
+        }, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+    
+    def query_key(self, params: Dict[str, Any], snapshot_version: Any) -> str:
+        """execute_query key; the snapshot version makes a data refresh invalidate it"""
+        fields = {name: params.get(name) for name in self.QUERY_PARAMS}
+        # query_apeda maps only the first crop to a product code, so crop order matters
+        crops = dict.fromkeys(filter(None, (self._canonical(crop) for crop in params.get('crops') or [])))
+        fields['crops'] = ' > '.join(crops)
+        # 'last N years' depends on today's date
+        return self.make_key('query', fields, snapshot_version, time.localtime().tm_year)
+    
+    def tool_key(self, tool_name: str, args: Dict[str, Any]) -> str:
+        return self.make_key(f"tool:{tool_name}", args)
+    
+    @staticmethod
+    def ttl_seconds(data_types: Iterable[str]) -> float:
+        """Shortest CACHE_TTL (days) among the data types, in seconds"""
+        days = [settings.CACHE_TTL.get(data_type, settings.CACHE_TTL['default']) for data_type in data_types]
+        return min(days or [settings.CACHE_TTL['default']]) * 86400
+    
+    def _count(self, kind: str, hit: bool):
+        with self._lock:
+            self.stats[kind]['hits' if hit else 'misses'] += 1
+    
+    def get(self, key: str, kind: str = 'query') -> Optional[Any]:
+        """Cached value or None (kind only selects the hit/miss counters)"""
+        value = self.entries.get(key)
+        self._count(kind, value is not None)
+        return value
+    
+    def set(self, key: str, value: Any, ttl_seconds: float):
+        self.entries.set(key, value, ttl_seconds=ttl_seconds)
+    
+    def clear(self) -> int:
+        return self.entries.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters per kind plus entry counts for the health endpoint"""
+        def summarize(stats: dict) -> dict:
+            lookups = stats['hits'] + stats['misses']
+            return {**stats, 'hit_rate': round(stats['hits'] / lookups, 4) if lookups else 0.0}
+        
+        with self._lock:
+            return {
+                'query_results': summarize(dict(self.stats['query'])),
+                'tool_outputs': summarize(dict(self.stats['tool'])),
+                'entries': len(self.entries),
+                'max_entries': self.entries.max_entries,
+                'evictions': self.entries.evictions
+            }
+
+
+# Global instance shared by the two-model path and the agent tools
+data_result_cache = DataResultCache()
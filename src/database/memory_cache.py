@@ -0,0 +1,77 @@
+"""In-process LRU/TTL cache used as the L1 tier in front of MongoDB"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Optional
+
+
+class LRUTTLCache:
+    """
+    Bounded in-memory cache with least-recently-used eviction and per-entry expiry.
+    Thread-safe so it can also be shared with code running in worker threads.
+    """
+    
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at_ts, value)
+        self._lock = threading.Lock()
+        self.evictions = 0
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Return the live value for key, or None if missing/expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None,
+            expires_at: Optional[datetime] = None):
+        """Store value until expires_at (or for ttl_seconds)"""
+        if self.max_entries <= 0:
+            return
+        
+        if expires_at is not None:
+            expires_ts = expires_at.timestamp()
+        else:
+            expires_ts = time.time() + (ttl_seconds or 0)
+        
+        with self._lock:
+            self._entries[key] = (expires_ts, value)
+            self._entries.move_to_end(key)
+            
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def delete(self, key: str) -> bool:
+        """Remove key; returns True if it was present"""
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+    
+    def clear(self) -> int:
+        """Remove every entry; returns how many were removed"""
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            return count
+    
+    def purge_expired(self) -> int:
+        """Drop expired entries; returns how many were removed"""
+        now = time.time()
+        with self._lock:
+            expired = [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]
+            for key in expired:
+                del self._entries[key]
+            return len(expired)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
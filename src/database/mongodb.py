@@ -1,10 +1,13 @@
 """MongoDB cache operations"""
+import asyncio
+import copy
 import hashlib
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List
 from motor.motor_asyncio import AsyncIOMotorClient
 
 from config.settings import settings
+from database.memory_cache import LRUTTLCache
 
 
 class MongoDBCache:
@@ -14,6 +17,16 @@ class MongoDBCache:
         self.client: Optional[AsyncIOMotorClient] = None # type: ignore
         self.db = None
         self.collection_name = 'query_cache'
+        
+        # L1: in-process answers, L2: MongoDB Atlas. L1 values are (entry, [hit_count]);
+        # entries are copied once when stored, and a hit returns a new top-level dict, so
+        # callers may set keys but must treat nested values (raw_results...) as read-only
+        self.l1 = LRUTTLCache(settings.L1_CACHE_MAX_ENTRIES)
+        self.tier_stats = {
+            'l1': {'hits': 0, 'misses': 0},
+            'l2': {'hits': 0, 'misses': 0}
+        }
+        self._background_tasks = set()
     
     async def connect(self) -> bool:
         """Connect to MongoDB Atlas"""
@@ -52,8 +65,33 @@ class MongoDBCache:
         normalized = ' '.join(query.lower().strip().split())
         return hashlib.md5(normalized.encode()).hexdigest()
     
+    def _l1_set(self, query_hash: str, entry: Dict[str, Any], expires_at: datetime):
+        """Store a private copy of entry in L1; its hit count lives next to it"""
+        entry = copy.deepcopy(entry)
+        hit_count = entry.pop('hit_count', 0)
+        self.l1.set(query_hash, (entry, [hit_count]), expires_at=expires_at)
+    
+    def _l1_get(self, query_hash: str) -> Optional[Dict[str, Any]]:
+        """Shallow copy of the L1 entry with its hit count incremented (None on a miss)"""
+        slot = self.l1.get(query_hash)
+        if slot is None:
+            return None
+        
+        entry, hits = slot
+        hits[0] += 1
+        # Deep-copying raw_results on every hit would cost milliseconds on large entries
+        return {**entry, 'hit_count': hits[0]}
+    
     async def get_cached_response(self, query_hash: str) -> Optional[Dict[str, Any]]:
-        """Check if response exists in cache"""
+        """Check if response exists in cache (L1 memory first, then MongoDB)"""
+        cached = self._l1_get(query_hash)
+        if cached is not None:
+            self.tier_stats['l1']['hits'] += 1
+            print(f" L1 CACHE HIT! Query has been answered {cached['hit_count'] - 1} times before")
+            self._record_hit_in_background(query_hash)
+            return cached
+        self.tier_stats['l1']['misses'] += 1
+        
         if self.db is None:
             return None
         
@@ -64,48 +102,133 @@ class MongoDBCache:
             })
             
             if cached:
-                # Update hit count and last accessed
-                await self.db[self.collection_name].update_one(
-                    {"_id": cached["_id"]},
-                    {
-                        "$inc": {"hit_count": 1},
-                        "$set": {"last_accessed": datetime.now()}
-                    }
-                )
+                self.tier_stats['l2']['hits'] += 1
                 print(f" CACHE HIT! Query has been answered {cached.get('hit_count', 0)} times before")
+                
+                # Promote to L1 for the remainder of its Mongo TTL
+                cached['hit_count'] = cached.get('hit_count', 0) + 1
+                self._l1_set(query_hash, cached, cached['expires_at'])
+                self._record_hit_in_background(query_hash)
                 return cached
+            
+            self.tier_stats['l2']['misses'] += 1
             return None
         except Exception as e:
             print(f" Cache lookup error: {e}")
             return None
     
+    async def get_cached_responses(self, query_hashes: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Bulk cache lookup for many questions.
+        Serves what it can from L1, then fetches the rest with a single $in query.
+        """
+        found = {}
+        remaining = []
+        for query_hash in dict.fromkeys(query_hashes):
+            cached = self._l1_get(query_hash)
+            if cached is not None:
+                self.tier_stats['l1']['hits'] += 1
+                found[query_hash] = cached
+            else:
+                self.tier_stats['l1']['misses'] += 1
+                remaining.append(query_hash)
+        
+        if remaining and self.db is not None:
+            try:
+                cursor = self.db[self.collection_name].find({
+                    "query_hash": {"$in": remaining},
+                    "expires_at": {"$gt": datetime.now()}  # Not expired
+                })
+                async for cached in cursor:
+                    cached['hit_count'] = cached.get('hit_count', 0) + 1
+                    self._l1_set(cached['query_hash'], cached, cached['expires_at'])
+                    found[cached['query_hash']] = cached
+                
+                l2_hits = sum(1 for query_hash in remaining if query_hash in found)
+                self.tier_stats['l2']['hits'] += l2_hits
+                self.tier_stats['l2']['misses'] += len(remaining) - l2_hits
+            except Exception as e:
+                print(f" Bulk cache lookup error: {e}")
+        
+        if found:
+            print(f" BULK CACHE: {len(found)}/{len(set(query_hashes))} questions already answered")
+            self._record_hits_in_background(list(found.keys()))
+        return found
+    
+    def _record_hits_in_background(self, query_hashes: List[str]):
+        """Bulk variant of _record_hit_in_background (one update_many)"""
+        if self.db is None:
+            return
+        
+        task = asyncio.create_task(self._record_hits(query_hashes))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    async def _record_hits(self, query_hashes: List[str]):
+        """Increment hit_count for several cache entries at once"""
+        try:
+            await self.db[self.collection_name].update_many(
+                {"query_hash": {"$in": query_hashes}},
+                {
+                    "$inc": {"hit_count": 1},
+                    "$set": {"last_accessed": datetime.now()}
+                }
+            )
+        except Exception as e:
+            print(f" Cache hit count update error: {e}")
+    
+    def _record_hit_in_background(self, query_hash: str):
+        """Update hit count and last accessed without holding up the response"""
+        if self.db is None:
+            return
+        
+        task = asyncio.create_task(self._record_hit(query_hash))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    async def _record_hit(self, query_hash: str):
+        """Increment hit_count and refresh last_accessed in MongoDB"""
+        try:
+            await self.db[self.collection_name].update_one(
+                {"query_hash": query_hash},
+                {
+                    "$inc": {"hit_count": 1},
+                    "$set": {"last_accessed": datetime.now()}
+                }
+            )
+        except Exception as e:
+            print(f" Cache hit count update error: {e}")
+    
     async def cache_response(self, query_hash: str, query: str, params: dict,
                             answer: str, sources: list, results: dict) -> bool:
         """Store response in cache with TTL"""
+        # Determine expiration based on data type
+        ttl_days = self._get_ttl_days(params)
+        expires_at = datetime.now() + timedelta(days=ttl_days)
+        
+        entry = {
+            "query_hash": query_hash,
+            "original_query": query,
+            "normalized_query": ' '.join(query.lower().strip().split()),
+            "query_params": params,
+            "answer": answer,
+            "data_sources": sources,
+            "raw_results": results,
+            "created_at": datetime.now(),
+            "expires_at": expires_at,
+            "last_accessed": datetime.now()
+        }
+        self._l1_set(query_hash, entry, expires_at)
+        
         if self.db is None:
             return False
         
         try:
-            # Determine expiration based on data type
-            ttl_days = self._get_ttl_days(params)
-            expires_at = datetime.now() + timedelta(days=ttl_days)
-            
             # Upsert to avoid duplicates
             await self.db[self.collection_name].update_one(
                 {"query_hash": query_hash},
                 {
-                    "$set": {
-                        "query_hash": query_hash,
-                        "original_query": query,
-                        "normalized_query": ' '.join(query.lower().strip().split()),
-                        "query_params": params,
-                        "answer": answer,
-                        "data_sources": sources,
-                        "raw_results": results,
-                        "created_at": datetime.now(),
-                        "expires_at": expires_at,
-                        "last_accessed": datetime.now()
-                    },
+                    "$set": entry,
                     "$setOnInsert": {
                         "hit_count": 0
                     }
@@ -173,6 +296,7 @@ class MongoDBCache:
             "total_queries_cached": total_cached,
             "active_cached_queries": active_cached,
             "expired_queries": total_cached - active_cached,
+            "tiers": self.get_tier_stats(),
             "cache_hits": {
                 "total": hits.get('total_hits', 0),
                 "average_per_query": round(hits.get('avg_hits', 0), 2),
@@ -182,11 +306,16 @@ class MongoDBCache:
             "recent_10_queries": recent
         }
     
+    def clear_l1(self) -> int:
+        """Clear the in-process tier only (works without MongoDB); returns entries removed"""
+        return self.l1.clear()
+    
     async def clear_cache(self) -> int:
         """Clear all cached queries"""
         if self.db is None:
             raise Exception("MongoDB not connected")
         
+        self.l1.clear()
         result = await self.db[self.collection_name].delete_many({})
         return result.deleted_count
     
@@ -195,6 +324,7 @@ class MongoDBCache:
         if self.db is None:
             raise Exception("MongoDB not connected")
         
+        self.l1.purge_expired()
         result = await self.db[self.collection_name].delete_many({
             "expires_at": {"$lt": datetime.now()}
         })
@@ -230,8 +360,28 @@ class MongoDBCache:
                 "active_cached_queries": active_cached,
                 "expired_queries": total_cached - active_cached,
                 "total_cache_hits": total_hits,
-                "top_5_queries": popular
+                "top_5_queries": popular,
+                "tiers": self.get_tier_stats()
             }
         except Exception as e:
             print(f"Error getting cache stats: {e}")
             return {"error": str(e)}
+    
+    def get_tier_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the L1 (memory) and L2 (MongoDB) tiers"""
+        def summarize(stats: dict) -> dict:
+            lookups = stats['hits'] + stats['misses']
+            return {
+                **stats,
+                "hit_rate": round(stats['hits'] / lookups, 4) if lookups else 0.0
+            }
+        
+        return {
+            "l1_memory": {
+                **summarize(self.tier_stats['l1']),
+                "entries": len(self.l1),
+                "max_entries": self.l1.max_entries,
+                "evictions": self.l1.evictions
+            },
+            "l2_mongodb": summarize(self.tier_stats['l2'])
+        }
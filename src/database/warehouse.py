@@ -0,0 +1,579 @@
+"""Local columnar (Parquet) warehouse for static data.gov.in datasets"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote, unquote
+
+import pandas as pd
+
+from config.settings import settings
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+
+def file_sha256(path: str) -> str:
+    """Checksum of a file on disk"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def frame_sha256(df: pd.DataFrame) -> str:
+    """Checksum of a DataFrame's contents (independent of the file encoding)"""
+    return hashlib.sha256(pd.util.hash_pandas_object(df, index=False).values.tobytes()).hexdigest()
+
+
+def _write_atomic(path: str, write: Callable[[str], None]):
+    """
+    Write through a temp file in the same directory and rename, so readers never
+    see a half-written file. The temp name is unique per call, so two processes
+    writing the same file never rename each other's partial output into place.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f"{os.path.basename(path)}.", suffix='.tmp')
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_parquet_atomic(df: pd.DataFrame, path: str):
+    """Atomic Parquet write (see _write_atomic)"""
+    _write_atomic(path, lambda tmp_path: df.to_parquet(tmp_path, index=False))
+
+
+def write_json_atomic(data: Any, path: str):
+    """Atomic JSON write (see _write_atomic), for the stores' meta files"""
+    def write(tmp_path: str):
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+    _write_atomic(path, write)
+
+
+class HistoricalRainfallStore:
+    """
+    The IMD 1901-2015 subdivision rainfall resource (~4k rows), kept as Parquet
+    on disk and as a DataFrame in memory. The upstream API is only contacted
+    when the local copy is missing, fails its checksum, or is older than
+    HISTORICAL_RAINFALL_REFRESH_DAYS. At startup a missing or stale copy is
+    ingested in the background (the store reports not loaded until then); a
+    stale copy keeps being served meanwhile. After a failed refresh upstream is
+    left alone for 30 minutes.
+    """
+    
+    NAME = 'historical_rainfall'
+    
+    def __init__(self, base_dir: Optional[str] = None):
+        self.base_dir = base_dir or settings.WAREHOUSE_DIR
+        self.data_path = os.path.join(self.base_dir, f"{self.NAME}.parquet")
+        self.meta_path = os.path.join(self.base_dir, f"{self.NAME}.meta.json")
+        self.refresh_interval = timedelta(days=settings.HISTORICAL_RAINFALL_REFRESH_DAYS)
+        self._frame: Optional[pd.DataFrame] = None
+        self._meta: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._retry_after: Optional[datetime] = None  # Back off after a failed refresh
+        self._refreshing = False  # A background refresh is running
+    
+    @staticmethod
+    def normalize(records: List[dict]) -> pd.DataFrame:
+        """Raw API records -> typed frame (numeric months/seasons, int year)"""
+        df = pd.DataFrame(records)
+        if df.empty:
+            return df
+        
+        for col in df.columns:
+            if col != 'subdivision':
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+        df['subdivision'] = df['subdivision'].astype(str).str.strip().str.upper()
+        df = df.dropna(subset=['year'])
+        df['year'] = df['year'].astype(int)
+        return df.sort_values(['subdivision', 'year']).reset_index(drop=True)
+    
+    def _load_local(self) -> bool:
+        """Load the Parquet copy if it exists and matches its recorded checksum"""
+        if not (os.path.exists(self.data_path) and os.path.exists(self.meta_path)):
+            return False
+        
+        try:
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+            if file_sha256(self.data_path) != meta.get('file_sha256'):
+                print(f"⚠️ {self.NAME}: checksum mismatch, local copy will be re-ingested")
+                return False
+            
+            self._frame = pd.read_parquet(self.data_path)
+            self._meta = meta
+            print(f"✅ {self.NAME}: loaded {len(self._frame)} rows from local warehouse")
+            return True
+        except Exception as e:
+            print(f"DEBUG: Error loading local {self.NAME}: {e}")
+            return False
+    
+    def _backing_off(self) -> bool:
+        """True while the last failed refresh's back-off is active"""
+        return self._retry_after is not None and datetime.now() < self._retry_after
+    
+    def is_stale(self) -> bool:
+        """True when the copy is older than the refresh interval (and no back-off is active)"""
+        if self._backing_off():
+            return False
+        fetched_at = self._meta.get('fetched_at')
+        if not fetched_at:
+            return True
+        return datetime.now() - datetime.fromisoformat(fetched_at) > self.refresh_interval
+    
+    def refresh(self, fetch_records: Callable[[], List[dict]]) -> bool:
+        """Re-ingest the full resource from upstream; keeps the old copy on failure"""
+        try:
+            print(f"📥 {self.NAME}: ingesting full resource from data.gov.in...")
+            df = self.normalize(fetch_records())
+            if df.empty:
+                raise ValueError("upstream returned no records")
+        except Exception as e:
+            print(f"DEBUG: {self.NAME} refresh failed: {e}")
+            self._retry_after = datetime.now() + timedelta(minutes=30)
+            return False
+        
+        content_sha256 = frame_sha256(df)
+        unchanged = content_sha256 == self._meta.get('content_sha256')
+        
+        if not unchanged:
+            write_parquet_atomic(df, self.data_path)
+        
+        meta = {
+            'resource': self.NAME,
+            'rows': len(df),
+            'columns': list(df.columns),
+            'content_sha256': content_sha256,
+            'file_sha256': file_sha256(self.data_path),
+            'fetched_at': datetime.now().isoformat()
+        }
+        write_json_atomic(meta, self.meta_path)
+        
+        self._frame = df
+        self._meta = meta
+        print(f"✅ {self.NAME}: {len(df)} rows {'unchanged' if unchanged else 'stored'} "
+              f"({content_sha256[:12]})")
+        return True
+    
+    def _refresh_in_background(self, fetch_records: Callable[[], List[dict]]):
+        """Start one background refresh; the current frame is served until it finishes"""
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        
+        def run():
+            try:
+                self.refresh(fetch_records)
+            finally:
+                self._refreshing = False
+        
+        threading.Thread(target=run, name=f"{self.NAME}-refresh", daemon=True).start()
+    
+    def start(self, fetch_records: Callable[[], List[dict]]):
+        """Startup: load the local copy; a missing or stale copy is ingested in the background"""
+        with self._lock:
+            if self._frame is None:
+                self._load_local()
+        if self._frame is None or self.is_stale():
+            self._refresh_in_background(fetch_records)
+    
+    def ensure_loaded(self, fetch_records: Callable[[], List[dict]]) -> pd.DataFrame:
+        """Serve from memory; load from disk, or ingest from upstream only when there is no copy"""
+        if self._frame is None:
+            with self._lock:
+                if self._frame is None:
+                    self._load_local()
+                # Without any copy the caller has to wait for the ingest, unless upstream just
+                # failed or the background ingest is already running
+                if self._frame is None and not self._backing_off() and not self._refreshing:
+                    self.refresh(fetch_records)
+        
+        frame = self._frame
+        if frame is None:
+            return pd.DataFrame()
+        if self.is_stale():
+            self._refresh_in_background(fetch_records)
+        return frame
+    
+    def query(self, fetch_records: Callable[[], List[dict]], subdivisions: Optional[List[str]] = None,
+              years: Optional[List[int]] = None) -> pd.DataFrame:
+        """Vectorized subdivision/year filter over the in-memory frame"""
+        df = self.ensure_loaded(fetch_records)
+        if df.empty:
+            return df
+        
+        mask = pd.Series(True, index=df.index)
+        if subdivisions:
+            mask &= df['subdivision'].isin([s.upper() for s in subdivisions])
+        if years:
+            mask &= df['year'].isin(years)
+        return df[mask]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Row count and ingest metadata for the health endpoint"""
+        return {
+            'loaded': self._frame is not None,
+            'refreshing': self._refreshing,
+            'rows': self._meta.get('rows', 0),
+            'fetched_at': self._meta.get('fetched_at'),
+            'content_sha256': self._meta.get('content_sha256')
+        }
+
+
+class DailyRainfallStore:
+    """
+    The daily district rainfall resource (2019-2024), stored as Parquet files
+    partitioned by state and year:
+    
+        <WAREHOUSE_DIR>/daily_rainfall/state=<State>/year=<Year>/part-*.parquet
+    
+    Files are written by services.rainfall_ingest; queries only read the
+    partitions they need. A full build is written to a staging directory and
+    swapped in at the end, so readers always see a complete copy. Builds and
+    top-ups share the staging directories, so they run under a cross-process
+    lock file (see build_lock).
+    """
+    
+    NAME = 'daily_rainfall'
+    NUMERIC_COLUMNS = ['Avg_rainfall', 'Year', 'Month']
+    
+    def __init__(self, base_dir: Optional[str] = None):
+        self.base_dir = base_dir or settings.WAREHOUSE_DIR
+        self.root = os.path.join(self.base_dir, self.NAME)
+        self.staging_root = f"{self.root}.staging"
+        self.topup_root = f"{self.root}.topup"
+        self.meta_path = os.path.join(self.base_dir, f"{self.NAME}.meta.json")
+        self.lock_path = os.path.join(self.base_dir, f"{self.NAME}.build.lock")
+        self._meta: Dict[str, Any] = self._read_meta()
+        self._lock = threading.Lock()
+    
+    def _read_meta(self) -> Dict[str, Any]:
+        try:
+            with open(self.meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _write_meta(self, meta: Dict[str, Any]):
+        os.makedirs(self.base_dir, exist_ok=True)
+        write_json_atomic(meta, self.meta_path)
+        self._meta = meta
+    
+    def reload_meta(self):
+        """Pick up builds and top-ups committed by another process"""
+        self._meta = self._read_meta()
+    
+    @contextmanager
+    def build_lock(self):
+        """
+        Cross-process lock (flock on <NAME>.build.lock) for a build or top-up.
+        Yields False right away if another process holds it. Without fcntl
+        (Windows) builds are only coordinated within the process.
+        """
+        if not FCNTL_AVAILABLE:
+            yield True
+            return
+        
+        os.makedirs(self.base_dir, exist_ok=True)
+        with open(self.lock_path, 'a') as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+    
+    @classmethod
+    def normalize(cls, records: List[dict]) -> pd.DataFrame:
+        """Raw API records -> typed frame"""
+        df = pd.DataFrame(records)
+        if df.empty:
+            return df
+        
+        for col in cls.NUMERIC_COLUMNS:
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+        df = df.dropna(subset=['State', 'Year'])
+        df['Year'] = df['Year'].astype(int)
+        return df
+    
+    @staticmethod
+    def _partition_dir(root: str, state: str, year: int) -> str:
+        # State names contain spaces and '&', so they are percent-encoded
+        return os.path.join(root, f"state={quote(state, safe='')}", f"year={year}")
+    
+    def is_ready(self) -> bool:
+        """True once a full ingest has completed (here or in another process)"""
+        if not self._meta.get('complete'):
+            self.reload_meta()
+        return bool(self._meta.get('complete')) and os.path.isdir(self.root)
+    
+    def year_rows(self, year: int) -> int:
+        """Rows stored for one year (0 if none)"""
+        return self._meta.get('years', {}).get(str(year), 0)
+    
+    def write_chunk(self, df: pd.DataFrame, chunk_id: str, staging: bool = True) -> Dict[int, int]:
+        """Append a chunk of normalized rows as one part file per state/year partition
+        
+        Returns rows written per year.
+        """
+        root = self.staging_root if staging else self.root
+        rows_per_year: Dict[int, int] = {}
+        
+        for (state, year), part in df.groupby(['State', 'Year']):
+            write_parquet_atomic(part, os.path.join(self._partition_dir(root, state, year), f"part-{chunk_id}.parquet"))
+            rows_per_year[int(year)] = rows_per_year.get(int(year), 0) + len(part)
+        
+        return rows_per_year
+    
+    def begin_build(self):
+        """Start a full build in an empty staging directory (call under build_lock)"""
+        shutil.rmtree(self.staging_root, ignore_errors=True)
+        os.makedirs(self.staging_root)
+    
+    def commit_build(self, rows_per_year: Dict[int, int], upstream_total: int):
+        """Swap the staged build in place of the live copy"""
+        with self._lock:
+            old_root = f"{self.root}.old"
+            shutil.rmtree(old_root, ignore_errors=True)
+            if os.path.isdir(self.root):
+                os.replace(self.root, old_root)
+            os.replace(self.staging_root, self.root)
+            shutil.rmtree(old_root, ignore_errors=True)
+            
+            now = datetime.now().isoformat()
+            self._write_meta({
+                'resource': self.NAME,
+                'complete': True,
+                'rows': sum(rows_per_year.values()),
+                'upstream_total': upstream_total,
+                'years': {str(year): rows for year, rows in sorted(rows_per_year.items())},
+                'ingested_at': now,
+                'topped_up_at': now
+            })
+    
+    def replace_year(self, year: int, df: pd.DataFrame):
+        """Incremental top-up: swap in a fresh copy of every partition of one year"""
+        staging = self.topup_root
+        shutil.rmtree(staging, ignore_errors=True)
+        
+        for state, part in df.groupby('State'):
+            write_parquet_atomic(part, os.path.join(self._partition_dir(staging, state, year), "part-topup.parquet"))
+        
+        with self._lock:
+            for state_dir in self._state_dirs(self.root).values():
+                shutil.rmtree(os.path.join(state_dir, f"year={year}"), ignore_errors=True)
+            for state_dir in self._state_dirs(staging).values():
+                target = os.path.join(self.root, os.path.basename(state_dir))
+                os.makedirs(target, exist_ok=True)
+                os.replace(os.path.join(state_dir, f"year={year}"), os.path.join(target, f"year={year}"))
+            shutil.rmtree(staging, ignore_errors=True)
+            
+            meta = dict(self._meta)
+            meta['years'] = {**meta.get('years', {}), str(year): len(df)}
+            meta['rows'] = sum(meta['years'].values())
+            meta['topped_up_at'] = datetime.now().isoformat()
+            self._write_meta(meta)
+    
+    @staticmethod
+    def _state_dirs(root: str) -> Dict[str, str]:
+        """State name (lower) -> partition directory"""
+        if not os.path.isdir(root):
+            return {}
+        return {
+            unquote(name[len('state='):]).lower(): os.path.join(root, name)
+            for name in os.listdir(root) if name.startswith('state=')
+        }
+    
+    def query(self, states: Optional[List[str]] = None, districts: Optional[List[str]] = None,
+              years: Optional[List[int]] = None) -> pd.DataFrame:
+        """Read only the matching partitions, then filter districts"""
+        with self._lock:
+            state_dirs = self._state_dirs(self.root)
+            if states:
+                state_dirs = {name: path for name, path in state_dirs.items() if name in {s.lower() for s in states}}
+            
+            files = []
+            for state_dir in state_dirs.values():
+                for year_name in os.listdir(state_dir):
+                    if years and int(year_name[len('year='):]) not in years:
+                        continue
+                    year_dir = os.path.join(state_dir, year_name)
+                    files.extend(os.path.join(year_dir, f) for f in os.listdir(year_dir) if f.endswith('.parquet'))
+            
+            if not files:
+                return pd.DataFrame()
+            df = pd.concat([pd.read_parquet(f) for f in files], ignore_index=True)
+        
+        if districts and 'District' in df.columns:
+            df = df[df['District'].str.lower().isin([d.lower() for d in districts])]
+        return df
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Ingest metadata for the health endpoint"""
+        return {
+            'ready': self.is_ready(),
+            'rows': self._meta.get('rows', 0),
+            'years': self._meta.get('years', {}),
+            'ingested_at': self._meta.get('ingested_at'),
+            'topped_up_at': self._meta.get('topped_up_at')
+        }
+
+
+# (financial year, category, product code); product code 'All' = category totals
+ApedaKey = Tuple[str, str, str]
+
+
+class ApedaProductionStore:
+    """
+    APEDA state-wise production reports precomputed by services.apeda_warmup,
+    kept as one Parquet file and indexed in memory by (financial year,
+    category, product code). Lookups are dict hits; reports that came back
+    empty are remembered too, but only for APEDA_EMPTY_RETRY_HOURS, since an
+    empty upstream answer may be transient.
+    """
+    
+    NAME = 'apeda_production'
+    KEY_COLUMNS = ['Financial_Year', 'Category', 'Product_Code']
+    
+    def __init__(self, base_dir: Optional[str] = None):
+        self.base_dir = base_dir or settings.WAREHOUSE_DIR
+        self.data_path = os.path.join(self.base_dir, f"{self.NAME}.parquet")
+        self.meta_path = os.path.join(self.base_dir, f"{self.NAME}.meta.json")
+        self._frame = pd.DataFrame(columns=self.KEY_COLUMNS)
+        self._meta: Dict[str, Any] = {'years': {}, 'empty_keys': []}
+        self._index: Dict[ApedaKey, pd.DataFrame] = {}
+        self._by_product: Dict[Tuple[str, str], ApedaKey] = {}
+        self._empty_checked: Dict[ApedaKey, Optional[datetime]] = {}
+        self.empty_retry = timedelta(hours=settings.APEDA_EMPTY_RETRY_HOURS)
+        self._lock = threading.Lock()
+    
+    def _build_index(self):
+        """Split the frame into one small frame per key"""
+        index = {
+            key: group.reset_index(drop=True)
+            for key, group in self._frame.groupby(self.KEY_COLUMNS, sort=False)
+        }
+        # Empty keys are stored as [fin_year, category, product_code, checked_at]
+        empty_checked = {
+            tuple(entry[:3]): datetime.fromisoformat(entry[3]) if len(entry) > 3 else None
+            for entry in self._meta['empty_keys']
+        }
+        for key in empty_checked:
+            index[key] = pd.DataFrame()
+        
+        self._index = index
+        self._empty_checked = empty_checked
+        # Product codes are unique across categories, so a product lookup may omit the category
+        self._by_product = {(key[0], key[2]): key for key in index if key[2] != 'All'}
+    
+    def load(self) -> bool:
+        """Load the Parquet copy, if any"""
+        if not (os.path.exists(self.data_path) and os.path.exists(self.meta_path)):
+            return False
+        
+        try:
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+            frame = pd.read_parquet(self.data_path)
+        except Exception as e:
+            print(f"DEBUG: Error loading local {self.NAME}: {e}")
+            return False
+        
+        with self._lock:
+            self._frame = frame
+            self._meta = meta
+            self._build_index()
+        print(f"✅ {self.NAME}: {len(self._index)} reports loaded from local warehouse")
+        return True
+    
+    def _retry_due(self, key: ApedaKey) -> bool:
+        """True for an empty report whose retry window has passed"""
+        if key not in self._empty_checked:
+            return False
+        checked_at = self._empty_checked[key]
+        return checked_at is None or datetime.now() - checked_at > self.empty_retry
+    
+    def lookup(self, fin_year: str, category: str, product_code: str) -> Optional[pd.DataFrame]:
+        """Stored report, or None if this combination has not been precomputed (or is due a retry)"""
+        key = (fin_year, category, product_code)
+        if key not in self._index and product_code != 'All':
+            key = self._by_product.get((fin_year, product_code))
+        if key is None or self._retry_due(key):
+            return None
+        return self._index.get(key)
+    
+    def has(self, key: ApedaKey) -> bool:
+        """True when this exact report is stored (an empty one only until its retry is due)"""
+        return key in self._index and not self._retry_due(key)
+    
+    def year_fetched_at(self, fin_year: str) -> Optional[datetime]:
+        """When fin_year was last warmed completely (None = never)"""
+        fetched_at = self._meta['years'].get(fin_year)
+        return datetime.fromisoformat(fetched_at) if fetched_at else None
+    
+    def update(self, reports: Dict[ApedaKey, pd.DataFrame], complete_years: List[str]):
+        """Replace the given reports, persist, and mark complete_years as fully warmed"""
+        with self._lock:
+            keys = set(reports)
+            replaced = pd.MultiIndex.from_frame(self._frame[self.KEY_COLUMNS]).isin(list(keys))
+            kept = self._frame[~replaced]
+            fresh = [df for df in reports.values() if len(df)]
+            frame = pd.concat([kept, *fresh], ignore_index=True) if fresh else kept.reset_index(drop=True)
+            
+            now = datetime.now().isoformat()
+            empty_keys = {tuple(entry[:3]): entry[3:] for entry in self._meta['empty_keys']}
+            empty_keys = {key: checked for key, checked in empty_keys.items() if key not in keys}
+            empty_keys.update({key: [now] for key, df in reports.items() if len(df) == 0})
+            
+            meta = {
+                'years': dict(self._meta['years']),
+                'empty_keys': sorted([*key, *checked] for key, checked in empty_keys.items()),
+                'rows': len(frame),
+                'updated_at': now
+            }
+            for fin_year in complete_years:
+                meta['years'][fin_year] = meta['updated_at']
+            
+            write_parquet_atomic(frame, self.data_path)
+            write_json_atomic(meta, self.meta_path)
+            
+            self._frame = frame
+            self._meta = meta
+            self._build_index()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Report count and warm-up metadata for the health endpoint"""
+        return {
+            'reports': len(self._index),
+            'rows': len(self._frame),
+            'years': self._meta['years'],
+            'updated_at': self._meta.get('updated_at')
+        }
+
+
+# Global instances shared by every DataQueryEngine
+historical_rainfall_store = HistoricalRainfallStore()
+daily_rainfall_store = DailyRainfallStore()
+apeda_production_store = ApedaProductionStore()
@@ -1,4 +1,10 @@
 """API models module"""
-from .api_models import QueryRequest, QueryResponse, HealthResponse
+from .api_models import (
+    QueryRequest, QueryResponse, HealthResponse,
+    BatchQueryRequest, BatchQueryItem, BatchQueryResponse
+)
 
-__all__ = ['QueryRequest', 'QueryResponse', 'HealthResponse']
+__all__ = [
+    'QueryRequest', 'QueryResponse', 'HealthResponse',
+    'BatchQueryRequest', 'BatchQueryItem', 'BatchQueryResponse'
+]
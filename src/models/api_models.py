@@ -1,5 +1,5 @@
 """Pydantic models for API requests and responses"""
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 
 
@@ -25,6 +25,45 @@ class QueryResponse(BaseModel):
     raw_results: Dict[str, Any]
 
 
+class BatchQueryRequest(BaseModel):
+    """Request model for batch query endpoint"""
+    questions: List[str] = Field(..., min_length=1)
+    api_key: Optional[str] = None
+    max_concurrency: Optional[int] = Field(None, ge=1)
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "questions": [
+                    "What is the rice production in Punjab for 2022?",
+                    "What was the rainfall in Kerala in 2020?"
+                ],
+                "max_concurrency": 4
+            }
+        }
+
+
+class BatchQueryItem(BaseModel):
+    """Result for one question of a batch; status is cached, ok or error"""
+    index: int
+    question: str
+    status: str
+    answer: Optional[str] = None
+    data_sources: List[Dict[str, Any]] = []
+    query_params: Dict[str, Any] = {}
+    raw_results: Dict[str, Any] = {}
+    error: Optional[str] = None
+
+
+class BatchQueryResponse(BaseModel):
+    """Response model for batch query endpoint (results in request order)"""
+    total: int
+    cached: int
+    succeeded: int
+    failed: int
+    results: List[BatchQueryItem]
+
+
 class HealthResponse(BaseModel):
     """Response model for health check endpoint"""
     status: str
@@ -34,3 +73,9 @@ class HealthResponse(BaseModel):
     rainfall_records: int
     mongodb_connected: bool = False
     cache_stats: Optional[Dict[str, Any]] = None
+    coalescing_stats: Optional[Dict[str, Any]] = None
+    data_cache_stats: Optional[Dict[str, Any]] = None
+    snapshot: Optional[Dict[str, Any]] = None
+    upstream_rate_limits: Optional[Dict[str, Any]] = None
+    circuit_breakers: Optional[Dict[str, Any]] = None
+    warehouse_stats: Optional[Dict[str, Any]] = None
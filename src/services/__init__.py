@@ -1,6 +1,21 @@
 """Services module"""
-from .data_integration import DataGovIntegration
+from .data_integration import DataGovIntegration, AsyncDataGovIntegration
+from .http_client import PooledHTTPClient, http_client
+from .circuit_breaker import CircuitBreaker, CircuitOpenError, circuit_breakers
+from .rate_limiter import HostRateLimiter, request_priority, as_prefetch, INTERACTIVE, PREFETCH
+from .http_cache import ResponseCache, response_cache
+from .product_catalog import ProductCatalog, product_catalog
 from .ai_models import QueryRouter, QueryProcessor
 from .query_engine import DataQueryEngine
+from .single_flight import SingleFlight
+from .rainfall_ingest import DailyRainfallIngestor
+from .apeda_warmup import ApedaWarmup
+from .crop_index import CropIndex
+from .aggregate_cubes import AggregateCubes
+from .sql_engine import SQLQueryEngine, DUCKDB_AVAILABLE
+from .result_shaper import ResultShaper, result_shaper
+from .correlation import RainfallCorrelation, rainfall_correlation
+from .rainfall_trends import RainfallTrends, rainfall_trends
+from .snapshot import DataSnapshot, SnapshotManager
 
-__all__ = ['DataGovIntegration', 'QueryRouter', 'QueryProcessor', 'DataQueryEngine']
+__all__ = ['DataGovIntegration', 'AsyncDataGovIntegration', 'PooledHTTPClient', 'http_client', 'CircuitBreaker', 'CircuitOpenError', 'circuit_breakers', 'HostRateLimiter', 'request_priority', 'as_prefetch', 'INTERACTIVE', 'PREFETCH', 'ResponseCache', 'response_cache', 'ProductCatalog', 'product_catalog', 'QueryRouter', 'QueryProcessor', 'DataQueryEngine', 'SingleFlight', 'DailyRainfallIngestor', 'ApedaWarmup', 'CropIndex', 'AggregateCubes', 'SQLQueryEngine', 'DUCKDB_AVAILABLE', 'ResultShaper', 'result_shaper', 'RainfallCorrelation', 'rainfall_correlation', 'RainfallTrends', 'rainfall_trends', 'DataSnapshot', 'SnapshotManager']
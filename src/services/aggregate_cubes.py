@@ -0,0 +1,310 @@
+"""Materialized rollups of the snapshot datasets for top/average queries"""
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def _normalize(series: pd.Series) -> pd.Series:
+    """Key form of a name column: stripped and lowercased"""
+    return series.astype(str).str.strip().str.lower()
+
+
+def _partition_hashes(df: pd.DataFrame, keys: pd.Series) -> Dict[str, tuple]:
+    """Order-independent content hash (row-hash sum, row count) per partition key"""
+    if df.empty:
+        return {}
+    row_hashes = pd.Series(pd.util.hash_pandas_object(df, index=False).to_numpy(), index=df.index)
+    grouped = row_hashes.groupby(keys.to_numpy())
+    # uint64 sums wrap around, which is fine for change detection
+    totals, counts = grouped.sum(), grouped.size()
+    return {key: (int(totals[key]), int(counts[key])) for key in totals.index}
+
+
+class AggregateCubes:
+    """
+    Sums and non-null counts per cell of three cubes, built once per data
+    snapshot and partitioned by (normalized) state:
+
+        state x crop x start year      (Production, Area)
+        district x crop x start year   (Production, Area)
+        state x year rainfall          (Annual_Rainfall, Monsoon_Rainfall)
+
+    Means are sum / count over the selected cells, so they equal a mean over
+    the raw rows. When built with the previous snapshot's cubes, partitions
+    whose rows hash the same are reused and only changed states are rolled up.
+    """
+    
+    CROP_MEASURES = ['Production', 'Area']
+    RAINFALL_MEASURES = ['Annual_Rainfall', 'Monsoon_Rainfall']
+    
+    def __init__(self, crop_df: pd.DataFrame, rainfall_df: pd.DataFrame,
+                 previous: Optional['AggregateCubes'] = None):
+        self.rebuilt_partitions = 0
+        self.reused_partitions = 0
+        
+        crop = self._crop_keys(crop_df)
+        self.crop_hashes = _partition_hashes(crop_df, crop['_state']) if crop is not None else {}
+        changed = self._changed(self.crop_hashes, previous.crop_hashes if previous else {})
+        self.state_crop_year = self._rollup(
+            crop, changed, ['_state', '_crop', '_year'], ['State_Name', 'Crop'], self.CROP_MEASURES,
+            previous.state_crop_year if previous else {}
+        )
+        self.district_crop_year = self._rollup(
+            crop, changed, ['_state', '_district', '_crop', '_year'], ['State_Name', 'District_Name', 'Crop'],
+            self.CROP_MEASURES, previous.district_crop_year if previous else {}
+        )
+        
+        rainfall = self._rainfall_keys(rainfall_df)
+        self.rainfall_hashes = _partition_hashes(rainfall_df, rainfall['_state']) if rainfall is not None else {}
+        changed = self._changed(self.rainfall_hashes, previous.rainfall_hashes if previous else {})
+        self.rainfall_state_year = self._rollup(
+            rainfall, changed, ['_state', 'Year'], ['State'], self.RAINFALL_MEASURES,
+            previous.rainfall_state_year if previous else {}
+        )
+        
+        # Query-side copies: every partition in one integer-coded array per column
+        self.state_cube = _FlatCube(
+            self.state_crop_year, {'_state': 'State_Name', '_crop': 'Crop', '_year': None}, self.CROP_MEASURES
+        )
+        self.district_cube = _FlatCube(
+            self.district_crop_year,
+            {'_state': 'State_Name', '_district': 'District_Name', '_crop': 'Crop', '_year': None},
+            self.CROP_MEASURES
+        )
+        self.rainfall_cube = _FlatCube(
+            self.rainfall_state_year, {'_state': 'State', 'Year': None}, self.RAINFALL_MEASURES
+        )
+    
+    @staticmethod
+    def _crop_keys(df: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """Normalized key columns next to the display names and measures"""
+        needed = {'State_Name', 'District_Name', 'Crop', 'Crop_Year', 'Production', 'Area'}
+        if df is None or not needed <= set(df.columns):
+            return None
+        return pd.DataFrame({
+            '_state': _normalize(df['State_Name']),
+            '_district': _normalize(df['District_Name']),
+            '_crop': _normalize(df['Crop']),
+            '_year': pd.to_numeric(df['Crop_Year'].astype(str).str[:4], errors='coerce').fillna(0).astype(int),
+            'State_Name': df['State_Name'],
+            'District_Name': df['District_Name'],
+            'Crop': df['Crop'],
+            'Production': pd.to_numeric(df['Production'], errors='coerce'),
+            'Area': pd.to_numeric(df['Area'], errors='coerce')
+        })
+    
+    @staticmethod
+    def _rainfall_keys(df: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """Normalized state key next to the display name and measures"""
+        needed = {'State', 'Year', 'Annual_Rainfall', 'Monsoon_Rainfall'}
+        if df is None or not needed <= set(df.columns):
+            return None
+        return pd.DataFrame({
+            '_state': _normalize(df['State']),
+            'Year': pd.to_numeric(df['Year'], errors='coerce').fillna(0).astype(int),
+            'State': df['State'],
+            'Annual_Rainfall': pd.to_numeric(df['Annual_Rainfall'], errors='coerce'),
+            'Monsoon_Rainfall': pd.to_numeric(df['Monsoon_Rainfall'], errors='coerce')
+        })
+    
+    @staticmethod
+    def _changed(hashes: Dict[str, tuple], previous: Dict[str, tuple]) -> set:
+        """Partitions that are new or whose content hash differs"""
+        return {key for key, digest in hashes.items() if previous.get(key) != digest}
+    
+    def _rollup(self, rows: Optional[pd.DataFrame], changed: set, keys: List[str], labels: List[str],
+                measures: List[str], previous: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """Per-state cube partitions: reuse unchanged ones, group only the changed states"""
+        if rows is None:
+            return {}
+        
+        partitions = {state: previous[state] for state in set(rows['_state']) - changed if state in previous}
+        self.reused_partitions += len(partitions)
+        
+        todo = rows[~rows['_state'].isin(list(partitions))]
+        if len(todo):
+            aggregations = {label: (label, 'first') for label in labels}
+            for measure in measures:
+                aggregations[f"{measure}_sum"] = (measure, 'sum')
+                aggregations[f"{measure}_count"] = (measure, 'count')
+            cube = todo.groupby(keys, sort=False).agg(**aggregations).reset_index()
+            for state, partition in cube.groupby('_state', sort=False):
+                partitions[state] = partition.reset_index(drop=True)
+                self.rebuilt_partitions += 1
+        return partitions
+    
+    def top_crops(self, limit: int = 10, states: Optional[List[str]] = None, districts: Optional[List[str]] = None,
+                  crops: Optional[List[str]] = None, years: Optional[List[int]] = None) -> pd.DataFrame:
+        """Total Production per (State_Name, Crop) over the matching cells, largest first"""
+        cube = self.district_cube if districts else self.state_cube
+        mask = cube.mask({'_state': states, '_district': districts, '_crop': crops, '_year': years})
+        groups, totals = cube.totals(['_state', '_crop'], 'Production', mask)
+        order = np.argsort(-totals['sum'], kind='stable')[:limit]
+        return pd.DataFrame({
+            'State_Name': cube.labels['_state'][groups['_state'][order]],
+            'Crop': cube.labels['_crop'][groups['_crop'][order]],
+            'Production': totals['sum'][order]
+        })
+    
+    def crop_averages(self, states: Optional[List[str]] = None, districts: Optional[List[str]] = None,
+                      crops: Optional[List[str]] = None, years: Optional[List[int]] = None) -> pd.DataFrame:
+        """Mean Production and Area per State_Name over the matching rows"""
+        cube = self.district_cube if districts else self.state_cube
+        mask = cube.mask({'_state': states, '_district': districts, '_crop': crops, '_year': years})
+        return cube.means('_state', 'State_Name', self.CROP_MEASURES, mask)
+    
+    def rainfall_averages(self, states: Optional[List[str]] = None,
+                          years: Optional[List[int]] = None) -> Tuple[pd.DataFrame, List[int]]:
+        """Mean Annual and Monsoon rainfall per State, plus the years that contributed"""
+        cube = self.rainfall_cube
+        mask = cube.mask({'_state': states, 'Year': years})
+        year_values = cube.codes['Year'] if mask is None else cube.codes['Year'][mask]
+        return cube.means('_state', 'State', self.RAINFALL_MEASURES, mask), sorted(np.unique(year_values).tolist())
+    
+    def crop_year_cells(self, states: Optional[List[str]] = None, crops: Optional[List[str]] = None,
+                        years: Optional[List[int]] = None) -> pd.DataFrame:
+        """One row per (state, crop, start year) cell: normalized state key, labels and summed measures"""
+        cube = self.state_cube
+        mask = cube.mask({'_state': states, '_crop': crops, '_year': years})
+        rows = slice(None) if mask is None else mask
+        frame = pd.DataFrame({
+            'state': cube.keys('_state')[cube.codes['_state'][rows]],
+            'State_Name': cube.labels['_state'][cube.codes['_state'][rows]],
+            'Crop': cube.labels['_crop'][cube.codes['_crop'][rows]],
+            'Year': cube.codes['_year'][rows]
+        })
+        for measure in self.CROP_MEASURES:
+            counts = cube.counts[measure][rows]
+            frame[measure] = np.where(counts > 0, cube.sums[measure][rows], np.nan)
+        return frame[frame['Year'] > 0].reset_index(drop=True)
+    
+    def rainfall_year_cells(self, states: Optional[List[str]] = None) -> pd.DataFrame:
+        """One row per (state, year) cell: normalized state key and mean rainfall measures"""
+        cube = self.rainfall_cube
+        mask = cube.mask({'_state': states})
+        rows = slice(None) if mask is None else mask
+        frame = pd.DataFrame({
+            'state': cube.keys('_state')[cube.codes['_state'][rows]],
+            'Year': cube.codes['Year'][rows]
+        })
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for measure in self.RAINFALL_MEASURES:
+                counts = cube.counts[measure][rows]
+                frame[measure] = np.where(counts > 0, cube.sums[measure][rows] / counts, np.nan)
+        return frame
+    
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the per-state partitions and the flattened query copies"""
+        partitions = [
+            partition for cube in (self.state_crop_year, self.district_crop_year, self.rainfall_state_year)
+            for partition in cube.values()
+        ]
+        return int(
+            sum(partition.memory_usage(deep=True).sum() for partition in partitions)
+            + sum(cube.nbytes for cube in (self.state_cube, self.district_cube, self.rainfall_cube))
+        )
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Cube sizes and how much of the last build was reused"""
+        return {
+            'state_crop_year_cells': self.state_cube.size,
+            'district_crop_year_cells': self.district_cube.size,
+            'rainfall_state_year_cells': self.rainfall_cube.size,
+            'rebuilt_partitions': self.rebuilt_partitions,
+            'reused_partitions': self.reused_partitions
+        }
+
+
+class _FlatCube:
+    """
+    One cube's partitions concatenated into numpy columns for querying: name
+    keys are integer codes (with a display label per code), numeric keys stay
+    as they are, and each measure keeps its per-cell sum and non-null count.
+    """
+    
+    def __init__(self, partitions: Dict[str, pd.DataFrame], keys: Dict[str, Optional[str]], measures: List[str]):
+        cells = pd.concat(list(partitions.values()), ignore_index=True) if partitions else None
+        self.size = 0 if cells is None else len(cells)
+        self.codes: Dict[str, np.ndarray] = {}
+        self.lookup: Dict[str, Dict[Any, int]] = {}
+        self.labels: Dict[str, np.ndarray] = {}
+        self.sums: Dict[str, np.ndarray] = {}
+        self.counts: Dict[str, np.ndarray] = {}
+        
+        for key, label in keys.items():
+            values = cells[key] if cells is not None else pd.Series([], dtype=object)
+            if label is None:  # Numeric key
+                self.codes[key] = values.to_numpy(dtype=np.int64)
+                continue
+            codes, uniques = pd.factorize(values)
+            self.codes[key] = codes
+            self.lookup[key] = {value: code for code, value in enumerate(uniques)}
+            self.labels[key] = (
+                cells[label].groupby(codes).first().to_numpy(dtype=object) if cells is not None
+                else np.array([], dtype=object)
+            )
+        
+        for measure in measures:
+            self.sums[measure] = cells[f"{measure}_sum"].to_numpy(dtype=float) if cells is not None else np.zeros(0)
+            self.counts[measure] = cells[f"{measure}_count"].to_numpy(dtype=float) if cells is not None else np.zeros(0)
+    
+    def keys(self, key: str) -> np.ndarray:
+        """Normalized key per code (the inverse of lookup)"""
+        keys = np.empty(len(self.labels[key]), dtype=object)
+        for name, code in self.lookup[key].items():
+            keys[code] = name
+        return keys
+    
+    @property
+    def nbytes(self) -> int:
+        """Bytes of the code, label, sum and count arrays"""
+        arrays = [*self.codes.values(), *self.labels.values(), *self.sums.values(), *self.counts.values()]
+        return int(sum(array.nbytes for array in arrays))
+    
+    def mask(self, filters: Dict[str, Optional[list]]) -> Optional[np.ndarray]:
+        """Boolean cell mask for the non-empty filters (None = every cell)"""
+        mask = None
+        for key, values in filters.items():
+            if not values or key not in self.codes:
+                continue
+            if key in self.lookup:
+                lookup = self.lookup[key]
+                wanted = [lookup[name] for name in (str(v).strip().lower() for v in values) if name in lookup]
+            else:
+                wanted = [int(v) for v in values]
+            column = np.isin(self.codes[key], wanted)
+            mask = column if mask is None else mask & column
+        return mask
+    
+    def totals(self, by: List[str], measure: str, mask: Optional[np.ndarray]) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+        """Sum and count of a measure per combination of coded keys present under the mask"""
+        widths = [len(self.labels[key]) for key in by]
+        group = np.zeros(self.size, dtype=np.int64)
+        for key, width in zip(by, widths):
+            group = group * width + self.codes[key]
+        if mask is not None:
+            group = group[mask]
+        
+        size = int(np.prod(widths)) if widths else 0
+        sums = np.bincount(group, weights=self.sums[measure] if mask is None else self.sums[measure][mask], minlength=size)
+        counts = np.bincount(group, weights=self.counts[measure] if mask is None else self.counts[measure][mask], minlength=size)
+        present = np.flatnonzero(np.bincount(group, minlength=size))
+        
+        groups = {}
+        remainder = present
+        for key, width in zip(reversed(by), reversed(widths)):
+            remainder, groups[key] = np.divmod(remainder, width)
+        return groups, {'sum': sums[present], 'count': counts[present]}
+    
+    def means(self, key: str, label: str, measures: List[str], mask: Optional[np.ndarray]) -> pd.DataFrame:
+        """Per-key mean (sum / count) of each measure, sorted by label like a groupby"""
+        result = None
+        for measure in measures:
+            groups, totals = self.totals([key], measure, mask)
+            if result is None:
+                result = pd.DataFrame({label: self.labels[key][groups[key]]})
+            with np.errstate(invalid='ignore', divide='ignore'):
+                result[measure] = np.where(totals['count'] > 0, totals['sum'] / totals['count'], np.nan)
+        return result.sort_values(label).reset_index(drop=True)
@@ -0,0 +1,112 @@
+"""Background warm-up of APEDA production reports into the local warehouse"""
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from config.settings import settings
+from database.warehouse import ApedaProductionStore, apeda_production_store
+from .data_integration import AsyncDataGovIntegration
+from .product_catalog import ProductCatalog, product_catalog
+
+
+class ApedaWarmup:
+    """
+    Precomputes every (financial year x category) report, including category
+    'All' (query_apeda's and the agent tool's default), plus one report per
+    catalog product (APEDA's product_code=All only returns category totals),
+    so fetch_apeda_data can answer from the local store. Closed financial
+    years are fetched once; open ones are re-warmed on the apeda_open_year TTL.
+    Reports that came back empty are retried after APEDA_EMPTY_RETRY_HOURS.
+    """
+    
+    def __init__(self, data_gov: AsyncDataGovIntegration, store: ApedaProductionStore = apeda_production_store,
+                 catalog: ProductCatalog = product_catalog):
+        self.data_gov = data_gov
+        self.store = store
+        self.catalog = catalog
+        self.years = settings.APEDA_WARMUP_YEARS
+        self.status = 'idle'
+        self.progress: Dict[str, int] = {}
+        self.last_error: Optional[str] = None
+    
+    def _reports(self) -> List[Tuple[str, str]]:
+        """(category, product_code) pairs to precompute: the default 'All' report, then Agri first"""
+        categories = sorted(self.data_gov.APEDA_CATEGORIES, key=lambda category: category != 'Agri')
+        reports = [('All', 'All')] + [(category, 'All') for category in categories]
+        if settings.APEDA_WARMUP_PRODUCTS:
+            products = sorted(self.catalog.products.items(), key=lambda item: item[1].get('category') != 'Agri')
+            reports += [(info['category'], code) for code, info in products]
+        return reports
+    
+    def _year_is_fresh(self, fin_year: str) -> bool:
+        """Closed years never change; open ones go stale after the apeda_open_year TTL"""
+        fetched_at = self.store.year_fetched_at(fin_year)
+        if fetched_at is None:
+            return False
+        if self.data_gov._apeda_ttl_name(fin_year) == 'apeda_closed_year':
+            return True
+        return datetime.now() - fetched_at < timedelta(hours=settings.HTTP_CACHE_TTL_HOURS['apeda_open_year'])
+    
+    async def _fetch(self, fin_year: str, category: str, product_code: str) -> Optional[pd.DataFrame]:
+        try:
+            return await self.data_gov.fetch_apeda_frame(fin_year, category, product_code)
+        except Exception as e:
+            print(f"DEBUG: APEDA warm-up {fin_year}/{category}/{product_code} failed: {e}")
+            return None
+    
+    async def warm_year(self, fin_year: str) -> int:
+        """Fetch the missing (or, for a stale open year, all) reports of one year; returns failures"""
+        reports = self._reports()
+        full_pass = not self._year_is_fresh(fin_year)
+        if not full_pass:
+            reports = [(category, code) for category, code in reports
+                       if not self.store.has((fin_year, category, code))]
+        if not reports:
+            return 0
+        
+        print(f"📥 APEDA warm-up {fin_year}: {len(reports)} reports")
+        frames = await asyncio.gather(*[self._fetch(fin_year, category, code) for category, code in reports])
+        fetched = {
+            (fin_year, category, code): df
+            for (category, code), df in zip(reports, frames) if df is not None
+        }
+        failed = len(reports) - len(fetched)
+        
+        if fetched:
+            # A year only counts as warmed once a full pass made it without failures
+            await asyncio.to_thread(self.store.update, fetched, [fin_year] if full_pass and not failed else [])
+        self.progress[fin_year] = len(fetched)
+        print(f"✅ APEDA warm-up {fin_year}: {len(fetched)} reports stored"
+              + (f", {failed} failed" if failed else ""))
+        return failed
+    
+    async def run(self):
+        """Background job: warm every configured year, then re-check hourly"""
+        while True:
+            self.status = 'warming'
+            failed = 0
+            for fin_year in self.years:
+                try:
+                    failed += await self.warm_year(fin_year)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    failed += 1
+                    self.last_error = str(e)
+                    print(f"❌ APEDA warm-up {fin_year} failed: {e}")
+            
+            self.status = 'idle' if not failed else 'partial'
+            if not failed:
+                self.last_error = None
+            await asyncio.sleep(3600)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Job status plus store metadata for the health endpoint"""
+        return {
+            'status': self.status,
+            'progress': self.progress,
+            'last_error': self.last_error,
+            **self.store.get_stats()
+        }
@@ -0,0 +1,149 @@
+"""Per-upstream circuit breakers so a dead dependency fails fast instead of timing out"""
+import asyncio
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from config.settings import settings
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures; while open, calls are
+    rejected immediately. Once reset_seconds have passed one trial call (or a
+    background probe) is let through half-open: success closes the breaker,
+    failure re-opens it for another reset_seconds.
+    """
+    
+    def __init__(self, name: str, host: str, probe_url: str,
+                 failure_threshold: int = 5, reset_seconds: float = 30):
+        self.name = name
+        self.host = host
+        self.probe_url = probe_url
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._next_trial_at = 0.0
+        self.rejected = 0
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+    
+    def allow(self) -> bool:
+        """Whether a call may go out now (the first caller after reset_seconds becomes the trial)"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            now = time.monotonic()
+            if now >= self._next_trial_at:
+                # A trial that never reports back is replaced after another reset_seconds
+                self.state = HALF_OPEN
+                self._next_trial_at = now + self.reset_seconds
+                return True
+            self.rejected += 1
+            return False
+    
+    def check(self):
+        """Raise CircuitOpenError unless a call may go out now"""
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} is unavailable (circuit open), skipping call")
+    
+    def record_success(self):
+        """Any successful call closes the breaker"""
+        with self._lock:
+            if self.state != CLOSED:
+                print(f"✅ Circuit {self.name} closed")
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self.opened_at = None
+    
+    def record_failure(self, error: Any = None):
+        """Count a failure; open at the threshold, or straight away if it was the half-open trial"""
+        with self._lock:
+            self.consecutive_failures += 1
+            self.last_error = str(error) if error is not None else None
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    print(f"⚠️ Circuit {self.name} opened after {self.consecutive_failures} failures: {error}")
+                if self.state == CLOSED:
+                    self.opened_at = time.monotonic()
+                self.state = OPEN
+                self._next_trial_at = time.monotonic() + self.reset_seconds
+    
+    def due_for_probe(self) -> bool:
+        """Open long enough that a half-open probe should run"""
+        return self.state == OPEN and time.monotonic() >= self._next_trial_at
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """State for the health endpoint"""
+        return {
+            'state': self.state,
+            'consecutive_failures': self.consecutive_failures,
+            'open_for_seconds': round(time.monotonic() - self.opened_at, 1) if self.opened_at else None,
+            'rejected': self.rejected,
+            'last_error': self.last_error
+        }
+
+
+class CircuitBreakerRegistry:
+    """The breakers of every upstream, looked up by name or by host"""
+    
+    def __init__(self, breakers: Dict[str, CircuitBreaker]):
+        self.breakers = breakers
+        self._by_host = {breaker.host: breaker for breaker in breakers.values()}
+    
+    def get(self, name: str) -> CircuitBreaker:
+        """Breaker by upstream name (apeda, data_gov, google_cse, chroma_cloud)"""
+        return self.breakers[name]
+    
+    def for_host(self, host: str) -> Optional[CircuitBreaker]:
+        """Breaker guarding a host, if it has one"""
+        return self._by_host.get(host)
+    
+    async def probe(self, breaker: CircuitBreaker):
+        """Half-open probe through the pooled client, which records the outcome on the breaker"""
+        from .http_client import http_client
+        
+        try:
+            await http_client.request("GET", breaker.probe_url, timeout=5)
+        except Exception as e:
+            print(f"DEBUG: Circuit {breaker.name} probe failed: {e}")
+    
+    async def run_prober(self, interval_seconds: float = 5):
+        """Background job: probe open breakers so user requests never pay for the trial"""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            due = [breaker for breaker in self.breakers.values() if breaker.due_for_probe()]
+            if due:
+                await asyncio.gather(*[self.probe(breaker) for breaker in due])
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Every breaker's state for the health endpoint"""
+        return {name: breaker.get_stats() for name, breaker in self.breakers.items()}
+
+
+def _breaker(name: str, host: str, probe_url: str) -> CircuitBreaker:
+    return CircuitBreaker(
+        name, host, probe_url,
+        failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+        reset_seconds=settings.CIRCUIT_RESET_SECONDS
+    )
+
+
+# Global registry shared by the HTTP client and the agent tools
+circuit_breakers = CircuitBreakerRegistry({
+    'apeda': _breaker('apeda', 'agriexchange.apeda.gov.in', 'https://agriexchange.apeda.gov.in/'),
+    'data_gov': _breaker('data_gov', 'api.data.gov.in', 'https://api.data.gov.in/'),
+    'google_cse': _breaker('google_cse', 'customsearch.googleapis.com',
+                           'https://customsearch.googleapis.com/$discovery/rest?version=v1'),
+    'chroma_cloud': _breaker('chroma_cloud', 'api.trychroma.com', 'https://api.trychroma.com/api/v2/heartbeat')
+})
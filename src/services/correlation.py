@@ -0,0 +1,172 @@
+"""Vectorized rainfall vs crop production correlation statistics"""
+import math
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def _pearson(x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Row-wise Pearson r and sample size over the positions where both are finite"""
+    valid = np.isfinite(x) & np.isfinite(y)
+    n = valid.sum(axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mx = np.where(valid, x, 0).sum(axis=-1, keepdims=True) / n[..., None]
+        my = np.where(valid, y, 0).sum(axis=-1, keepdims=True) / n[..., None]
+        dx = np.where(valid, x - mx, 0)
+        dy = np.where(valid, y - my, 0)
+        r = (dx * dy).sum(axis=-1) / np.sqrt((dx * dx).sum(axis=-1) * (dy * dy).sum(axis=-1))
+    return r, n
+
+
+def _ranks(x: np.ndarray) -> np.ndarray:
+    """Row-wise average ranks of the finite values (NaN elsewhere)"""
+    flat = x.reshape(-1, x.shape[-1])
+    return pd.DataFrame(flat).rank(axis=1).to_numpy().reshape(x.shape)
+
+
+def _slope(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Row-wise OLS slope of y on x over the positions where both are finite"""
+    valid = np.isfinite(x) & np.isfinite(y)
+    n = valid.sum(axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        dx = np.where(valid, x - np.where(valid, x, 0).sum(axis=-1, keepdims=True) / n[..., None], 0)
+        dy = np.where(valid, y - np.where(valid, y, 0).sum(axis=-1, keepdims=True) / n[..., None], 0)
+        return (dx * dy).sum(axis=-1) / (dx * dx).sum(axis=-1)
+
+
+def _pooled(x: np.ndarray, y: np.ndarray) -> Optional[float]:
+    """Within-series Pearson r: every series demeaned, then all points pooled"""
+    valid = np.isfinite(x) & np.isfinite(y)
+    n = valid.sum(axis=-1, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        dx = np.where(valid, x - np.where(valid, x, 0).sum(axis=-1, keepdims=True) / n, 0)
+        dy = np.where(valid, y - np.where(valid, y, 0).sum(axis=-1, keepdims=True) / n, 0)
+        r = (dx * dy).sum() / math.sqrt((dx * dx).sum() * (dy * dy).sum())
+    return float(r) if np.isfinite(r) else None
+
+
+class RainfallCorrelation:
+    """
+    Aligns every (state, crop) production and yield series with its state's
+    rainfall by year, as (metric x series x year) matrices, and computes all
+    statistics for all series in one NumPy pass:
+
+        Pearson r with a 95% Fisher-z interval, Spearman rho,
+        lagged Pearson r (rainfall of year t - lag against output of year t),
+        elasticity: OLS slope of log output on log rainfall.
+
+    Series with fewer than MIN_YEARS overlapping years are left out.
+    """
+    
+    METRICS = ['Production', 'Yield']
+    MIN_YEARS = 4
+    
+    def __init__(self, lags: Tuple[int, ...] = (1,)):
+        self.lags = lags
+    
+    @staticmethod
+    def _interval(r: np.ndarray, n: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            z = np.arctanh(np.clip(r, -0.999999, 0.999999))
+            se = 1 / np.sqrt(n - 3)
+            return np.tanh(z - 1.96 * se), np.tanh(z + 1.96 * se)
+    
+    @staticmethod
+    def _metric_summary(table: pd.DataFrame) -> Dict[str, Any]:
+        """Spread of the per-series statistics of one metric"""
+        if table.empty:
+            return {'series': 0}
+        significant = (table['Pearson_CI_Low'] > 0) | (table['Pearson_CI_High'] < 0)
+        return {
+            'series': int(len(table)),
+            'median_pearson': float(table['Pearson'].median()),
+            'positive_share': float((table['Pearson'] > 0).mean()),
+            'significant_share': float(significant.mean()),
+            'median_elasticity': float(table['Elasticity'].median())
+        }
+    
+    def compute(self, crop: pd.DataFrame, rainfall: pd.DataFrame,
+                rainfall_measure: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        crop: state, State_Name, Crop, Year, Production, Area (one row per cell)
+        rainfall: state, Year, <rainfall_measure> (one row per state and year)
+        Returns one row per (state, crop, metric), strongest first, and pooled statistics.
+        """
+        rainfall = rainfall.dropna(subset=[rainfall_measure])
+        crop = crop[crop['state'].isin(set(rainfall['state']))]
+        if crop.empty:
+            return pd.DataFrame(), {'series': 0, 'note': 'No overlapping crop and rainfall states'}
+        
+        # Year axis wide enough for the largest lag
+        max_lag = max(self.lags, default=0)
+        first_year = int(crop['Year'].min()) - max_lag
+        years = np.arange(first_year, int(crop['Year'].max()) + 1)
+        
+        series, keys = pd.factorize(crop['state'] + '\x1f' + crop['Crop'].astype(str))
+        first_rows = crop.iloc[np.unique(series, return_index=True)[1]]
+        year_pos = crop['Year'].to_numpy() - first_year
+        output = np.full((len(self.METRICS), len(keys), len(years)), np.nan)
+        output[0, series, year_pos] = crop['Production'].to_numpy(dtype=float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            output[1, series, year_pos] = (crop['Production'] / crop['Area']).replace([np.inf, -np.inf], np.nan).to_numpy(dtype=float)
+        
+        states, state_codes = pd.factorize(rainfall['state'])
+        in_range = (rainfall['Year'] >= first_year) & (rainfall['Year'] <= years[-1])
+        rain_by_state = np.full((len(state_codes), len(years)), np.nan)
+        rain_by_state[states[in_range.to_numpy()], rainfall['Year'][in_range].to_numpy() - first_year] = \
+            rainfall[rainfall_measure][in_range].to_numpy(dtype=float)
+        series_state = pd.Index(state_codes).get_indexer(first_rows['state'])
+        rain = rain_by_state[series_state]
+        
+        # Output years are the ones past the lag margin
+        out = output[..., max_lag:]
+        rain_now = np.broadcast_to(rain[:, max_lag:], out.shape)
+        
+        pearson, n = _pearson(out, rain_now)
+        joint = np.where(np.isfinite(out) & np.isfinite(rain_now), 1.0, np.nan)
+        spearman, _ = _pearson(_ranks(out * joint), _ranks(rain_now * joint))
+        low, high = self._interval(pearson, n)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            log_out = np.log(np.where(out > 0, out, np.nan))
+            log_rain = np.log(np.where(rain_now > 0, rain_now, np.nan))
+        elasticity = _slope(log_rain, log_out)
+        
+        lagged = {}
+        for lag in self.lags:
+            rain_lag = np.broadcast_to(rain[:, max_lag - lag:rain.shape[1] - lag], out.shape)
+            lagged[lag] = (_pearson(out, rain_lag)[0], rain_lag)
+        
+        rows = []
+        for m, metric in enumerate(self.METRICS):
+            frame = pd.DataFrame({
+                'State': first_rows['State_Name'].to_numpy(),
+                'Crop': first_rows['Crop'].to_numpy(),
+                'Metric': metric,
+                'Years': n[m],
+                'Pearson': pearson[m],
+                'Pearson_CI_Low': low[m],
+                'Pearson_CI_High': high[m],
+                'Spearman': spearman[m],
+                **{f"Lag{lag}_Pearson": lagged[lag][0][m] for lag in self.lags},
+                'Elasticity': elasticity[m]
+            })
+            rows.append(frame[(frame['Years'] >= self.MIN_YEARS) & frame['Pearson'].notna()])
+        table = pd.concat(rows, ignore_index=True)
+        table = table.iloc[np.argsort(-table['Pearson'].abs().to_numpy(), kind='stable')].reset_index(drop=True)
+        
+        summary: Dict[str, Any] = {'series': int(len(table)), 'rainfall_measure': rainfall_measure}
+        for m, metric in enumerate(self.METRICS):
+            # Pool only the series that made it into the table, so the pooled r is backed by them
+            kept = (n[m] >= self.MIN_YEARS) & np.isfinite(pearson[m])
+            pooled = {'pooled_pearson': _pooled(out[m][kept], rain_now[m][kept]) if kept.any() else None}
+            pooled.update({
+                f"pooled_lag{lag}_pearson": _pooled(out[m][kept], lagged[lag][1][m][kept]) if kept.any() else None
+                for lag in self.lags
+            })
+            summary[metric] = {**self._metric_summary(table[table['Metric'] == metric]), **pooled}
+        return table, summary
+
+
+# Global instance used by DataQueryEngine for comparison_type "correlation"
+rainfall_correlation = RainfallCorrelation()
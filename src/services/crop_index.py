@@ -0,0 +1,128 @@
+"""Dictionary-encoded crop production columns with per-value bitmap indexes"""
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class CropIndex:
+    """
+    Built once per data snapshot. Each filterable column is dictionary-encoded
+    (lowercased, stripped value -> integer code) and every distinct value gets
+    a packed bitmap of the rows holding it, as does every Crop_Year start year.
+    A query ORs the bitmaps of the requested values per column, ANDs the
+    columns together and materializes only the matching rows.
+    """
+    
+    # Query parameter -> crop frame column
+    COLUMNS = {
+        'states': 'State_Name',
+        'districts': 'District_Name',
+        'crops': 'Crop',
+        'seasons': 'Season'
+    }
+    
+    def __init__(self, df: pd.DataFrame):
+        self.frame = df
+        self.rows = len(df)
+        self.codes: Dict[str, np.ndarray] = {}
+        self.values: Dict[str, List[str]] = {}
+        self.bitmaps: Dict[str, Dict[Any, np.ndarray]] = {}
+        
+        for field, column in self.COLUMNS.items():
+            if column not in df.columns:
+                continue
+            normalized = df[column].astype(str).str.strip().str.lower()
+            codes, values = pd.factorize(normalized)
+            self.codes[field] = codes.astype(np.int32)
+            self.values[field] = list(values)
+            self.bitmaps[field] = {value: np.packbits(codes == code) for code, value in enumerate(values)}
+        
+        # Integer start year: '2014-15' -> 2014 (0 when unparseable)
+        if 'Crop_Year' in df.columns:
+            start_years = pd.to_numeric(df['Crop_Year'].astype(str).str[:4], errors='coerce').fillna(0)
+            self.start_year = start_years.to_numpy(dtype=np.int32)
+            self.bitmaps['years'] = {
+                int(year): np.packbits(self.start_year == year) for year in np.unique(self.start_year) if year
+            }
+            self.crop_years = sorted(df['Crop_Year'].astype(str).unique().tolist())
+        else:
+            self.start_year = np.zeros(self.rows, dtype=np.int32)
+            self.crop_years = []
+    
+    def _empty(self) -> np.ndarray:
+        return np.zeros((self.rows + 7) // 8, dtype=np.uint8)
+    
+    def match(self, **filters: Optional[Iterable[Any]]) -> Optional[np.ndarray]:
+        """Packed bitmap of rows matching every non-empty filter (None = no filter applied)
+
+        Keyword names are the COLUMNS keys plus 'years' (start years as ints).
+        """
+        mask = None
+        for field, wanted in filters.items():
+            if not wanted:
+                continue
+            bitmaps = self.bitmaps.get(field, {})
+            column_mask = self._empty()
+            for value in wanted:
+                key = int(value) if field == 'years' else str(value).strip().lower()
+                bitmap = bitmaps.get(key)
+                if bitmap is not None:
+                    np.bitwise_or(column_mask, bitmap, out=column_mask)
+            mask = column_mask if mask is None else np.bitwise_and(mask, column_mask, out=mask)
+        return mask
+    
+    @staticmethod
+    def intersect(mask: Optional[np.ndarray], other: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        """AND two match() results, where None means all rows"""
+        if mask is None:
+            return other
+        if other is None:
+            return mask
+        return np.bitwise_and(mask, other)
+    
+    def positions(self, mask: Optional[np.ndarray]) -> np.ndarray:
+        """Row positions set in a bitmap"""
+        if mask is None:
+            return np.arange(self.rows)
+        return np.flatnonzero(np.unpackbits(mask, count=self.rows))
+    
+    def start_years(self, mask: Optional[np.ndarray] = None) -> List[int]:
+        """Distinct start years among the matching rows"""
+        years = self.start_year if mask is None else self.start_year[self.positions(mask)]
+        return sorted(int(year) for year in np.unique(years) if year)
+    
+    def take(self, mask: Optional[np.ndarray]) -> pd.DataFrame:
+        """Materialize the matching rows (the full frame, uncopied, when nothing was filtered)"""
+        if mask is None:
+            return self.frame
+        return self.frame.take(self.positions(mask))
+    
+    def district_states(self) -> Dict[str, set]:
+        """district -> states it appears under (lowercased), from the codes"""
+        if 'districts' not in self.codes or 'states' not in self.codes:
+            return {}
+        
+        width = len(self.values['states'])
+        pairs = np.unique(self.codes['districts'].astype(np.int64) * width + self.codes['states'])
+        known: Dict[str, set] = {}
+        for pair in pairs:
+            district, state = divmod(int(pair), width)
+            known.setdefault(self.values['districts'][district], set()).add(self.values['states'][state])
+        return known
+    
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the codes, start years and bitmaps"""
+        return int(
+            sum(codes.nbytes for codes in self.codes.values()) + self.start_year.nbytes
+            + sum(bitmap.nbytes for bitmaps in self.bitmaps.values() for bitmap in bitmaps.values())
+        )
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Index size for the health endpoint"""
+        return {
+            'rows': self.rows,
+            'distinct_values': {field: len(bitmaps) for field, bitmaps in self.bitmaps.items()},
+            'bitmap_bytes': sum(bitmap.nbytes for bitmaps in self.bitmaps.values() for bitmap in bitmaps.values())
+        }
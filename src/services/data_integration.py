@@ -1,13 +1,20 @@
 """Data integration service for external APIs"""
-import requests
+import asyncio
+from datetime import datetime, timedelta
+import httpx
 import pandas as pd
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from config.settings import settings
+from database.warehouse import apeda_production_store
+from .http_client import http_client
+from .circuit_breaker import CircuitOpenError
+from .http_cache import response_cache, FOREVER
+from .product_catalog import product_catalog
 
 
-class DataGovIntegration:
-    """Handles data fetching from data.gov.in and APEDA"""
+class AsyncDataGovIntegration:
+    """Async data.gov.in and APEDA client on the shared pooled HTTP connection pool"""
     
     BASE_URL = "https://api.data.gov.in/resource"
     CROP_RESOURCE_ID = "35be999b-0208-4354-b557-f6ca9a5355de"
@@ -18,9 +25,363 @@ class DataGovIntegration:
     
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or settings.DATA_GOV_API_KEY
-        self.session = requests.Session()
-        self.use_real_api = settings.USE_REAL_API
         self._product_codes_cache = None  # Cache for product codes
+    
+    async def _request_json(self, method: str, url: str, ttl_name: Optional[str] = None,
+                            params: Optional[Dict[str, Any]] = None, payload: Optional[Any] = None,
+                            **kwargs) -> Any:
+        """HTTP call through the on-disk response cache (ttl_name None = bypass)
+        
+        Cache reads and writes (gzip + disk) run in a worker thread, off the shared event loop.
+        """
+        key = response_cache.make_key(method, url, params, payload)
+        if ttl_name:
+            cached = await asyncio.to_thread(response_cache.get, key)
+            if cached is not None:
+                print(f"DEBUG: Response cache hit ({ttl_name})")
+                return cached
+        
+        try:
+            response = await http_client.request(method, url, params=params, json=payload, **kwargs)
+            response.raise_for_status()
+        except (CircuitOpenError, httpx.TransportError, httpx.HTTPStatusError) as e:
+            # Upstream down or broken: an expired copy beats no answer
+            stale = await asyncio.to_thread(response_cache.get, key, allow_stale=True) if ttl_name else None
+            if stale is None:
+                raise
+            print(f"DEBUG: Serving stale cached response ({ttl_name}): {e}")
+            return stale
+        data = response.json()
+        
+        if ttl_name and data:  # Never pin an empty answer
+            ttl_hours = settings.HTTP_CACHE_TTL_HOURS[ttl_name]
+            await asyncio.to_thread(response_cache.set, key, data, FOREVER if ttl_hours is None else ttl_hours * 3600, url)
+        return data
+    
+    @staticmethod
+    def _apeda_ttl_name(fin_year: str) -> str:
+        """APEDA keeps revising a financial year for a while after it ends (31 March)"""
+        try:
+            end_year = int(fin_year.split('-')[0]) + 1
+        except ValueError:
+            return 'apeda_open_year'
+        closed = datetime.now() - datetime(end_year, 3, 31) > timedelta(days=365)
+        return 'apeda_closed_year' if closed else 'apeda_open_year'
+    
+    @staticmethod
+    def _daily_rainfall_ttl_name(year: Optional[int]) -> str:
+        if year and int(year) < datetime.now().year:
+            return 'daily_rainfall_closed_year'
+        return 'daily_rainfall_open_year'
+    
+    APEDA_CATEGORIES = ['Agri', 'Fruits', 'Vegetables', 'Spices', 'Plantations', 'Floriculture', 'LiveStock']
+    
+    async def fetch_category_products(self, category: str, use_cache: bool = True) -> Optional[Dict[str, dict]]:
+        """Products of one APEDA category ({code: {'name', 'category'}}), or None on failure"""
+        try:
+            data = await self._request_json(
+                "POST",
+                self.APEDA_PRODUCT_URL,
+                ttl_name='apeda_products' if use_cache else None,
+                payload={"Category": category},
+                headers={"Content-Type": "application/json"},
+                timeout=10
+            )
+        except Exception as e:
+            print(f"DEBUG: Error fetching product codes for {category}: {e}")
+            return None
+        
+        if not isinstance(data, list):
+            return None
+        
+        products = {}
+        for item in data:
+            code = item.get('product_code')
+            name = item.get('product_name')
+            if code and name:
+                products[code] = {
+                    'name': name.strip(),
+                    'category': category
+                }
+        print(f"DEBUG: Fetched {len(products)} products for {category}")
+        return products
+    
+    async def fetch_product_categories(self, use_cache: bool = True) -> Dict[str, Optional[Dict[str, dict]]]:
+        """All categories fetched concurrently; a failed category maps to None"""
+        results = await asyncio.gather(*[
+            self.fetch_category_products(category, use_cache) for category in self.APEDA_CATEGORIES
+        ])
+        return dict(zip(self.APEDA_CATEGORIES, results))
+    
+    async def fetch_product_codes(self, category: str = "Agri") -> dict:
+        """Fetch product codes from APEDA API
+        
+        Args:
+            category: One of ['Agri', 'Fruits', 'Vegetables', 'Spices', 'Plantations', 'Floriculture', 'LiveStock']
+            
+        Returns:
+            Dictionary mapping product_code to product_name
+        """
+        # Return cached data if available
+        if self._product_codes_cache is not None:
+            return self._product_codes_cache
+        
+        all_products = {}
+        failed = []
+        for cat, products in (await self.fetch_product_categories()).items():
+            if products is None:
+                failed.append(cat)
+            else:
+                all_products.update(products)
+        
+        # Keep partial results, but only memoize a complete catalog so failures get retried
+        if not failed:
+            self._product_codes_cache = all_products
+        print(f"DEBUG: Total {len(all_products)} product codes fetched"
+              + (f" (failed: {', '.join(failed)})" if failed else ""))
+        return all_products
+    
+    async def fetch_apeda_data(self, fin_year: str, category: str = "All", 
+                        product_code: str = "All", report_type: str = "1") -> pd.DataFrame:
+        """Fetch production data from APEDA API (2019-2024)"""
+        # Combinations precomputed by the warm-up job never touch the network
+        if report_type == "1":
+            local = apeda_production_store.lookup(fin_year, category, product_code)
+            if local is not None:
+                print(f"DEBUG: APEDA {fin_year}/{category}/{product_code} served from local warehouse")
+                return local.copy()
+        
+        try:
+            return await self.fetch_apeda_frame(fin_year, category, product_code, report_type)
+        except CircuitOpenError as e:
+            print(f"DEBUG: {e}")
+            return pd.DataFrame()
+        except Exception as e:
+            print(f"DEBUG: Error fetching APEDA data: {e}")
+            import traceback
+            traceback.print_exc()
+            return pd.DataFrame()
+    
+    async def fetch_apeda_frame(self, fin_year: str, category: str = "All",
+                                product_code: str = "All", report_type: str = "1") -> pd.DataFrame:
+        """One APEDA production report as a normalized frame; raises on network/HTTP errors"""
+        payload = {
+            "Category": category,
+            "Financial_Year": fin_year,
+            "product_code": product_code,
+            "ReportType": report_type
+        }
+        
+        print(f"DEBUG: fetch_apeda_data called with payload: {payload}")
+        
+        print(f"DEBUG: Making POST request to {self.APEDA_URL}")
+        data = await self._request_json(
+            "POST",
+            self.APEDA_URL,
+            ttl_name=self._apeda_ttl_name(fin_year),
+            payload=payload,
+            headers={"Content-Type": "application/json", "Accept": "application/json"},
+            timeout=30
+        )
+        
+        print(f"DEBUG: Response data type: {type(data)}, length: {len(data) if isinstance(data, list) else 'N/A'}")
+        
+        if isinstance(data, list) and len(data) > 0:
+            df = pd.DataFrame(data)
+            
+            # Normalize column names
+            rename_map = {}
+            for col in df.columns:
+                col_lower = col.lower().strip()
+                if col_lower.startswith("state"):
+                    rename_map[col] = "State"
+                elif "production" in col_lower:
+                    rename_map[col] = "Production"
+                elif "percent" in col_lower:
+                    rename_map[col] = "Percent_Share"
+            
+            if rename_map:
+                df = df.rename(columns=rename_map)
+            
+            df["Financial_Year"] = fin_year
+            df["Category"] = category
+            df["Product_Code"] = product_code
+            
+            if "Production" in df.columns:
+                df["Production"] = pd.to_numeric(df["Production"], errors="coerce")
+            
+            print(f"DEBUG: Returning DataFrame with {len(df)} rows")
+            return df
+        
+        print(f"DEBUG: No data returned from APEDA API (empty or invalid response)")
+        return pd.DataFrame()
+    
+    async def fetch_daily_rainfall(self, state: Optional[str] = None, 
+                           district: Optional[str] = None,
+                           year: Optional[int] = None, 
+                           limit: int = 100,
+                           offset: int = 0) -> pd.DataFrame:
+        """Fetch daily district-wise rainfall data (2019-2024)"""
+        df, _ = await self._fetch_daily_rainfall_page(state, district, year, limit, offset)
+        return df
+    
+    async def fetch_daily_rainfall_all(self, state: Optional[str] = None,
+                                       district: Optional[str] = None,
+                                       year: Optional[int] = None,
+                                       page_size: int = 1000,
+                                       max_rows: int = 5000) -> pd.DataFrame:
+        """Fetch every matching daily rainfall row (up to max_rows)
+        
+        The first page reports the total; the remaining pages are fetched in parallel.
+        df.attrs['total_rows'] holds the upstream total, so a caller can tell when
+        max_rows cut the result short.
+        """
+        first, total = await self._fetch_daily_rainfall_page(state, district, year, page_size, 0)
+        offsets = range(page_size, min(total, max_rows), page_size)
+        pages = await asyncio.gather(*[
+            self.fetch_daily_rainfall(state, district, year, page_size, offset) for offset in offsets
+        ])
+        
+        frames = [df for df in [first, *pages] if len(df) > 0]
+        if not frames:
+            return pd.DataFrame()
+        df = pd.concat(frames, ignore_index=True)
+        df.attrs['total_rows'] = max(total, len(df))
+        if total > len(df):
+            print(f"⚠️ Daily rainfall truncated at {len(df)} of {total} rows "
+                  f"(state={state}, district={district}, year={year}); raise DAILY_RAINFALL_MAX_ROWS")
+        return df
+    
+    async def _fetch_daily_rainfall_page(self, state: Optional[str], district: Optional[str],
+                                         year: Optional[int], limit: int,
+                                         offset: int) -> Tuple[pd.DataFrame, int]:
+        """One page of daily rainfall plus the total number of matching records"""
+        url = f"{self.BASE_URL}/{self.DAILY_RAINFALL_RESOURCE_ID}"
+        
+        params = {
+            'api-key': self.api_key,
+            'format': 'json',
+            'limit': limit,
+            'offset': offset
+        }
+        
+        if state:
+            params['filters[State]'] = state
+        if district:
+            params['filters[District]'] = district
+        if year:
+            params['filters[Year]'] = str(year)
+        
+        try:
+            data = await self._request_json(
+                "GET", url, ttl_name=self._daily_rainfall_ttl_name(year), params=params, timeout=30
+            )
+            
+            records = data.get('records', [])
+            total = int(data.get('total') or len(records))
+            if records:
+                df = pd.DataFrame(records)
+                
+                # Convert numeric columns
+                for col in ['Avg_rainfall', 'Year']:
+                    if col in df.columns:
+                        df[col] = pd.to_numeric(df[col], errors='coerce')
+                
+                return df, total
+            
+            return pd.DataFrame(), total
+        
+        except Exception as e:
+            print(f"DEBUG: Error fetching daily rainfall: {e}")
+            return pd.DataFrame(), 0
+    
+    async def fetch_records_page(self, resource_id: str, filters: Optional[Dict[str, Any]] = None,
+                                 limit: int = 1000, offset: int = 0) -> Tuple[List[dict], int]:
+        """One raw page of a data.gov.in resource plus its total record count (raises on failure)"""
+        params = {'api-key': self.api_key, 'format': 'json', 'limit': limit, 'offset': offset}
+        for field, value in (filters or {}).items():
+            params[f'filters[{field}]'] = str(value)
+        
+        response = await http_client.request("GET", f"{self.BASE_URL}/{resource_id}", params=params, timeout=60)
+        response.raise_for_status()
+        data = response.json()
+        return data.get('records', []), int(data.get('total') or 0)
+    
+    async def fetch_all_records(self, resource_id: str, filters: Optional[Dict[str, Any]] = None,
+                                page_size: int = 1000) -> List[dict]:
+        """Download every record of a data.gov.in resource (used for bulk ingestion)
+        
+        Unlike the query helpers this raises on failure or a short read, so a
+        partial download is never mistaken for the full dataset.
+        """
+        records, total = await self.fetch_records_page(resource_id, filters, page_size, 0)
+        pages = await asyncio.gather(*[
+            self.fetch_records_page(resource_id, filters, page_size, offset)
+            for offset in range(page_size, total, page_size)
+        ])
+        for page_records, _ in pages:
+            records.extend(page_records)
+        
+        if len(records) < total:
+            raise ValueError(f"Incomplete download of {resource_id}: {len(records)}/{total} records")
+        return records
+    
+    async def fetch_historical_rainfall(self, subdivision: Optional[str] = None,
+                                 year: Optional[int] = None,
+                                 limit: int = 100) -> pd.DataFrame:
+        """Fetch historical state-wise rainfall data (1901-2015)"""
+        url = f"{self.BASE_URL}/{self.HISTORICAL_RAINFALL_RESOURCE_ID}"
+        
+        params = {
+            'api-key': self.api_key,
+            'format': 'json',
+            'limit': limit
+        }
+        
+        if subdivision:
+            params['filters[subdivision]'] = subdivision
+        if year:
+            params['filters[year]'] = str(year)
+        
+        try:
+            data = await self._request_json("GET", url, ttl_name='historical_rainfall', params=params, timeout=30)
+            
+            records = data.get('records', [])
+            if records:
+                df = pd.DataFrame(records)
+                
+                # Convert numeric columns
+                for col in df.columns:
+                    if col not in ['subdivision']:
+                        df[col] = pd.to_numeric(df[col], errors='coerce')
+                
+                return df
+            
+            return pd.DataFrame()
+        
+        except Exception as e:
+            print(f"DEBUG: Error fetching historical rainfall: {e}")
+            return pd.DataFrame()
+
+
+class DataGovIntegration:
+    """Handles data fetching from data.gov.in and APEDA
+    
+    The API fetches are thin blocking wrappers over AsyncDataGovIntegration
+    (available as `self.aio` for async callers).
+    """
+    
+    BASE_URL = AsyncDataGovIntegration.BASE_URL
+    CROP_RESOURCE_ID = AsyncDataGovIntegration.CROP_RESOURCE_ID
+    DAILY_RAINFALL_RESOURCE_ID = AsyncDataGovIntegration.DAILY_RAINFALL_RESOURCE_ID
+    HISTORICAL_RAINFALL_RESOURCE_ID = AsyncDataGovIntegration.HISTORICAL_RAINFALL_RESOURCE_ID
+    APEDA_URL = AsyncDataGovIntegration.APEDA_URL
+    APEDA_PRODUCT_URL = AsyncDataGovIntegration.APEDA_PRODUCT_URL
+    
+    def __init__(self, api_key: Optional[str] = None):
+        self.api_key = api_key or settings.DATA_GOV_API_KEY
+        self.use_real_api = settings.USE_REAL_API
+        self.aio = AsyncDataGovIntegration(self.api_key)
         
     def fetch_crop_production_data(self) -> pd.DataFrame:
         """Fetch crop production dataset - tries real API first, falls back to sample data"""
@@ -69,7 +430,7 @@ class DataGovIntegration:
                         'filters[crop_year]': year
                     }
                     
-                    response = self.session.get(url, params=params, timeout=10)
+                    response = http_client.request_sync("GET", url, params=params, timeout=10)
                     
                     if response.status_code == 200:
                         data = response.json()
@@ -139,57 +500,11 @@ class DataGovIntegration:
         ]
     
     def fetch_product_codes(self, category: str = "Agri") -> dict:
-        """Fetch product codes from APEDA API
-        
-        Args:
-            category: One of ['Agri', 'Fruits', 'Vegetables', 'Spices', 'Plantations', 'Floriculture', 'LiveStock']
-            
-        Returns:
-            Dictionary mapping product_code to product_name
-        """
-        # Return cached data if available
-        if self._product_codes_cache is not None:
-            return self._product_codes_cache
-        
-        all_categories = ['Agri', 'Fruits', 'Vegetables', 'Spices', 'Plantations', 'Floriculture', 'LiveStock']
-        all_products = {}
-        
-        try:
-            for cat in all_categories:
-                print(f"DEBUG: Fetching product codes for category: {cat}")
-                response = self.session.post(
-                    self.APEDA_PRODUCT_URL,
-                    json={"Category": cat},
-                    headers={"Content-Type": "application/json"},
-                    timeout=10
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    if isinstance(data, list):
-                        for item in data:
-                            code = item.get('product_code')
-                            name = item.get('product_name')
-                            if code and name:
-                                all_products[code] = {
-                                    'name': name.strip(),
-                                    'category': cat
-                                }
-                        print(f"DEBUG: Fetched {len(data)} products for {cat}")
-            
-            # Cache the results
-            self._product_codes_cache = all_products
-            print(f"DEBUG: Total {len(all_products)} product codes cached")
-            return all_products
-            
-        except Exception as e:
-            print(f"DEBUG: Error fetching product codes: {e}")
-            import traceback
-            traceback.print_exc()
-            return {}
+        """Blocking wrapper for AsyncDataGovIntegration.fetch_product_codes"""
+        return http_client.run_sync(self.aio.fetch_product_codes(category))
     
     def find_product_code(self, crop_name: str) -> Optional[str]:
-        """Find product code for a crop name using fuzzy matching
+        """Find product code for a crop name using the indexed product catalog
         
         Args:
             crop_name: Name of the crop (e.g., 'rice', 'wheat', 'mango')
@@ -200,206 +515,38 @@ class DataGovIntegration:
         if not crop_name:
             return None
         
-        # Get all product codes
-        products = self.fetch_product_codes()
-        if not products:
-            return None
-        
-        crop_name_lower = crop_name.lower().strip()
-        
-        # Direct match
-        for code, info in products.items():
-            if info['name'].lower() == crop_name_lower:
-                print(f"DEBUG: Found exact match for '{crop_name}': {code} ({info['name']})")
-                return code
-        
-        # Partial match (crop name in product name or vice versa)
-        for code, info in products.items():
-            product_name_lower = info['name'].lower()
-            if crop_name_lower in product_name_lower or product_name_lower in crop_name_lower:
-                print(f"DEBUG: Found partial match for '{crop_name}': {code} ({info['name']})")
-                return code
-        
-        # Common aliases
-        aliases = {
-            'paddy': 'rice',
-            'basmati': 'rice',
-            'cotton': 'cotton',
-            'maize': 'maize',
-            'corn': 'maize',
-            'jowar': 'jowar',
-            'sorghum': 'jowar',
-            'bajra': 'bajra',
-            'pearl millet': 'bajra',
-            'gram': 'gram',
-            'chickpea': 'gram',
-            'chana': 'gram',
-            'arhar': 'tur (arhar)',
-            'tur': 'tur (arhar)',
-            'pigeon pea': 'tur (arhar)',
-            'masur': 'lentil (masur)',
-            'lentil': 'lentil (masur)',
-            'groundnut': 'groundnut',
-            'peanut': 'groundnut',
-            'rapeseed': 'rapeseed & mustard',
-            'mustard': 'rapeseed & mustard',
-            'sarson': 'rapeseed & mustard',
-            'soybean': 'soyabean',
-            'sugarcane': 'sugarcane',
-            'sunflower': 'sunflower',
-            'tobacco': 'tobacco'
-        }
+        # The catalog is persisted, so this only hits APEDA (one parallel round) on the very first run
+        if product_catalog.is_empty():
+            product_catalog.update_categories(http_client.run_sync(self.aio.fetch_product_categories()))
         
-        # Try alias matching
-        alias_name = aliases.get(crop_name_lower)
-        if alias_name:
-            for code, info in products.items():
-                if info['name'].lower() == alias_name or alias_name in info['name'].lower():
-                    print(f"DEBUG: Found alias match for '{crop_name}' -> '{alias_name}': {code} ({info['name']})")
-                    return code
-        
-        print(f"DEBUG: No product code found for '{crop_name}'")
-        return None
+        code = product_catalog.resolve(crop_name)
+        if code:
+            name = product_catalog.products.get(code, {}).get('name', crop_name)
+            print(f"DEBUG: Found product code for '{crop_name}': {code} ({name})")
+        else:
+            print(f"DEBUG: No product code found for '{crop_name}'")
+        return code
     
     def fetch_apeda_data(self, fin_year: str, category: str = "All", 
                         product_code: str = "All", report_type: str = "1") -> pd.DataFrame:
-        """Fetch production data from APEDA API (2019-2024)"""
-        payload = {
-            "Category": category,
-            "Financial_Year": fin_year,
-            "product_code": product_code,
-            "ReportType": report_type
-        }
-        
-        print(f"DEBUG: fetch_apeda_data called with payload: {payload}")
-        
-        try:
-            print(f"DEBUG: Making POST request to {self.APEDA_URL}")
-            response = self.session.post(
-                self.APEDA_URL,
-                json=payload,
-                headers={"Content-Type": "application/json", "Accept": "application/json"},
-                timeout=30
-            )
-            print(f"DEBUG: Response status code: {response.status_code}")
-            response.raise_for_status()
-            data = response.json()
-            
-            print(f"DEBUG: Response data type: {type(data)}, length: {len(data) if isinstance(data, list) else 'N/A'}")
-            
-            if isinstance(data, list) and len(data) > 0:
-                df = pd.DataFrame(data)
-                
-                # Normalize column names
-                rename_map = {}
-                for col in df.columns:
-                    col_lower = col.lower().strip()
-                    if col_lower.startswith("state"):
-                        rename_map[col] = "State"
-                    elif "production" in col_lower:
-                        rename_map[col] = "Production"
-                    elif "percent" in col_lower:
-                        rename_map[col] = "Percent_Share"
-                
-                if rename_map:
-                    df = df.rename(columns=rename_map)
-                
-                df["Financial_Year"] = fin_year
-                df["Category"] = category
-                df["Product_Code"] = product_code
-                
-                if "Production" in df.columns:
-                    df["Production"] = pd.to_numeric(df["Production"], errors="coerce")
-                
-                print(f"DEBUG: Returning DataFrame with {len(df)} rows")
-                return df
-            
-            print(f"DEBUG: No data returned from APEDA API (empty or invalid response)")
-            return pd.DataFrame()
-            
-        except Exception as e:
-            print(f"DEBUG: Error fetching APEDA data: {e}")
-            import traceback
-            traceback.print_exc()
-            return pd.DataFrame()
+        """Blocking wrapper for AsyncDataGovIntegration.fetch_apeda_data"""
+        return http_client.run_sync(self.aio.fetch_apeda_data(fin_year, category, product_code, report_type))
     
     def fetch_daily_rainfall(self, state: Optional[str] = None, 
                            district: Optional[str] = None,
                            year: Optional[int] = None, 
-                           limit: int = 100) -> pd.DataFrame:
-        """Fetch daily district-wise rainfall data (2019-2024)"""
-        url = f"{self.BASE_URL}/{self.DAILY_RAINFALL_RESOURCE_ID}"
-        
-        params = {
-            'api-key': self.api_key,
-            'format': 'json',
-            'limit': limit
-        }
-        
-        if state:
-            params['filters[State]'] = state
-        if district:
-            params['filters[District]'] = district
-        if year:
-            params['filters[Year]'] = str(year)
-        
-        try:
-            response = self.session.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-            
-            records = data.get('records', [])
-            if records:
-                df = pd.DataFrame(records)
-                
-                # Convert numeric columns
-                for col in ['Avg_rainfall', 'Year']:
-                    if col in df.columns:
-                        df[col] = pd.to_numeric(df[col], errors='coerce')
-                
-                return df
-            
-            return pd.DataFrame()
-            
-        except Exception as e:
-            print(f"DEBUG: Error fetching daily rainfall: {e}")
-            return pd.DataFrame()
+                           limit: int = 100,
+                           offset: int = 0) -> pd.DataFrame:
+        """Blocking wrapper for AsyncDataGovIntegration.fetch_daily_rainfall"""
+        return http_client.run_sync(self.aio.fetch_daily_rainfall(state, district, year, limit, offset))
+    
+    def fetch_all_records(self, resource_id: str, filters: Optional[Dict[str, Any]] = None,
+                          page_size: int = 1000) -> List[dict]:
+        """Blocking wrapper for AsyncDataGovIntegration.fetch_all_records"""
+        return http_client.run_sync(self.aio.fetch_all_records(resource_id, filters, page_size))
     
     def fetch_historical_rainfall(self, subdivision: Optional[str] = None,
                                  year: Optional[int] = None,
                                  limit: int = 100) -> pd.DataFrame:
-        """Fetch historical state-wise rainfall data (1901-2015)"""
-        url = f"{self.BASE_URL}/{self.HISTORICAL_RAINFALL_RESOURCE_ID}"
-        
-        params = {
-            'api-key': self.api_key,
-            'format': 'json',
-            'limit': limit
-        }
-        
-        if subdivision:
-            params['filters[subdivision]'] = subdivision
-        if year:
-            params['filters[year]'] = str(year)
-        
-        try:
-            response = self.session.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-            
-            records = data.get('records', [])
-            if records:
-                df = pd.DataFrame(records)
-                
-                # Convert numeric columns
-                for col in df.columns:
-                    if col not in ['subdivision']:
-                        df[col] = pd.to_numeric(df[col], errors='coerce')
-                
-                return df
-            
-            return pd.DataFrame()
-            
-        except Exception as e:
-            print(f"DEBUG: Error fetching historical rainfall: {e}")
-            return pd.DataFrame()
+        """Blocking wrapper for AsyncDataGovIntegration.fetch_historical_rainfall"""
+        return http_client.run_sync(self.aio.fetch_historical_rainfall(subdivision, year, limit))
@@ -0,0 +1,113 @@
+"""Persistent, content-addressed cache for upstream API responses"""
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, Optional
+
+from config.settings import settings
+
+
+# Query parameters that must never influence (or be stored in) a cache key
+_SECRET_PARAMS = {'api-key'}
+
+# ttl value meaning "never expires"
+FOREVER = None
+
+
+class ResponseCache:
+    """
+    Gzipped JSON response bodies on disk, addressed by the SHA-256 of
+    (method, url, canonical params, canonical payload). Entries are written
+    with an atomic rename, so every uvicorn worker on the host can share the
+    directory and the cache survives restarts.
+    """
+    
+    def __init__(self, base_dir: Optional[str] = None, enabled: bool = True):
+        self.base_dir = base_dir or settings.HTTP_CACHE_DIR
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+    
+    @staticmethod
+    def make_key(method: str, url: str, params: Optional[Dict[str, Any]] = None,
+                 payload: Optional[Any] = None) -> str:
+        """Stable key: parameter order and the API key do not matter"""
+        canonical = json.dumps({
+            'method': method.upper(),
+            'url': url,
+            'params': {k: str(v) for k, v in sorted((params or {}).items()) if k not in _SECRET_PARAMS},
+            'payload': payload
+        }, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.base_dir, key[:2], f"{key}.json.gz")
+    
+    def get(self, key: str, allow_stale: bool = False) -> Optional[Any]:
+        """Cached body, or None if missing/expired (allow_stale: expired is fine, upstream is down)"""
+        if not self.enabled:
+            return None
+        
+        path = self._path(key)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        
+        # Expired entries stay on disk (until overwritten) as a fallback for outages
+        expires_at = entry.get('expires_at')
+        if expires_at is not None and expires_at <= time.time():
+            if not allow_stale:
+                self.misses += 1
+                return None
+            self.stale_hits += 1
+            return entry['body']
+        
+        self.hits += 1
+        return entry['body']
+    
+    def set(self, key: str, body: Any, ttl_seconds: Optional[float] = FOREVER, url: str = ''):
+        """Store a response body for ttl_seconds (FOREVER = never expires)"""
+        if not self.enabled or ttl_seconds == 0:
+            return
+        
+        path = self._path(key)
+        entry = {
+            'url': url,
+            'stored_at': time.time(),
+            'expires_at': None if ttl_seconds is FOREVER else time.time() + ttl_seconds,
+            'body': body
+        }
+        tmp_path = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Unique per call, so threads and processes writing the same key never share a temp file
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f"{key}.", suffix='.tmp')
+            with gzip.open(os.fdopen(fd, 'wb'), 'wt', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"DEBUG: Could not write response cache entry: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the health endpoint"""
+        total = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'hits': self.hits,
+            'misses': self.misses,
+            'stale_hits': self.stale_hits,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0
+        }
+
+
+# Global instance shared by every DataGovIntegration
+response_cache = ResponseCache(enabled=settings.HTTP_CACHE_ENABLED)
@@ -0,0 +1,158 @@
+"""Shared pooled async HTTP client for the upstream data APIs"""
+import asyncio
+import threading
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from config.settings import settings
+from .rate_limiter import HostRateLimiter, request_priority
+from .circuit_breaker import circuit_breakers
+
+
+class PooledHTTPClient:
+    """
+    One keep-alive httpx.AsyncClient owned by a dedicated background event loop.
+    Coroutines on any loop can await `request`, and sync code (worker threads,
+    scripts) can use `request_sync`, while all of them share a single connection
+    pool. Per-host semaphores cap how many requests hit one upstream at once,
+    hosts listed in rate_limits also go through a priority token bucket, and
+    hosts with a circuit breaker are skipped outright while it is open.
+    """
+    
+    # Attempts per request when the upstream keeps answering 429
+    MAX_THROTTLED_ATTEMPTS = 3
+    
+    def __init__(self, max_connections: int = 20, max_per_host: int = 6,
+                 rate_limits: Optional[Dict[str, float]] = None):
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self.rate_limiters: Dict[str, HostRateLimiter] = {
+            host: HostRateLimiter(host, rate) for host, rate in (rate_limits or {}).items() if rate > 0
+        }
+        self._lock = threading.Lock()
+    
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        """Start the background loop and client on first use"""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="http-client", daemon=True).start()
+                asyncio.run_coroutine_threadsafe(self._create_client(), loop).result()
+                self._loop = loop
+                print(f"✅ Pooled HTTP client started (max {self.max_connections} connections, "
+                      f"{self.max_per_host} per host)")
+            return self._loop
+    
+    async def _create_client(self):
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections
+            ),
+            follow_redirects=True
+        )
+    
+    async def _send(self, method: str, url: str, priority: int, **kwargs: Any) -> httpx.Response:
+        """Runs on the background loop"""
+        host = urlsplit(url).netloc
+        semaphore = self._host_limits.get(host)
+        if semaphore is None:
+            semaphore = self._host_limits[host] = asyncio.Semaphore(self.max_per_host)
+        limiter = self.rate_limiters.get(host)
+        breaker = circuit_breakers.for_host(host)
+        if breaker:
+            breaker.check()  # Fail fast while the host is known to be down
+        
+        for attempt in range(self.MAX_THROTTLED_ATTEMPTS):
+            if limiter:
+                await limiter.acquire(priority)
+            async with semaphore:
+                try:
+                    response = await self._client.request(method, url, **kwargs)
+                except Exception as e:
+                    if breaker:
+                        breaker.record_failure(e)
+                    raise
+            
+            if breaker:
+                if response.status_code >= 500:
+                    breaker.record_failure(f"HTTP {response.status_code}")
+                else:
+                    breaker.record_success()
+            if not limiter:
+                return response
+            if response.status_code != 429:
+                limiter.on_success()
+                return response
+            
+            limiter.on_throttled(self._retry_after(response))
+            if attempt < self.MAX_THROTTLED_ATTEMPTS - 1:
+                await response.aclose()
+        return response
+    
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> Optional[float]:
+        """Retry-After in seconds, when the upstream sends a numeric one"""
+        try:
+            return float(response.headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            return None
+    
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a request from any event loop, at the caller's request_priority"""
+        loop = self._ensure_started()
+        priority = request_priority.get()
+        
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            return await self._send(method, url, priority, **kwargs)
+        
+        future = asyncio.run_coroutine_threadsafe(self._send(method, url, priority, **kwargs), loop)
+        return await asyncio.wrap_future(future)
+    
+    def run_sync(self, coro):
+        """Run a coroutine on the client loop and block until it finishes"""
+        loop = self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(self._with_priority(coro, request_priority.get()), loop).result()
+    
+    @staticmethod
+    async def _with_priority(coro, priority: int):
+        """The client loop has its own context; carry the caller's priority over"""
+        request_priority.set(priority)
+        return await coro
+    
+    def request_sync(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Blocking variant of request for code that is not async"""
+        return self.run_sync(self._send(method, url, request_priority.get(), **kwargs))
+    
+    def close(self):
+        """Close pooled connections and stop the background loop"""
+        with self._lock:
+            if self._loop is None:
+                return
+            
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop = None
+            self._client = None
+            self._host_limits = {}
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Rate limiter state per throttled host"""
+        return {host: limiter.get_stats() for host, limiter in self.rate_limiters.items()}
+
+
+# Global instance shared by every DataGovIntegration
+http_client = PooledHTTPClient(
+    max_connections=settings.HTTP_MAX_CONNECTIONS,
+    max_per_host=settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+    rate_limits=settings.UPSTREAM_RATE_LIMITS
+)
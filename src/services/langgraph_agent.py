@@ -8,15 +8,20 @@ Key Interview Points:
 - Tool nodes that execute data fetches
 - Multi-step reasoning with memory
 """
+import asyncio
+import functools
 import json
 import operator
+from concurrent.futures import ThreadPoolExecutor
 from typing import TypedDict, Annotated, List, Literal, Optional, Any
 from dataclasses import dataclass
 
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode
 from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_core.callbacks.manager import adispatch_custom_event
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, ToolMessage
+from langchain_core.runnables import RunnableLambda
 from langchain_core.tools import tool
 from pydantic import BaseModel, Field
 
@@ -57,6 +62,9 @@ class AgentState(TypedDict):
 
 # Import the actual data integration
 from services.data_integration import DataGovIntegration
+from services.circuit_breaker import circuit_breakers
+from services.result_shaper import result_shaper
+from database.data_cache import data_result_cache
 data_service = DataGovIntegration()
 
 
@@ -109,8 +117,8 @@ def fetch_apeda_production(state: str = None, year: str = None, commodity: str =
                     }
                 df = df_filtered
             
-            # Convert DataFrame to dict for JSON serialization
-            records = df.to_dict('records')[:15]  # Limit to 15 records
+            # Top 15 records by production, the rest summarized, for JSON serialization
+            shaped, _ = result_shaper.shape('apeda_production', df, max_rows=15)
             
             return {
                 "source": "APEDA India",
@@ -119,7 +127,7 @@ def fetch_apeda_production(state: str = None, year: str = None, commodity: str =
                 "product_code": product_code,
                 "category": category,
                 "year": year or "2023-24",
-                "data": records,
+                **shaped,
                 "total_records": len(df),
                 "note": f"APEDA production data for {commodity or category} in {state or 'All India'}"
             }
@@ -237,8 +245,17 @@ def web_search(query: str) -> dict:
         if not api_key or not cx:
             return {"source": "web_search", "error": "Google Search API not configured", "results": []}
         
-        service = build('customsearch', 'v1', developerKey=api_key)
-        result = service.cse().list(q=query, cx=cx, num=3).execute()
+        breaker = circuit_breakers.get('google_cse')
+        if not breaker.allow():
+            return {"source": "web_search", "error": "Web search temporarily unavailable", "results": []}
+        
+        try:
+            service = build('customsearch', 'v1', developerKey=api_key)
+            result = service.cse().list(q=query, cx=cx, num=3).execute()
+        except Exception as e:
+            breaker.record_failure(e)
+            raise
+        breaker.record_success()
         
         items = result.get('items', [])
         return {
@@ -261,6 +278,69 @@ def web_search(query: str) -> dict:
 # List of all tools
 ALL_TOOLS = [fetch_apeda_production, fetch_crop_production, fetch_rainfall_data, search_knowledge_base, web_search]
 
+# Data type of each tool's output, for its data cache TTL (see tool_cache_ttl)
+TOOL_DATA_TYPES = {
+    'fetch_apeda_production': 'apeda_production',
+    'fetch_crop_production': 'crop_production',
+    'search_knowledge_base': 'default'
+}
+
+
+def tool_cache_ttl(tool_name: str, args: dict) -> float:
+    """Seconds a tool output stays in the data cache"""
+    if tool_name == 'web_search':
+        return settings.WEB_SEARCH_CACHE_HOURS * 3600
+    if tool_name == 'fetch_rainfall_data':
+        historical = args.get('rainfall_type', 'historical') == 'historical'
+        return data_result_cache.ttl_seconds(['historical_rainfall' if historical else 'daily_rainfall'])
+    return data_result_cache.ttl_seconds([TOOL_DATA_TYPES.get(tool_name, 'default')])
+
+
+def invoke_tool(tool_map: dict, tool_name: str, args: dict) -> Any:
+    """
+    Invoke a tool through the params-level data cache, so a reworded question
+    that leads to the same tool call reuses its output. Errors and sample
+    fallbacks (upstream unavailable) are not cached.
+    """
+    data_key = data_result_cache.tool_key(tool_name, args)
+    cached = data_result_cache.get(data_key, kind='tool')
+    if cached is not None:
+        print(f"DEBUG: Data cache hit for tool '{tool_name}'")
+        return cached
+    
+    result = tool_map[tool_name].invoke(args)
+    if isinstance(result, dict) and 'error' not in result and 'unavailable' not in str(result.get('source', '')):
+        data_result_cache.set(data_key, result, tool_cache_ttl(tool_name, args))
+    return result
+
+
+# ============================================================================
+# BLOCKING CALL EXECUTOR
+# ============================================================================
+
+# The tools use blocking HTTP clients (requests, googleapiclient, chromadb).
+# When the graph runs via ainvoke they are pushed onto this bounded pool so the
+# event loop stays free to serve other requests.
+_tool_executor = ThreadPoolExecutor(
+    max_workers=settings.AGENT_TOOL_WORKERS,
+    thread_name_prefix="agent-tool"
+)
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking callable on the bounded tool executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_tool_executor, functools.partial(func, *args, **kwargs))
+
+
+def offloaded_node(func):
+    """Wrap a blocking node so ainvoke runs it on the tool executor"""
+    
+    async def afunc(state: AgentState) -> dict:
+        return await run_blocking(func, state)
+    
+    return RunnableLambda(func, afunc=afunc, name=func.__name__)
+
 
 # ============================================================================
 # AGENT NODES (Steps in the workflow)
@@ -275,11 +355,8 @@ def create_agent_node(tools: list):
         temperature=0.3
     ).bind_tools(tools)
     
-    def agent_node(state: AgentState) -> dict:
-        """
-        The agent reasons about what to do next.
-        It can either call tools or generate final answer.
-        """
+    def build_messages(state: AgentState) -> list:
+        """Build the prompt for the next reasoning step"""
         print(f"DEBUG: Agent reasoning step {state.get('step_count', 0) + 1}")
         
         # Build system message
@@ -317,51 +394,60 @@ Examples:
             context_msg = HumanMessage(content=f"Data collected so far: {json.dumps(state['collected_data'], indent=2)}")
             messages.append(context_msg)
         
-        # Invoke LLM
-        response = llm.invoke(messages)
+        return messages
+    
+    def agent_node(state: AgentState) -> dict:
+        """
+        The agent reasons about what to do next.
+        It can either call tools or generate final answer.
+        """
+        response = llm.invoke(build_messages(state))
         
         return {
             "messages": [response],
             "step_count": state.get("step_count", 0) + 1
         }
     
-    return agent_node
+    async def aagent_node(state: AgentState) -> dict:
+        """Async variant of agent_node used by graph.ainvoke"""
+        response = await llm.ainvoke(build_messages(state))
+        
+        return {
+            "messages": [response],
+            "step_count": state.get("step_count", 0) + 1
+        }
+    
+    return RunnableLambda(agent_node, afunc=aagent_node, name="agent_node")
 
 
-def tool_executor_node(state: AgentState) -> dict:
-    """Execute tools called by the agent"""
-    
-    last_message = state["messages"][-1]
+def execute_tool_call(tool_map: dict, tool_call: dict) -> tuple:
+    """
+    Run a single tool call.
+    Returns (tool_name, result or None on failure, ToolMessage).
+    """
+    tool_name = tool_call["name"]
+    tool_args = tool_call["args"]
     
-    if not hasattr(last_message, "tool_calls") or not last_message.tool_calls:
-        return {}
+    print(f"DEBUG: Executing tool '{tool_name}' with args: {tool_args}")
     
+    try:
+        result = invoke_tool(tool_map, tool_name, tool_args)
+        return tool_name, result, ToolMessage(content=json.dumps(result), tool_call_id=tool_call["id"])
+    except Exception as e:
+        return tool_name, None, ToolMessage(content=f"Error: {str(e)}", tool_call_id=tool_call["id"])
+
+
+def merge_tool_outcomes(state: AgentState, outcomes: list) -> dict:
+    """Fold tool call outcomes into the state update"""
     collected_data = state.get("collected_data", {})
     sources_used = state.get("sources_used", [])
     tool_messages = []
     
-    # Map tool names to functions
-    tool_map = {t.name: t for t in ALL_TOOLS}
-    
-    for tool_call in last_message.tool_calls:
-        tool_name = tool_call["name"]
-        tool_args = tool_call["args"]
-        
-        print(f"DEBUG: Executing tool '{tool_name}' with args: {tool_args}")
-        
-        if tool_name in tool_map:
-            try:
-                result = tool_map[tool_name].invoke(tool_args)
-                collected_data[tool_name] = result
-                sources_used.append(result.get("source", tool_name))
-                
-                tool_messages.append(
-                    ToolMessage(content=json.dumps(result), tool_call_id=tool_call["id"])
-                )
-            except Exception as e:
-                tool_messages.append(
-                    ToolMessage(content=f"Error: {str(e)}", tool_call_id=tool_call["id"])
-                )
+    for tool_name, result, message in outcomes:
+        if result is not None:
+            collected_data[tool_name] = result
+            sources_used.append(result.get("source", tool_name))
+        tool_messages.append(message)
     
     return {
         "messages": tool_messages,
@@ -370,16 +456,71 @@ def tool_executor_node(state: AgentState) -> dict:
     }
 
 
-def synthesize_answer_node(state: AgentState) -> dict:
-    """Generate final answer from collected data"""
+def pending_tool_calls(state: AgentState) -> list:
+    """Tool calls requested by the last agent message that we know how to run"""
+    last_message = state["messages"][-1]
     
-    llm = ChatGoogleGenerativeAI(
+    if not hasattr(last_message, "tool_calls") or not last_message.tool_calls:
+        return []
+    
+    tool_names = {t.name for t in ALL_TOOLS}
+    return [call for call in last_message.tool_calls if call["name"] in tool_names]
+
+
+def tool_executor_node(state: AgentState) -> dict:
+    """Execute tools called by the agent"""
+    
+    tool_calls = pending_tool_calls(state)
+    if not tool_calls:
+        return {}
+    
+    # Map tool names to functions
+    tool_map = {t.name: t for t in ALL_TOOLS}
+    
+    outcomes = [execute_tool_call(tool_map, tool_call) for tool_call in tool_calls]
+    return merge_tool_outcomes(state, outcomes)
+
+
+async def atool_executor_node(state: AgentState) -> dict:
+    """
+    Execute tools called by the agent without blocking the event loop.
+    Independent tool calls from the same step run concurrently on the tool executor.
+    """
+    
+    tool_calls = pending_tool_calls(state)
+    if not tool_calls:
+        return {}
+    
+    tool_map = {t.name: t for t in ALL_TOOLS}
+    
+    async def run_and_report(tool_call: dict) -> tuple:
+        # Progress events are picked up by AgriculturalAgent.astream
+        await adispatch_custom_event("tool_started", {"tool": tool_call["name"], "args": tool_call["args"]})
+        outcome = await run_blocking(execute_tool_call, tool_map, tool_call)
+        tool_name, result, _ = outcome
+        await adispatch_custom_event("tool_finished", {
+            "tool": tool_name,
+            "status": "ok" if result is not None else "error",
+            "source": result.get("source", tool_name) if isinstance(result, dict) else None
+        })
+        return outcome
+    
+    outcomes = await asyncio.gather(*[run_and_report(tool_call) for tool_call in tool_calls])
+    return merge_tool_outcomes(state, list(outcomes))
+
+
+def create_synthesis_llm() -> ChatGoogleGenerativeAI:
+    """LLM used to write the final answer"""
+    return ChatGoogleGenerativeAI(
         model="gemini-2.5-flash",
         google_api_key=settings.GEMINI_AGENT_KEY,
         temperature=0.7
     )
-    
-    prompt = f"""Based on the following data, provide a comprehensive answer to the user's question.
+
+
+def build_synthesis_prompt(state: AgentState) -> str:
+    """Prompt asking the LLM to answer from the collected data"""
+    return f"""Based on the following data, provide a comprehensive answer to the user's question.
 
 Question: {state['question']}
 
@@ -393,8 +534,13 @@ Instructions:
 2. Cite sources using [Source: source_name] format
 3. Be specific with numbers and statistics
 4. If data is limited, acknowledge what's available"""
+
+
+def synthesize_answer_node(state: AgentState) -> dict:
+    """Generate final answer from collected data"""
     
-    response = llm.invoke([HumanMessage(content=prompt)])
+    llm = create_synthesis_llm()
+    response = llm.invoke([HumanMessage(content=build_synthesis_prompt(state))])
     
     return {
         "final_answer": response.content,
@@ -402,6 +548,41 @@ Instructions:
     }
 
 
+def chunk_text(chunk) -> str:
+    """Plain text of a streamed message chunk (content may be a list of parts)"""
+    content = chunk.content
+    if isinstance(content, str):
+        return content
+    return "".join(
+        part.get("text", "") if isinstance(part, dict) else str(part)
+        for part in content
+    )
+
+
+async def asynthesize_answer_node(state: AgentState) -> dict:
+    """
+    Async variant of synthesize_answer_node used by graph.ainvoke.
+    Streams the answer so astream() can forward it token by token.
+    """
+    
+    await adispatch_custom_event("sources", {"sources": state.get("sources_used", [])})
+    
+    llm = create_synthesis_llm()
+    response = None
+    async for chunk in llm.astream([HumanMessage(content=build_synthesis_prompt(state))]):
+        text = chunk_text(chunk)
+        if text:
+            await adispatch_custom_event("token", {"text": text})
+        response = chunk if response is None else response + chunk
+    
+    answer = chunk_text(response) if response is not None else "No answer generated"
+    
+    return {
+        "final_answer": answer,
+        "messages": [AIMessage(content=answer)]
+    }
+
+
 # ============================================================================
 # ROUTING LOGIC
 # ============================================================================
@@ -418,7 +599,7 @@ def force_web_search_node(state: AgentState) -> dict:
     
     # Call web search
     try:
-        result = tool_map["web_search"].invoke({"query": question})
+        result = invoke_tool(tool_map, "web_search", {"query": question})
         collected_data = {**state.get("collected_data", {}), "web_search": result}
         sources = list(set(state.get("sources_used", []) + [result.get("source", "Google Search")]))
         
@@ -467,7 +648,7 @@ def force_apeda_search_node(state: AgentState) -> dict:
     tool_map = {tool.name: tool for tool in ALL_TOOLS}
     
     try:
-        result = tool_map["fetch_apeda_production"].invoke({
+        result = invoke_tool(tool_map, "fetch_apeda_production", {
             "state_name": state_name,
             "year": fiscal_year,
             "commodity": commodity
@@ -495,7 +676,7 @@ def force_kb_search_node(state: AgentState) -> dict:
     tool_map = {tool.name: tool for tool in ALL_TOOLS}
     
     try:
-        result = tool_map["search_knowledge_base"].invoke({"query": question})
+        result = invoke_tool(tool_map, "search_knowledge_base", {"query": question})
         collected_data = {**state.get("collected_data", {}), "knowledge_base": result}
         sources = list(set(state.get("sources_used", []) + [result.get("source", "Knowledge Base")]))
         
@@ -564,6 +745,9 @@ def should_continue(state: AgentState) -> Literal["tools", "synthesize", "force_
 # BUILD THE GRAPH
 # ============================================================================
 
+GRAPH_NODES = ("agent", "tools", "synthesize", "force_web_search", "force_apeda_search", "force_kb_search")
+
+
 def create_agricultural_agent():
     """
     Build the LangGraph workflow.
@@ -578,12 +762,14 @@ def create_agricultural_agent():
     workflow = StateGraph(AgentState)
     
     # Add nodes
+    # Every node has a sync and an async implementation: invoke() keeps the
+    # original blocking behaviour, ainvoke() never blocks the event loop.
     workflow.add_node("agent", create_agent_node(ALL_TOOLS))
-    workflow.add_node("tools", tool_executor_node)
-    workflow.add_node("synthesize", synthesize_answer_node)
-    workflow.add_node("force_web_search", force_web_search_node)
-    workflow.add_node("force_apeda_search", force_apeda_search_node)
-    workflow.add_node("force_kb_search", force_kb_search_node)
+    workflow.add_node("tools", RunnableLambda(tool_executor_node, afunc=atool_executor_node, name="tools"))
+    workflow.add_node("synthesize", RunnableLambda(synthesize_answer_node, afunc=asynthesize_answer_node, name="synthesize"))
+    workflow.add_node("force_web_search", offloaded_node(force_web_search_node))
+    workflow.add_node("force_apeda_search", offloaded_node(force_apeda_search_node))
+    workflow.add_node("force_kb_search", offloaded_node(force_kb_search_node))
     
     # Set entry point
     workflow.set_entry_point("agent")
@@ -629,17 +815,13 @@ class AgriculturalAgent:
         self.graph = create_agricultural_agent()
         print("DEBUG: Agricultural Agent ready!")
     
-    def query(self, question: str) -> dict:
-        """
-        Run an agentic query.
-        The agent will autonomously decide which tools to use.
-        """
+    def _initial_state(self, question: str) -> AgentState:
+        """Build the starting state for a question"""
         print(f"\n{'='*60}")
         print(f"AGENT QUERY: {question}")
         print('='*60)
         
-        # Initial state
-        initial_state = {
+        return {
             "question": question,
             "messages": [HumanMessage(content=question)],
             "collected_data": {},
@@ -647,10 +829,48 @@ class AgriculturalAgent:
             "final_answer": None,
             "step_count": 0
         }
+    
+    def query(self, question: str) -> dict:
+        """
+        Run an agentic query.
+        The agent will autonomously decide which tools to use.
+        """
+        result = self.graph.invoke(self._initial_state(question))
+        return self._format_result(question, result)
+    
+    async def aquery(self, question: str) -> dict:
+        """
+        Run an agentic query without blocking the event loop.
+        LLM calls are awaited natively; blocking tools run on the bounded tool executor.
+        """
+        result = await self.graph.ainvoke(self._initial_state(question))
+        return self._format_result(question, result)
+    
+    async def astream(self, question: str):
+        """
+        Run an agentic query, yielding (event, data) progress tuples as it goes:
+        step, tool_started, tool_finished, sources, token, and finally done
+        with the same payload aquery() returns.
+        """
+        final_state = None
         
-        # Run the graph
-        result = self.graph.invoke(initial_state)
+        async for event in self.graph.astream_events(self._initial_state(question), version="v2"):
+            kind = event["event"]
+            
+            if kind == "on_custom_event":
+                yield event["name"], event["data"]
+            elif kind == "on_chain_start" and event["name"] in GRAPH_NODES \
+                    and len(event.get("parent_ids", [])) == 1:
+                # Direct children of the root run are the graph nodes themselves
+                yield "step", {"node": event["name"]}
+            elif kind == "on_chain_end" and not event.get("parent_ids"):
+                # End of the root run carries the final graph state
+                final_state = event["data"].get("output")
         
+        yield "done", self._format_result(question, final_state or {})
+    
+    def _format_result(self, question: str, result: dict) -> dict:
+        """Shape the final graph state into the public result"""
         return {
             "question": question,
             "answer": result.get("final_answer", "No answer generated"),
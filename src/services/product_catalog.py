@@ -0,0 +1,289 @@
+"""Persistent APEDA product-code catalog with an indexed fuzzy matcher"""
+import asyncio
+import json
+import os
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from config.settings import settings
+from .apeda_codes import APEDA_PRODUCT_CODES
+
+
+# Common names -> APEDA product names
+PRODUCT_ALIASES = {
+    'paddy': 'rice',
+    'basmati': 'rice',
+    'corn': 'maize',
+    'sorghum': 'jowar',
+    'pearl millet': 'bajra',
+    'chickpea': 'gram',
+    'chana': 'gram',
+    'arhar': 'tur (arhar)',
+    'tur': 'tur (arhar)',
+    'pigeon pea': 'tur (arhar)',
+    'masur': 'lentil (masur)',
+    'lentil': 'lentil (masur)',
+    'peanut': 'groundnut',
+    'rapeseed': 'rapeseed & mustard',
+    'mustard': 'rapeseed & mustard',
+    'sarson': 'rapeseed & mustard',
+    'soybean': 'soyabean'
+}
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, drop punctuation, collapse whitespace"""
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', name.lower()).split())
+
+
+def singular(word: str) -> str:
+    """Crude English singular for crop names (mangoes -> mango, berries -> berry)"""
+    if word.endswith('ies') and len(word) > 4:
+        return word[:-3] + 'y'
+    if word.endswith('oes') and len(word) > 4:
+        return word[:-2]
+    if word.endswith('s') and not word.endswith('ss') and len(word) > 3:
+        return word[:-1]
+    return word
+
+
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of a padded string"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, giving up (returning limit + 1) once it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class ProductCatalog:
+    """
+    APEDA products persisted as JSON and indexed in memory for fast lookups.
+    Resolution order: normalized name, alias target name, the shortest product
+    name containing the query (or the longest one the query contains), the
+    same for the alias target, a word that appears in only one product name,
+    then trigram candidates ranked by edit distance. Names are compared as
+    given and singularized, so "mango" finds "Fresh Mangoes".
+    """
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(settings.WAREHOUSE_DIR, 'apeda_products.json')
+        self.products: Dict[str, Dict[str, str]] = {}  # code -> {'name', 'category'}
+        self.fetched_at: Optional[str] = None
+        self._by_name: Dict[str, str] = {}
+        self._names: List[tuple] = []  # (name, singularized name, code), shortest name first
+        self._by_word: Dict[str, str] = {}
+        self._by_trigram: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._build_index()
+    
+    def _build_index(self):
+        """Precompute every lookup structure from self.products"""
+        by_name = {}
+        word_codes: Dict[str, Set[str]] = {}
+        
+        for code, info in self.products.items():
+            name = normalize_name(info['name'])
+            by_name.setdefault(name, code)
+            for word in name.split():
+                word_codes.setdefault(word, set()).add(code)
+        
+        # Substring pass candidates; the stable sort keeps catalog order among equal lengths
+        names = [(name, ' '.join(singular(word) for word in name.split()), code) for name, code in by_name.items()]
+        names.sort(key=lambda entry: len(entry[0]))
+        
+        # The hand-maintained APEDA_PRODUCT_CODES fill gaps, but only with codes the live
+        # catalog confirms (several entries there are unverified guesses)
+        for name, code in APEDA_PRODUCT_CODES.items():
+            if code in self.products:
+                by_name.setdefault(normalize_name(name), code)
+        
+        by_trigram: Dict[str, Set[str]] = {}
+        for name in by_name:
+            for gram in trigrams(name):
+                by_trigram.setdefault(gram, set()).add(name)
+        
+        self._by_name = by_name
+        self._names = names
+        # A word only identifies a product when exactly one product contains it
+        self._by_word = {word: next(iter(codes)) for word, codes in word_codes.items() if len(codes) == 1}
+        self._by_trigram = by_trigram
+    
+    def load(self) -> bool:
+        """Load the persisted catalog; returns False if there is none"""
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        
+        with self._lock:
+            self.products = data.get('products', {})
+            self.fetched_at = data.get('fetched_at')
+            self._build_index()
+        print(f"✅ Product catalog: {len(self.products)} APEDA products loaded from disk")
+        return True
+    
+    def replace(self, products: Dict[str, Dict[str, str]]):
+        """Swap in a freshly fetched product list and persist it"""
+        with self._lock:
+            self.products = dict(products)
+            self.fetched_at = datetime.now().isoformat()
+            self._build_index()
+        self._save()
+    
+    def update_categories(self, by_category: Dict[str, Optional[Dict[str, Dict[str, str]]]]) -> List[str]:
+        """Merge per-category results, touching only categories whose products changed
+        
+        A category that failed to fetch (None) keeps its current products.
+        Returns the names of the categories that changed.
+        """
+        with self._lock:
+            changed = []
+            products = dict(self.products)
+            for category, fresh in by_category.items():
+                if fresh is None:
+                    continue
+                current = {code: info for code, info in products.items() if info.get('category') == category}
+                if current == fresh:
+                    continue
+                
+                for code in current:
+                    del products[code]
+                products.update(fresh)
+                changed.append(category)
+            
+            if any(fresh is not None for fresh in by_category.values()):
+                self.fetched_at = datetime.now().isoformat()
+            if changed:
+                self.products = products
+                self._build_index()
+        
+        self._save()
+        return changed
+    
+    async def refresh(self, fetch_categories: Callable[[], Awaitable[Dict[str, Optional[dict]]]]) -> List[str]:
+        """Fetch every category (concurrently, via fetch_categories) and apply the diff"""
+        by_category = await fetch_categories()
+        changed = await asyncio.to_thread(self.update_categories, by_category)
+        failed = [category for category, products in by_category.items() if products is None]
+        print(f"✅ Product catalog refresh: {len(changed)} categories changed"
+              + (f" ({', '.join(changed)})" if changed else "")
+              + (f", failed: {', '.join(failed)}" if failed else ""))
+        return changed
+    
+    def is_stale(self) -> bool:
+        """True when empty or older than PRODUCT_CATALOG_REFRESH_HOURS"""
+        if self.is_empty() or not self.fetched_at:
+            return True
+        age = datetime.now() - datetime.fromisoformat(self.fetched_at)
+        return age > timedelta(hours=settings.PRODUCT_CATALOG_REFRESH_HOURS)
+    
+    async def run_refresher(self, fetch_categories: Callable[[], Awaitable[Dict[str, Optional[dict]]]]):
+        """Background job: refresh when stale, then re-check every hour"""
+        while True:
+            if self.is_stale():
+                try:
+                    await self.refresh(fetch_categories)
+                except Exception as e:
+                    print(f"❌ Product catalog refresh failed: {e}")
+            await asyncio.sleep(3600)
+    
+    def _save(self):
+        """Persist atomically"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'fetched_at': self.fetched_at, 'products': self.products}, f, indent=2)
+        os.replace(tmp_path, self.path)
+    
+    def is_empty(self) -> bool:
+        """True until a product list has been loaded or fetched"""
+        return not self.products
+    
+    def resolve(self, name: str) -> Optional[str]:
+        """Product code for a crop/commodity name, or None"""
+        query = normalize_name(name or '')
+        if not query:
+            return None
+        
+        singular_query = ' '.join(singular(word) for word in query.split())
+        alias = PRODUCT_ALIASES.get(query) or PRODUCT_ALIASES.get(singular_query)
+        alias = normalize_name(alias) if alias else None
+        
+        code = self._by_name.get(query) or self._by_name.get(singular_query)
+        if not code and alias:
+            code = self._by_name.get(alias)
+        if not code:
+            code = self._substring_match(query, singular_query)
+        if not code and alias:
+            code = self._substring_match(alias, alias)
+        if code:
+            return code
+        
+        for word in query.split():
+            code = self._by_word.get(word) or self._by_word.get(singular(word))
+            if code:
+                return code
+        
+        candidate = self._closest_name(query)
+        return self._by_name[candidate] if candidate else None
+    
+    def _substring_match(self, query: str, singular_query: str) -> Optional[str]:
+        """Shortest product name containing the query (at a word start first), else the
+        longest name inside the query"""
+        starts = (f" {query}", f" {singular_query}")
+        for name, singular_name, code in self._names:
+            if starts[0] in f" {name}" or starts[1] in f" {singular_name}":
+                return code
+        for name, singular_name, code in self._names:
+            if query in name or singular_query in singular_name:
+                return code
+        for name, singular_name, code in reversed(self._names):
+            if len(name) > 2 and (name in query or singular_name in singular_query):
+                return code
+        return None
+    
+    def _closest_name(self, query: str) -> Optional[str]:
+        """Best fuzzy match among names sharing trigrams with the query"""
+        query_grams = trigrams(query)
+        overlap: Dict[str, int] = {}
+        for gram in query_grams:
+            for name in self._by_trigram.get(gram, ()):
+                overlap[name] = overlap.get(name, 0) + 1
+        
+        limit = max(1, len(query) // 4)
+        best, best_distance = None, limit + 1
+        # Only the strongest trigram candidates are worth an edit-distance check
+        for name in sorted(overlap, key=overlap.get, reverse=True)[:10]:
+            distance = edit_distance(query, name, limit)
+            if distance < best_distance:
+                best, best_distance = name, distance
+        return best
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Catalog size for the health endpoint"""
+        return {
+            'products': len(self.products),
+            'indexed_names': len(self._by_name),
+            'fetched_at': self.fetched_at
+        }
+
+
+# Global instance shared by every DataGovIntegration
+product_catalog = ProductCatalog()
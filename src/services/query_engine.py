@@ -1,103 +1,194 @@
 """Query engine for executing queries on datasets"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+import numpy as np
 import pandas as pd
 from typing import Tuple, List, Dict, Any, Optional
 
+from config.settings import settings
+from database.memory_cache import LRUTTLCache
+from database.warehouse import historical_rainfall_store, daily_rainfall_store
+from .crop_index import CropIndex
+from .aggregate_cubes import AggregateCubes
+from .sql_engine import SQLQueryEngine
+from .result_shaper import result_shaper
+from .correlation import rainfall_correlation
+from .rainfall_trends import rainfall_trends
 from services.data_integration import DataGovIntegration
+from services.http_client import http_client
+
+
+# Shared pool for fetching the requested sources of one query side by side
+_source_executor = ThreadPoolExecutor(
+    max_workers=settings.QUERY_SOURCE_WORKERS,
+    thread_name_prefix="query-source"
+)
+
+# district (lower) -> states (lower) seen in daily rainfall responses, shared by all engines;
+# written from the source workers, so every access holds the lock
+_seen_district_states: Dict[str, set] = {}
+_seen_district_states_lock = threading.Lock()
 
 
 class DataQueryEngine:
-    """Executes queries on the integrated datasets"""
+    """
+    Executes queries on the integrated datasets. One engine is built per data
+    snapshot and shared by every request on it, so the precomputed columns
+    and memoized filter results live exactly as long as the data they describe.
+    """
+    
+    # State name -> meteorological subdivision of the historical rainfall dataset
+    STATE_SUBDIVISIONS = {
+        'punjab': 'PUNJAB',
+        'haryana': 'HARYANA DELHI & CHANDIGARH',
+        'delhi': 'HARYANA DELHI & CHANDIGARH',
+        'uttar pradesh': 'EAST UTTAR PRADESH',
+        'maharashtra': 'MADHYA MAHARASHTRA',
+        'karnataka': 'COASTAL KARNATAKA',
+        'west bengal': 'GANGETIC WEST BENGAL',
+        'tamil nadu': 'TAMIL NADU & PUDUCHERRY',
+        'kerala': 'KERALA',
+        'rajasthan': 'WEST RAJASTHAN',
+        'gujarat': 'GUJARAT REGION',
+        'bihar': 'BIHAR',
+        'odisha': 'ODISHA',
+        'andhra pradesh': 'COASTAL ANDHRA PRADESH'
+    }
     
     def __init__(self, crop_data: pd.DataFrame, rainfall_data: pd.DataFrame, 
-                 data_gov_integration: Optional[DataGovIntegration] = None):
+                 data_gov_integration: Optional[DataGovIntegration] = None,
+                 crop_index: Optional[CropIndex] = None, cubes: Optional[AggregateCubes] = None,
+                 sql_engine: Optional[SQLQueryEngine] = None):
         self.crop_df = crop_data
         self.rainfall_df = rainfall_data
         self.data_gov = data_gov_integration or DataGovIntegration()
+        # Normally built once per snapshot; built here only for ad-hoc engines
+        self.crop_index = crop_index or CropIndex(crop_data)
+        self.cubes = cubes or AggregateCubes(crop_data, rainfall_data)
+        # Optional DuckDB engine (QUERY_ENGINE=duckdb); the pandas path is the fallback
+        self.sql_engine = sql_engine
+        
+        # Precomputed once per snapshot instead of per query
+        self.rainfall_states = (
+            self.rainfall_df['State'].astype(str).str.strip().str.lower()
+            if 'State' in self.rainfall_df.columns else pd.Series([], dtype=str)
+        )
+        self.crop_district_states = self.crop_index.district_states()
+        
+        # Resolved filters (bitmap mask + year list); entries never expire since the data never changes
+        self._filter_cache = LRUTTLCache(max_entries=settings.QUERY_FILTER_CACHE_SIZE)
+        self._stats_lock = threading.Lock()
+        self.filter_hits = 0
+        self.filter_misses = 0
+    
+    def _source_handlers(self) -> List[Tuple[str, Any]]:
+        """Dataset name -> query method, in the order results are reported"""
+        return [
+            ('crop_production', self.query_crop_production),          # data.gov.in, 2013-2014
+            ('apeda_production', self.query_apeda),                   # APEDA, 2019-2024
+            ('rainfall', self.query_rainfall),                        # Sample rainfall (fallback)
+            ('daily_rainfall', self.query_daily_rainfall),            # District-wise, 2019-2024
+            ('historical_rainfall', self.query_historical_rainfall),  # State-wise, 1901-2015
+        ]
     
     def execute_query(self, params: dict) -> Tuple[Dict[str, Any], List[Dict[str, str]]]:
-        """Execute complete query across all needed datasets"""
+        """Execute complete query across all needed datasets
+        
+        The requested sources are fetched concurrently. A source that does not
+        finish within QUERY_SOURCE_TIMEOUT is left out, so the caller still gets
+        the partial results; per-source timings (and sources cut short by a row
+        cap, see query_daily_rainfall) go in results['metadata'].
+        """
         all_results = {}
         all_sources = []
+        source_timings = {}
+        timed_out = []
         
         data_needed = params.get('data_needed', [])
-        
-        # District-wise crop production (data.gov.in, 2013-2014)
-        if 'crop_production' in data_needed:
-            crop_results, crop_sources = self.query_crop_production(params)
-            all_results['crop_production'] = crop_results
-            all_sources.extend(crop_sources)
-        
-        # APEDA production data (2019-2024)
-        if 'apeda_production' in data_needed:
-            apeda_results, apeda_sources = self.query_apeda(params)
-            all_results['apeda_production'] = apeda_results
-            all_sources.extend(apeda_sources)
-        
-        # Sample rainfall data (fallback)
-        if 'rainfall' in data_needed:
-            rainfall_results, rainfall_sources = self.query_rainfall(params)
-            all_results['rainfall'] = rainfall_results
-            all_sources.extend(rainfall_sources)
-        
-        # Daily district-wise rainfall (2019-2024)
-        if 'daily_rainfall' in data_needed:
-            daily_rainfall_results, daily_sources = self.query_daily_rainfall(params)
-            all_results['daily_rainfall'] = daily_rainfall_results
-            all_sources.extend(daily_sources)
-        
-        # Historical state-wise rainfall (1901-2015)
-        if 'historical_rainfall' in data_needed:
-            historical_results, historical_sources = self.query_historical_rainfall(params)
-            all_results['historical_rainfall'] = historical_results
-            all_sources.extend(historical_sources)
+        handlers = [(name, handler) for name, handler in self._source_handlers() if name in data_needed]
+        if params.get('comparison_type') == 'correlation':
+            handlers.append(('correlation', self.query_correlation))
+        
+        def timed(handler):
+            start = time.perf_counter()
+            outcome = handler(params)
+            return outcome, time.perf_counter() - start
+        
+        started = time.perf_counter()
+        deadline = started + settings.QUERY_SOURCE_TIMEOUT
+        futures = [(name, _source_executor.submit(timed, handler)) for name, handler in handlers]
+        
+        shaping = {}
+        truncated = {}
+        for name, future in futures:
+            try:
+                (results, sources), elapsed = future.result(timeout=max(0.0, deadline - time.perf_counter()))
+                sizes = [result.pop('shaping') for result in results if 'shaping' in result]
+                if sizes:
+                    shaping[name] = {key: sum(size[key] for size in sizes) for key in sizes[0]}
+                cut = [result['truncated'] for result in results if 'truncated' in result]
+                if cut:
+                    truncated[name] = cut[0]
+                all_results[name] = results
+                all_sources.extend(sources)
+                source_timings[name] = {'seconds': round(elapsed, 3), 'status': 'ok'}
+            except FuturesTimeoutError:
+                future.cancel()  # Only helps if it never started; a running fetch finishes in the background
+                timed_out.append(name)
+                source_timings[name] = {'seconds': settings.QUERY_SOURCE_TIMEOUT, 'status': 'timeout'}
+                print(f"⚠️ Source '{name}' timed out after {settings.QUERY_SOURCE_TIMEOUT}s, returning partial results")
+            except Exception as e:
+                source_timings[name] = {'seconds': round(time.perf_counter() - started, 3), 'status': 'error'}
+                print(f"DEBUG: Error querying source '{name}': {e}")
+        
+        if handlers:
+            all_results['metadata'] = {
+                'source_timings': source_timings,
+                'timed_out': timed_out,
+                'truncated': {name: {key: cut[key] for key in ('rows_fetched', 'rows_total')}
+                              for name, cut in truncated.items()},
+                'total_seconds': round(time.perf_counter() - started, 3),
+                'shaping': {
+                    'bytes_before': sum(size['bytes_before'] for size in shaping.values()),
+                    'bytes_after': sum(size['bytes_after'] for size in shaping.values()),
+                    'sources': shaping
+                }
+            }
+            print(f"DEBUG: Source timings: {source_timings}")
         
         return all_results, all_sources
     
+    def get_stats(self) -> Dict[str, Any]:
+        """Memoized filter usage for the health endpoint"""
+        return {
+            'filter_cache_entries': len(self._filter_cache),
+            'filter_cache_hits': self.filter_hits,
+            'filter_cache_misses': self.filter_misses
+        }
+    
     def query_crop_production(self, params: dict) -> Tuple[List[Dict], List[Dict]]:
         """Query crop production data based on parameters"""
-        df = self.crop_df.copy()
         results = []
         sources = []
         
         # Store available years for error messages
-        all_available_years = sorted(df['Crop_Year'].unique().tolist()) if len(df) > 0 else []
+        all_available_years = self.crop_index.crop_years
         
-        # Apply filters (case-insensitive)
-        if params.get('states'):
-            states_lower = [s.lower() for s in params['states']]
-            df = df[df['State_Name'].str.lower().isin(states_lower)]
-        
-        if params.get('districts'):
-            districts_lower = [d.lower() for d in params['districts']]
-            df = df[df['District_Name'].str.lower().isin(districts_lower)]
-            
-        if params.get('crops'):
-            crops_lower = [c.lower() for c in params['crops']]
-            df = df[df['Crop'].str.lower().isin(crops_lower)]
+        data = None
+        if self.sql_engine is not None:
+            try:
+                data = self._crop_production_sql(params)
+            except Exception as e:
+                print(f"⚠️ SQL engine failed for crop_production, falling back to pandas: {e}")
+        if data is None:
+            data = self._crop_production_pandas(params)
         
-        if params.get('years'):
-            year_filters = self._process_year_filters(params['years'], df)
-            if year_filters:
-                df = df[df['Crop_Year'].str.split('-').str[0].isin(year_filters)]
-                print(f"DEBUG: Filtered to {len(df)} records for years: {sorted(year_filters)}")
-        
-        # Perform aggregation
         if params.get('aggregation') == 'top':
-            top_crops = df.groupby(['State_Name', 'Crop'])['Production'].sum().reset_index()
-            top_crops = top_crops.sort_values('Production', ascending=False)
-            results.append({
-                'type': 'top_crops',
-                'data': top_crops.head(10).to_dict('records')
-            })
+            results.append(self._shaped('top_crops', data.head(10)))
         elif params.get('aggregation') == 'average':
-            avg_data = df.groupby('State_Name').agg({
-                'Production': 'mean',
-                'Area': 'mean'
-            }).reset_index()
-            results.append({
-                'type': 'averages',
-                'data': avg_data.to_dict('records')
-            })
+            results.append(self._shaped('averages', data))
         else:
             # Add metadata about available years if no data found
             metadata = {
@@ -105,11 +196,11 @@ class DataQueryEngine:
                 'note': f"Dataset contains data for years: {', '.join(all_available_years)}" if all_available_years else "No data available"
             }
             
-            results.append({
-                'type': 'crop_data',
-                'data': df.to_dict('records'),
-                'metadata': metadata
-            })
+            results.append(self._shaped(
+                'crop_data',
+                data,
+                metadata=metadata
+            ))
         
         sources.append({
             'dataset': 'District-wise Crop Production Statistics',
@@ -119,25 +210,106 @@ class DataQueryEngine:
         
         return results, sources
     
+    @staticmethod
+    def _shaped(result_type: str, df: pd.DataFrame, **fields: Any) -> Dict[str, Any]:
+        """Result entry with df projected, capped to the top rows and summarized (see ResultShaper)"""
+        shaped, sizes = result_shaper.shape(result_type, df)
+        return {'type': result_type, **shaped, **fields, 'shaping': sizes}
+    
+    def _crop_production_sql(self, params: dict) -> pd.DataFrame:
+        """Filters, year resolution and aggregation compiled to SQL on the snapshot's engine"""
+        filters = {field: params.get(field) for field in ('states', 'districts', 'crops', 'seasons')}
+        year_filters = []
+        if params.get('years'):
+            year_filters = self._process_year_filters(params['years'], self.sql_engine.start_years(**filters))
+        return self.sql_engine.crop_production(params.get('aggregation'), years=year_filters, **filters)
+    
+    def _crop_filter(self, params: dict) -> Tuple[Optional[Any], list]:
+        """Bitmap mask and resolved start years for the params' filters, memoized per snapshot"""
+        index = self.crop_index
+        # 'last N years' depends on today's date, so the year is part of the key
+        key = self._filter_key(params, ('states', 'districts', 'crops', 'seasons', 'years'), time.localtime().tm_year)
+        cached = self._filter_cache.get(key)
+        self._count_filter(cached is not None)
+        if cached is not None:
+            return cached
+        
+        # Apply filters (case-insensitive) as bitmap intersections; rows are only materialized once
+        mask = index.match(
+            states=params.get('states'),
+            districts=params.get('districts'),
+            crops=params.get('crops'),
+            seasons=params.get('seasons')
+        )
+        
+        year_filters = []
+        if params.get('years'):
+            year_filters = self._process_year_filters(params['years'], index.start_years(mask))
+            if year_filters:
+                mask = index.intersect(mask, index.match(years=year_filters))
+        
+        self._filter_cache.set(key, (mask, year_filters), ttl_seconds=float('inf'))
+        return mask, year_filters
+    
+    @staticmethod
+    def _filter_key(params: dict, fields: Tuple[str, ...], *extra: Any) -> str:
+        """Order- and case-insensitive key of the filter params"""
+        parts = [
+            ','.join(sorted(str(value).strip().lower() for value in params.get(field) or []))
+            for field in fields
+        ]
+        return '|'.join(parts + [str(value) for value in extra])
+    
+    def _count_filter(self, hit: bool):
+        with self._stats_lock:
+            if hit:
+                self.filter_hits += 1
+            else:
+                self.filter_misses += 1
+    
+    def _crop_production_pandas(self, params: dict) -> pd.DataFrame:
+        """Matching rows, top crops or per-state averages from the bitmap index and cubes"""
+        mask, year_filters = self._crop_filter(params)
+        df = self.crop_index.take(mask)
+        if year_filters:
+            print(f"DEBUG: Filtered to {len(df)} records for years: {sorted(year_filters)}")
+        
+        # Perform aggregation; the cubes have no season axis, so season filters group on the fly
+        use_cubes = not params.get('seasons')
+        cube_filters = {
+            'states': params.get('states'),
+            'districts': params.get('districts'),
+            'crops': params.get('crops'),
+            'years': year_filters
+        }
+        if params.get('aggregation') == 'top':
+            if use_cubes:
+                return self.cubes.top_crops(limit=10, **cube_filters)
+            top_crops = df.groupby(['State_Name', 'Crop'])['Production'].sum().reset_index()
+            return top_crops.sort_values('Production', ascending=False)
+        if params.get('aggregation') == 'average':
+            if use_cubes:
+                return self.cubes.crop_averages(**cube_filters)
+            return df.groupby('State_Name').agg({
+                'Production': 'mean',
+                'Area': 'mean'
+            }).reset_index()
+        return df
+    
     def query_rainfall(self, params: dict) -> Tuple[List[Dict], List[Dict]]:
         """Query rainfall data based on parameters"""
-        df = self.rainfall_df.copy()
         results = []
         sources = []
+        year_ints = self._convert_years_to_int(params.get('years') or [], self.rainfall_df, 'Year')
         
-        # Apply filters (case-insensitive)
-        if params.get('states'):
-            states_lower = [s.lower() for s in params['states']]
-            df = df[df['State'].str.lower().isin(states_lower)]
-        
-        if params.get('years'):
-            year_ints = self._convert_years_to_int(params['years'], df, 'Year')
-            if year_ints:
-                df = df[df['Year'].isin(year_ints)]
-                print(f"DEBUG: Filtered to {len(df)} records for years: {sorted(year_ints)}")
-        
-        # Track which years were actually used
-        years_used = sorted(df['Year'].unique().tolist()) if len(df) > 0 else []
+        df = None
+        if self.sql_engine is not None:
+            try:
+                df, years_used = self.sql_engine.rainfall(params.get('aggregation'), params.get('states'), year_ints)
+            except Exception as e:
+                print(f"⚠️ SQL engine failed for rainfall, falling back to pandas: {e}")
+        if df is None:
+            df, years_used = self._rainfall_pandas(params, year_ints)
         
         # Check if we have data after filtering
         if len(df) == 0:
@@ -147,23 +319,74 @@ class DataQueryEngine:
                 'years_used': years_used
             })
         elif params.get('aggregation') == 'average':
-            avg_rainfall = df.groupby('State').agg({
-                'Annual_Rainfall': 'mean',
-                'Monsoon_Rainfall': 'mean'
-            }).reset_index()
-            results.append({
-                'type': 'average_rainfall',
-                'data': avg_rainfall.to_dict('records'),
-                'years_used': years_used,
-                'note': f"Averages calculated from {len(years_used)} years: {', '.join(map(str, years_used))}"
-            })
+            results.append(self._shaped(
+                'average_rainfall',
+                df,
+                years_used=years_used,
+                note=f"Averages calculated from {len(years_used)} years: {', '.join(map(str, years_used))}"
+            ))
         else:
-            results.append({
-                'type': 'rainfall_data',
-                'data': df.to_dict('records'),
-                'years_used': years_used
-            })
+            results.append(self._shaped(
+                'rainfall_data',
+                df,
+                years_used=years_used
+            ))
+        
+        sources.append({
+            'dataset': 'Rainfall in India',
+            'source': 'data.gov.in - India Meteorological Department (IMD)',
+            'url': 'https://www.data.gov.in/catalog/rainfall-india'
+        })
+        
+        return results, sources
+    
+    def _rainfall_pandas(self, params: dict, year_ints: List[int]) -> Tuple[pd.DataFrame, List[int]]:
+        """Matching rainfall rows (or per-state averages from the cube) plus the years used"""
+        if params.get('aggregation') == 'average':
+            # Averages are read from the state x year cube
+            return self.cubes.rainfall_averages(params.get('states'), year_ints)
+        
+        df = self.rainfall_df
+        
+        # Apply filters (case-insensitive)
+        if params.get('states'):
+            states_lower = [s.strip().lower() for s in params['states']]
+            df = df[self.rainfall_states.isin(states_lower)]
+        
+        if year_ints:
+            df = df[df['Year'].isin(year_ints)]
+            print(f"DEBUG: Filtered to {len(df)} records for years: {sorted(year_ints)}")
+        
+        # Track which years were actually used
+        years_used = sorted(df['Year'].unique().tolist()) if len(df) > 0 else []
+        return df, years_used
+    
+    def query_correlation(self, params: dict) -> Tuple[List[Dict], List[Dict]]:
+        """Rainfall vs crop production/yield statistics by state, crop and year (comparison_type 'correlation')"""
+        results = []
+        sources = []
+        
+        # A correlation needs a run of years, so a narrower year filter is ignored
+        year_filters = self._process_year_filters(params.get('years') or [], self.crop_index.start_years())
+        years = [int(year) for year in year_filters]
+        if len(set(years)) < rainfall_correlation.MIN_YEARS:
+            years = []
+        
+        crop = self.cubes.crop_year_cells(params.get('states'), params.get('crops'), years)
+        rainfall = self._rainfall_year_cells(params)
+        table, statistics = rainfall_correlation.compute(crop, rainfall, 'Monsoon_Rainfall')
+        print(f"DEBUG: Correlation over {statistics['series']} state x crop series")
+        
+        if table.empty:
+            results.append({'type': 'correlation', 'data': [], 'statistics': statistics})
+        else:
+            results.append(self._shaped('correlation', table, statistics=statistics))
         
+        sources.append({
+            'dataset': 'District-wise Crop Production Statistics',
+            'source': 'data.gov.in - Ministry of Agriculture',
+            'url': 'https://www.data.gov.in/catalog/district-wise-season-wise-crop-production-statistics'
+        })
         sources.append({
             'dataset': 'Rainfall in India',
             'source': 'data.gov.in - India Meteorological Department (IMD)',
@@ -172,6 +395,35 @@ class DataQueryEngine:
         
         return results, sources
     
+    def _rainfall_year_cells(self, params: dict) -> pd.DataFrame:
+        """State x year rainfall cells, gaps filled from historical subdivisions when requested"""
+        rainfall = self.cubes.rainfall_year_cells(params.get('states'))
+        if 'historical_rainfall' not in params.get('data_needed', []):
+            return rainfall
+        
+        states = [state.strip().lower() for state in params.get('states') or self.STATE_SUBDIVISIONS]
+        subdivisions = {state: self.STATE_SUBDIVISIONS[state] for state in states if state in self.STATE_SUBDIVISIONS}
+        if not subdivisions:
+            return rainfall
+        
+        historical = historical_rainfall_store.query(
+            self._fetch_historical_rainfall_records, list(set(subdivisions.values()))
+        )
+        if historical.empty or 'jun_sep' not in historical.columns:
+            return rainfall
+        
+        frames = [rainfall]
+        for state, subdivision in subdivisions.items():
+            rows = historical[historical['subdivision'] == subdivision]
+            frames.append(pd.DataFrame({
+                'state': state,
+                'Year': rows['year'].to_numpy(),
+                'Annual_Rainfall': rows['annual'].to_numpy() if 'annual' in rows.columns else np.nan,
+                'Monsoon_Rainfall': rows['jun_sep'].to_numpy()
+            }))
+        # The snapshot's own rainfall wins where both have a state-year
+        return pd.concat(frames, ignore_index=True).drop_duplicates(['state', 'Year'], keep='first')
+    
     def query_apeda(self, params: dict) -> Tuple[List[Dict], List[Dict]]:
         """Query APEDA production data (2019-2024)"""
         results = []
@@ -179,14 +431,6 @@ class DataQueryEngine:
         
         print("DEBUG: query_apeda called with params:", params)
         
-        # Map crop names to APEDA product codes
-        crop_to_code = {
-            'rice': '1011', 'wheat': '1013', 'maize': '1009', 'bajra': '1010',
-            'jowar': '1012', 'barley': '1014', 'milk': '1023', 'mango': '1050',
-            'banana': '1051', 'apple': '1052', 'potato': '1083', 'onion': '1084',
-            'tomato': '1085', 'turmeric': '1099', 'chilli': '1100', 'coriander': '1101'
-        }
-        
         # Determine years to query
         years = params.get('years', [])
         if not years:
@@ -197,16 +441,13 @@ class DataQueryEngine:
         print(f"DEBUG: Financial years: {fin_years}")
         
         # Determine category and product code
-        category = params.get('apeda_category', 'All')
+        category = params.get('apeda_category') or 'All'  # The router sends null for "any category"
         product_code = params.get('product_code')
         
-        # If specific crops mentioned, use product codes
+        # If specific crops mentioned, resolve the first one through the product catalog
         crops = params.get('crops', [])
         if crops and (product_code is None or product_code == 'All'):
-            crop_name = crops[0].lower()
-            if crop_name in crop_to_code:
-                product_code = crop_to_code[crop_name]
-                print(f"DEBUG: Mapped crop '{crop_name}' to product code '{product_code}'")
+            product_code = self.data_gov.find_product_code(crops[0])
         
         # Ensure product_code is a string, not None
         if product_code is None:
@@ -214,13 +455,16 @@ class DataQueryEngine:
         
         print(f"DEBUG: Category: {category}, Product Code: {product_code}")
         
-        all_data = []
-        for fin_year in fin_years:
-            print(f"DEBUG: Fetching APEDA data for {fin_year}...")
-            df = self.data_gov.fetch_apeda_data(fin_year, category, product_code)
-            print(f"DEBUG: Received {len(df)} records from APEDA API")
-            if len(df) > 0:
-                all_data.append(df)
+        # One concurrent round for all years; warmed years are answered from the local store
+        async def fetch_years():
+            return await asyncio.gather(*[
+                self.data_gov.aio.fetch_apeda_data(fin_year, category, product_code)
+                for fin_year in fin_years
+            ])
+        
+        frames = http_client.run_sync(fetch_years())
+        print(f"DEBUG: Received {[len(df) for df in frames]} APEDA records for {fin_years}")
+        all_data = [df for df in frames if len(df) > 0]
         
         if all_data:
             combined_df = pd.concat(all_data, ignore_index=True)
@@ -230,11 +474,11 @@ class DataQueryEngine:
                 states_lower = [s.lower() for s in params['states']]
                 combined_df = combined_df[combined_df['State'].str.lower().isin(states_lower)]
             
-            results.append({
-                'type': 'apeda_production',
-                'data': combined_df.to_dict('records'),
-                'years_used': fin_years
-            })
+            results.append(self._shaped(
+                'apeda_production',
+                combined_df,
+                years_used=fin_years
+            ))
             
             sources.append({
                 'dataset': 'APEDA Production Statistics',
@@ -252,17 +496,38 @@ class DataQueryEngine:
         states = params.get('states', [])
         districts = params.get('districts', [])
         years = params.get('years', [])
-        
-        all_data = []
-        for state in (states or [None]):
-            for district in (districts or [None]):
-                for year in (years or [None]):
-                    df = self.data_gov.fetch_daily_rainfall(state, district, year, limit=100)
-                    if len(df) > 0:
-                        all_data.append(df)
-        
-        if all_data:
-            combined_df = pd.concat(all_data, ignore_index=True)
+        year_ints = self._convert_years_to_int(years, None, 'Year')
+        
+        truncated = None
+        if daily_rainfall_store.is_ready():
+            # Full-year data from the local warehouse (see services.rainfall_ingest)
+            combined_df = daily_rainfall_store.query(states, districts, year_ints)
+            print(f"DEBUG: Daily rainfall from warehouse: {len(combined_df)} rows")
+            all_data = [combined_df] if len(combined_df) > 0 else []
+        else:
+            all_data = self._fetch_daily_rainfall_live(states, districts, year_ints)
+            fetched = sum(len(df) for df in all_data)
+            total = sum(df.attrs.get('total_rows', len(df)) for df in all_data)
+            if total > fetched:
+                # Capped by DAILY_RAINFALL_MAX_ROWS: totals and averages cover only part of the period
+                truncated = {
+                    'rows_fetched': fetched,
+                    'rows_total': total,
+                    'note': f"Only {fetched} of {total} daily records were fetched; "
+                            f"totals and averages are incomplete"
+                }
+            if all_data:
+                combined_df = pd.concat(all_data, ignore_index=True)
+                self._remember_district_states(combined_df)
+                
+                # District calls span all requested years, so narrow the years locally
+                if year_ints and 'Year' in combined_df.columns:
+                    combined_df = combined_df[combined_df['Year'].isin(year_ints)]
+        
+        if all_data and len(combined_df) > 0:
+            fields = {'years_used': years}
+            if truncated:
+                fields['truncated'] = truncated
             
             # Calculate statistics if aggregation requested
             if params.get('aggregation') == 'average' and 'Avg_rainfall' in combined_df.columns:
@@ -270,23 +535,23 @@ class DataQueryEngine:
                     avg_data = combined_df.groupby('State')['Avg_rainfall'].agg(['mean', 'sum', 'count']).reset_index()
                     avg_data.columns = ['State', 'Average_Daily_Rainfall_mm', 'Total_Rainfall_mm', 'Days']
                     
-                    results.append({
-                        'type': 'daily_rainfall_summary',
-                        'data': avg_data.to_dict('records'),
-                        'years_used': years
-                    })
+                    results.append(self._shaped(
+                        'daily_rainfall_summary',
+                        avg_data,
+                        **fields
+                    ))
                 else:
-                    results.append({
-                        'type': 'daily_rainfall',
-                        'data': combined_df.to_dict('records')[:100],
-                        'years_used': years
-                    })
+                    results.append(self._shaped(
+                        'daily_rainfall',
+                        combined_df,
+                        **fields
+                    ))
             else:
-                results.append({
-                    'type': 'daily_rainfall',
-                    'data': combined_df.to_dict('records')[:100],
-                    'years_used': years
-                })
+                results.append(self._shaped(
+                    'daily_rainfall',
+                    combined_df,
+                    **fields
+                ))
             
             sources.append({
                 'dataset': 'Daily District-wise Rainfall Data',
@@ -296,56 +561,99 @@ class DataQueryEngine:
         
         return results, sources
     
+    def _fetch_daily_rainfall_live(self, states: list, districts: list, years: list) -> List[pd.DataFrame]:
+        """Fetch daily rainfall from data.gov.in (used until the warehouse is built)"""
+        plans = self._plan_daily_rainfall_requests(states, districts, years)
+        print(f"DEBUG: Daily rainfall plan: {len(plans)} paginated call(s) instead of "
+              f"{max(len(states), 1) * max(len(districts), 1) * max(len(years), 1)}")
+        
+        async def fetch_plans():
+            return await asyncio.gather(*[
+                self.data_gov.aio.fetch_daily_rainfall_all(
+                    plan['state'], plan['district'], plan['year'],
+                    page_size=settings.DAILY_RAINFALL_PAGE_SIZE,
+                    max_rows=settings.DAILY_RAINFALL_MAX_ROWS
+                )
+                for plan in plans
+            ])
+        
+        return [df for df in http_client.run_sync(fetch_plans()) if len(df) > 0]
+    
+    def _plan_daily_rainfall_requests(self, states: list, districts: list, years: list) -> List[Dict[str, Any]]:
+        """Collapse the state x district x year product into the fewest API calls
+        
+        Each district is fetched once across all requested years and each state
+        without a requested district once per year; the caller filters locally.
+        Districts known to belong to none of the requested states are skipped.
+        """
+        year_filter = years[0] if len(years) == 1 else None
+        known = self._known_district_states()
+        plans = []
+        covered_states = set()
+        
+        for district in districts:
+            owners = known.get(district.lower())
+            matching = [s for s in states if owners is None or s.lower() in owners]
+            if states and not matching:
+                print(f"DEBUG: Skipping district '{district}': not in {', '.join(states)}")
+                continue
+            for state in (matching or [None]):
+                plans.append({'state': state, 'district': district, 'year': year_filter})
+                covered_states.add(state)
+        
+        for state in states:
+            if state not in covered_states:
+                for year in (years or [None]):
+                    plans.append({'state': state, 'district': None, 'year': year})
+        
+        if not states and not districts:
+            for year in (years or [None]):
+                plans.append({'state': None, 'district': None, 'year': year})
+        
+        return plans
+    
+    def _known_district_states(self) -> Dict[str, set]:
+        """district (lower) -> states (lower) it is known to belong to"""
+        with _seen_district_states_lock:
+            known = {district: set(owners) for district, owners in _seen_district_states.items()}
+        
+        for district, states in self.crop_district_states.items():
+            known.setdefault(district, set()).update(states)
+        
+        return known
+    
+    def _remember_district_states(self, df: pd.DataFrame):
+        """Learn district -> state pairs from fetched daily rainfall rows"""
+        if not {'District', 'State'} <= set(df.columns):
+            return
+        
+        pairs = df[['District', 'State']].dropna().drop_duplicates()
+        with _seen_district_states_lock:
+            for district, state in zip(pairs['District'].str.lower(), pairs['State'].str.lower()):
+                _seen_district_states.setdefault(district, set()).add(state)
+    
     def query_historical_rainfall(self, params: dict) -> Tuple[List[Dict], List[Dict]]:
         """Query historical state-wise rainfall (1901-2015)"""
         results = []
         sources = []
         
-        # Map state names to meteorological subdivisions
-        subdivision_map = {
-            'punjab': 'PUNJAB',
-            'haryana': 'HARYANA DELHI & CHANDIGARH',
-            'delhi': 'HARYANA DELHI & CHANDIGARH',
-            'uttar pradesh': 'EAST UTTAR PRADESH',
-            'maharashtra': 'MADHYA MAHARASHTRA',
-            'karnataka': 'COASTAL KARNATAKA',
-            'west bengal': 'GANGETIC WEST BENGAL',
-            'tamil nadu': 'TAMIL NADU & PUDUCHERRY',
-            'kerala': 'KERALA',
-            'rajasthan': 'WEST RAJASTHAN',
-            'gujarat': 'GUJARAT REGION',
-            'bihar': 'BIHAR',
-            'odisha': 'ODISHA',
-            'andhra pradesh': 'COASTAL ANDHRA PRADESH'
-        }
-        
         states = params.get('states', [])
         years = params.get('years', [])
         
-        all_data = []
-        for state in states:
-            subdivision = subdivision_map.get(state.lower(), state.upper())
-            
-            # Fetch data
-            if years:
-                for year in years:
-                    df = self.data_gov.fetch_historical_rainfall(subdivision, year, limit=100)
-                    if len(df) > 0:
-                        all_data.append(df)
-            else:
-                df = self.data_gov.fetch_historical_rainfall(subdivision, limit=100)
-                if len(df) > 0:
-                    all_data.append(df)
+        subdivisions = [self.STATE_SUBDIVISIONS.get(state.lower(), state.upper()) for state in states]
+        year_ints = self._convert_years_to_int(years, None, 'year')
         
-        if all_data:
-            combined_df = pd.concat(all_data, ignore_index=True)
-            
-            # Filter by years if specified
-            if years and 'year' in combined_df.columns:
-                year_ints = [int(y) if isinstance(y, str) and y.isdigit() else y for y in years if str(y).isdigit()]
-                if year_ints:
-                    combined_df = combined_df[combined_df['year'].isin(year_ints)]
-            
+        if params.get('aggregation') == 'trend':
+            return self._historical_rainfall_trend(subdivisions, year_ints)
+        
+        # Served from the local warehouse; data.gov.in is only contacted on refresh
+        combined_df = pd.DataFrame()
+        if subdivisions:
+            combined_df = historical_rainfall_store.query(
+                self._fetch_historical_rainfall_records, subdivisions, year_ints
+            )
+        
+        if len(combined_df) > 0:
             # Calculate statistics if needed
             if params.get('aggregation') == 'average' and 'annual' in combined_df.columns:
                 if 'subdivision' in combined_df.columns:
@@ -355,23 +663,23 @@ class DataQueryEngine:
                     }).reset_index()
                     avg_data.columns = ['Subdivision', 'Average_Annual_Rainfall_mm', 'Average_Monsoon_Rainfall_mm']
                     
-                    results.append({
-                        'type': 'historical_rainfall_average',
-                        'data': avg_data.to_dict('records'),
-                        'years_used': years or list(range(1901, 2016))
-                    })
+                    results.append(self._shaped(
+                        'historical_rainfall_average',
+                        avg_data,
+                        years_used=years or list(range(1901, 2016))
+                    ))
                 else:
-                    results.append({
-                        'type': 'historical_rainfall',
-                        'data': combined_df.to_dict('records')[:100],
-                        'years_used': years
-                    })
+                    results.append(self._shaped(
+                        'historical_rainfall',
+                        combined_df,
+                        years_used=years
+                    ))
             else:
-                results.append({
-                    'type': 'historical_rainfall',
-                    'data': combined_df.to_dict('records')[:100],
-                    'years_used': years
-                })
+                results.append(self._shaped(
+                    'historical_rainfall',
+                    combined_df,
+                    years_used=years
+                ))
             
             sources.append({
                 'dataset': 'Historical Rainfall Data (1901-2015)',
@@ -381,9 +689,38 @@ class DataQueryEngine:
         
         return results, sources
     
+    def _historical_rainfall_trend(self, subdivisions: List[str], year_ints: List[int]) -> Tuple[List[Dict], List[Dict]]:
+        """Trend statistics for every subdivision over the full monthly matrix (aggregation 'trend')"""
+        results = []
+        sources = []
+        
+        df = historical_rainfall_store.ensure_loaded(self._fetch_historical_rainfall_records)
+        if df.empty or 'subdivision' not in df.columns:
+            return results, sources
+        
+        # Only a span of at least a decade narrows the series; fewer years cannot show a trend
+        year_range = None
+        if year_ints and max(year_ints) - min(year_ints) + 1 >= rainfall_trends.WINDOW:
+            year_range = (min(year_ints), max(year_ints))
+        
+        table, summary = rainfall_trends.analyze(df, subdivisions, year_range)
+        results.append(self._shaped('historical_rainfall_trend', table, trend_summary=summary))
+        
+        sources.append({
+            'dataset': 'Historical Rainfall Data (1901-2015)',
+            'source': 'data.gov.in - India Meteorological Department (IMD)',
+            'url': 'https://www.data.gov.in/'
+        })
+        
+        return results, sources
+    
+    def _fetch_historical_rainfall_records(self) -> list:
+        """Full historical rainfall resource, for (re)ingesting the warehouse"""
+        return self.data_gov.fetch_all_records(self.data_gov.HISTORICAL_RAINFALL_RESOURCE_ID)
+    
     # Helper methods
-    def _process_year_filters(self, years: list, df: pd.DataFrame) -> list:
-        """Process year filters including 'last N years' logic"""
+    def _process_year_filters(self, years: list, available_years: List[int]) -> list:
+        """Process year filters including 'last N years' logic (available_years: start years in the data)"""
         year_filters = []
         for y in years:
             if isinstance(y, int):
@@ -400,9 +737,6 @@ class DataQueryEngine:
                         current_year = datetime.now().year
                         requested_years = list(range(current_year - n + 1, current_year + 1))
                         
-                        available_years = df['Crop_Year'].str.split('-').str[0].unique()
-                        available_years = sorted([int(yr) for yr in available_years if yr.isdigit()])
-                        
                         matching_years = [yr for yr in requested_years if yr in available_years]
                         if matching_years:
                             year_filters.extend([str(yr) for yr in matching_years])
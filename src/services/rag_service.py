@@ -17,6 +17,7 @@ from langchain_core.runnables import RunnablePassthrough
 from langchain_core.documents import Document
 
 from config.settings import settings
+from services.circuit_breaker import CircuitOpenError, circuit_breakers
 
 
 # ============================================================================
@@ -596,14 +597,20 @@ class RAGService:
     
     def _init_cloud_client(self):
         """Initialize Chroma Cloud client"""
+        breaker = circuit_breakers.get('chroma_cloud')
         try:
+            breaker.check()
             self.chroma_client = chromadb.CloudClient(
                 api_key=CHROMA_API_KEY,
                 tenant=CHROMA_TENANT,
                 database=CHROMA_DATABASE
             )
+            breaker.record_success()
             print("DEBUG: Connected to Chroma Cloud")
         except Exception as e:
+            # The breaker's own rejection is not a new upstream failure; counting it would keep it open
+            if not isinstance(e, CircuitOpenError):
+                breaker.record_failure(e)
             print(f"DEBUG: Chroma Cloud connection failed: {e}, falling back to local")
             self._init_local_client()
             self.use_cloud = False
@@ -671,8 +678,16 @@ class RAGService:
         Returns:
             List of relevant documents with scores
         """
+        # Chroma Cloud down: answer without knowledge-base context instead of waiting on it
+        breaker = circuit_breakers.get('chroma_cloud') if self.use_cloud else None
+        if breaker and not breaker.allow():
+            print("DEBUG: Chroma Cloud circuit open, skipping knowledge base search")
+            return []
+        
         try:
             results = self.vector_store.similarity_search_with_score(query, k=k)
+            if breaker:
+                breaker.record_success()
             
             documents = []
             for doc, score in results:
@@ -685,6 +700,8 @@ class RAGService:
             return documents
             
         except Exception as e:
+            if breaker:
+                breaker.record_failure(e)
             print(f"DEBUG: Search error: {e}")
             return []
     
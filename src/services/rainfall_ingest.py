@@ -0,0 +1,134 @@
+"""Background bulk ingestion of daily district rainfall into the local warehouse"""
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.settings import settings
+from database.warehouse import DailyRainfallStore, daily_rainfall_store
+from .data_integration import AsyncDataGovIntegration
+
+
+class DailyRainfallIngestor:
+    """
+    Pages through the whole daily rainfall resource with parallel offset ranges,
+    streaming each window of pages into the state/year partitioned store, and
+    afterwards keeps the open year(s) topped up with newly published days.
+    """
+    
+    def __init__(self, data_gov: AsyncDataGovIntegration, store: DailyRainfallStore = daily_rainfall_store):
+        self.data_gov = data_gov
+        self.store = store
+        self.resource_id = data_gov.DAILY_RAINFALL_RESOURCE_ID
+        self.page_size = settings.DAILY_RAINFALL_PAGE_SIZE
+        self.parallel_pages = settings.DAILY_RAINFALL_INGEST_PARALLEL
+        self.status = 'idle'
+        self.progress: Dict[str, int] = {}
+        self.last_error: Optional[str] = None
+    
+    async def _fetch_page(self, offset: int, filters: Optional[Dict[str, Any]] = None,
+                          limit: Optional[int] = None) -> Tuple[List[dict], int]:
+        """One page, retried with backoff before giving up on the run"""
+        for attempt in range(3):
+            try:
+                return await self.data_gov.fetch_records_page(
+                    self.resource_id, filters, limit or self.page_size, offset
+                )
+            except Exception as e:
+                if attempt == 2:
+                    raise
+                print(f"DEBUG: Daily rainfall page {offset} failed ({e}), retrying...")
+                await asyncio.sleep(2 ** attempt)
+    
+    async def full_ingest(self):
+        """Download every record into a staged build, then swap it in"""
+        self.status = 'ingesting'
+        await asyncio.to_thread(self.store.begin_build)
+        
+        rows_per_year: Dict[int, int] = {}
+        
+        async def store_window(records: List[dict], chunk_id: str):
+            written = await asyncio.to_thread(
+                lambda: self.store.write_chunk(self.store.normalize(records), chunk_id)
+            )
+            for year, rows in written.items():
+                rows_per_year[year] = rows_per_year.get(year, 0) + rows
+        
+        first, total = await self._fetch_page(0)
+        print(f"📥 Daily rainfall ingest: {total} records in pages of {self.page_size}")
+        await store_window(first, f"{0:09d}")
+        received = len(first)
+        
+        offsets = list(range(self.page_size, total, self.page_size))
+        for i in range(0, len(offsets), self.parallel_pages):
+            window = offsets[i:i + self.parallel_pages]
+            pages = await asyncio.gather(*[self._fetch_page(offset) for offset in window])
+            records = [record for page_records, _ in pages for record in page_records]
+            await store_window(records, f"{window[0]:09d}")
+            
+            received += len(records)
+            self.progress = {'received': received, 'total': total}
+            print(f"📥 Daily rainfall ingest: {received}/{total}")
+        
+        if received < total:
+            raise ValueError(f"Incomplete daily rainfall download: {received}/{total} records")
+        
+        await asyncio.to_thread(self.store.commit_build, rows_per_year, total)
+        print(f"✅ Daily rainfall warehouse built: {sum(rows_per_year.values())} rows, "
+              f"years {sorted(rows_per_year)}")
+    
+    async def top_up(self):
+        """Re-fetch the open year(s) when upstream has more rows than the warehouse"""
+        self.status = 'topping_up'
+        stored_years = [int(year) for year in self.store.get_stats()['years']]
+        open_years = sorted({datetime.now().year, *stored_years[-1:]})
+        
+        for year in open_years:
+            _, upstream_rows = await self._fetch_page(0, {'Year': year}, limit=1)
+            if upstream_rows == 0 or upstream_rows == self.store.year_rows(year):
+                continue
+            
+            print(f"📥 Daily rainfall top-up {year}: {self.store.year_rows(year)} -> {upstream_rows} rows")
+            records = await self.data_gov.fetch_all_records(self.resource_id, {'Year': year}, self.page_size)
+            await asyncio.to_thread(
+                lambda: self.store.replace_year(year, self.store.normalize(records))
+            )
+    
+    async def run(self):
+        """Background job: full ingest once, then periodic top-ups
+        
+        Only one process builds at a time (see DailyRainfallStore.build_lock);
+        the others check back every minute and pick up its result.
+        """
+        while True:
+            busy = False
+            try:
+                with self.store.build_lock() as locked:
+                    if not locked:
+                        busy = True
+                        self.status = 'waiting'
+                        print("DEBUG: Daily rainfall warehouse is being built by another process")
+                    else:
+                        await asyncio.to_thread(self.store.reload_meta)
+                        if self.store.is_ready():
+                            await self.top_up()
+                        else:
+                            await self.full_ingest()
+                        self.status = 'idle'
+                        self.last_error = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.status = 'failed'
+                self.last_error = str(e)
+                print(f"❌ Daily rainfall ingestion failed: {e}")
+            
+            await asyncio.sleep(60 if busy else settings.DAILY_RAINFALL_TOPUP_HOURS * 3600)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Job status plus warehouse metadata for the health endpoint"""
+        return {
+            'status': self.status,
+            'progress': self.progress,
+            'last_error': self.last_error,
+            **self.store.get_stats()
+        }
@@ -0,0 +1,199 @@
+"""Vectorized trend statistics over the 1901-2015 subdivision x year x month rainfall matrix"""
+import warnings
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .result_shaper import MONTH_COLUMNS
+
+
+def _t_critical(df: np.ndarray) -> np.ndarray:
+    """Two-sided 95% Student-t critical value (Cornish-Fisher expansion around z = 1.96)"""
+    z = 1.959964
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return z + (z ** 3 + z) / (4 * df) + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * df ** 2)
+
+
+class RainfallTrends:
+    """
+    Builds the (subdivision x year x month) matrix once per historical frame
+    and computes, for every subdivision in one NumPy pass:
+
+        decadal means (non-overlapping) and the 10-year rolling mean,
+        OLS slopes in mm/decade with 95% t intervals for the annual and
+        June-September totals and each month,
+        a single mean-shift change point (the split that best separates the
+        series, flagged when its two-sample t exceeds CHANGE_T).
+    """
+    
+    WINDOW = 10
+    MIN_SEGMENT = 10
+    CHANGE_T = 3.0
+    
+    def __init__(self):
+        # (frame, matrix) in one attribute so threads never pair a frame with another's matrix.
+        # The frame itself is kept, not its id: a garbage-collected frame's id can be reused
+        self._memo: Optional[Tuple[pd.DataFrame, Tuple[np.ndarray, np.ndarray, np.ndarray]]] = None
+    
+    def matrix(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(subdivisions, years, values[subdivision, year, month]) with NaN for missing months"""
+        memo = self._memo
+        if memo is not None and memo[0] is df:
+            return memo[1]
+        
+        subdivisions, sub_codes = pd.factorize(df['subdivision'])
+        first_year = int(df['year'].min())
+        years = np.arange(first_year, int(df['year'].max()) + 1)
+        values = np.full((len(sub_codes), len(years), len(MONTH_COLUMNS)), np.nan)
+        months = [col for col in MONTH_COLUMNS if col in df.columns]
+        positions = [MONTH_COLUMNS.index(col) for col in months]
+        values[subdivisions[:, None], (df['year'].to_numpy() - first_year)[:, None], positions] = \
+            df[months].to_numpy(dtype=float)
+        
+        matrix = (np.asarray(sub_codes), years, values)
+        self._memo = (df, matrix)
+        return matrix
+    
+    @staticmethod
+    def _slopes(series: np.ndarray, years: np.ndarray) -> Dict[str, np.ndarray]:
+        """OLS slope per decade, its 95% interval and n along the last axis (NaN-aware)"""
+        valid = np.isfinite(series)
+        n = valid.sum(axis=-1)
+        x = np.where(valid, years, 0.0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mx = x.sum(axis=-1, keepdims=True) / n[..., None]
+            my = np.where(valid, series, 0).sum(axis=-1, keepdims=True) / n[..., None]
+            dx = np.where(valid, years - mx, 0)
+            dy = np.where(valid, series - my, 0)
+            sxx = (dx * dx).sum(axis=-1)
+            slope = (dx * dy).sum(axis=-1) / sxx
+            residual = np.where(valid, dy - slope[..., None] * dx, 0)
+            se = np.sqrt((residual * residual).sum(axis=-1) / (n - 2) / sxx)
+            margin = _t_critical(n - 2.0) * se
+        return {'slope': slope * 10, 'low': (slope - margin) * 10, 'high': (slope + margin) * 10, 'n': n}
+    
+    def _change_points(self, series: np.ndarray, years: np.ndarray) -> Dict[str, np.ndarray]:
+        """Best single mean shift per row: split year, means before/after and its t statistic"""
+        # Missing years are filled with the row mean so cumulative sums stay aligned
+        with np.errstate(invalid='ignore'):
+            filled = np.where(np.isfinite(series), series, np.nanmean(series, axis=-1, keepdims=True))
+        count = filled.shape[-1]
+        k = np.arange(self.MIN_SEGMENT, count - self.MIN_SEGMENT + 1)
+        if len(k) == 0:
+            nan = np.full(filled.shape[:-1], np.nan)
+            return {'year': nan, 'before': nan, 'after': nan, 't': nan}
+        
+        csum = np.cumsum(filled, axis=-1)
+        csq = np.cumsum(filled * filled, axis=-1)
+        total, total_sq = csum[..., -1:], csq[..., -1:]
+        left_sum, left_sq = csum[..., k - 1], csq[..., k - 1]
+        right_sum, right_sq = total - left_sum, total_sq - left_sq
+        n_left, n_right = k, count - k
+        
+        mean_left, mean_right = left_sum / n_left, right_sum / n_right
+        with np.errstate(invalid='ignore', divide='ignore'):
+            pooled_var = ((left_sq - n_left * mean_left ** 2) + (right_sq - n_right * mean_right ** 2)) / (count - 2)
+            t = (mean_right - mean_left) / np.sqrt(pooled_var * (1 / n_left + 1 / n_right))
+        best = np.nanargmax(np.where(np.isfinite(t), np.abs(t), -1), axis=-1)
+        pick = lambda values: np.take_along_axis(values, best[..., None], axis=-1)[..., 0]
+        return {'year': years[k][best], 'before': pick(mean_left), 'after': pick(mean_right), 't': pick(t)}
+    
+    def analyze(self, df: pd.DataFrame, subdivisions: Optional[List[str]] = None,
+                year_range: Optional[Tuple[int, int]] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """Per-subdivision trend rows plus a summary and decadal means of the selected subdivisions
+        
+        The summary is None when none of the requested subdivisions has data.
+        """
+        with warnings.catch_warnings():
+            # Subdivisions without a single complete year give NaN statistics, not warnings
+            warnings.simplefilter('ignore', RuntimeWarning)
+            return self._analyze(df, subdivisions, year_range)
+    
+    def _analyze(self, df: pd.DataFrame, subdivisions: Optional[List[str]],
+                 year_range: Optional[Tuple[int, int]]) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        names, years, values = self.matrix(df)
+        if year_range:
+            keep = (years >= year_range[0]) & (years <= year_range[1])
+            years, values = years[keep], values[:, keep]
+        
+        # Annual / monsoon totals only where every month needed is present
+        annual = values.sum(axis=-1)
+        monsoon = values[..., 5:9].sum(axis=-1)
+        series = np.stack([annual, monsoon], axis=1)                    # (sub, 2, year)
+        trends = self._slopes(series, years)
+        monthly = self._slopes(np.moveaxis(values, -1, 1), years)     # (sub, 12)
+        change = self._change_points(annual, years)
+        
+        # Decadal means: non-overlapping windows starting at the first year; rolling 10-year mean
+        starts = years[::self.WINDOW]
+        decades = np.empty((len(names), 0))
+        if len(years):
+            decades = np.stack([np.nanmean(annual[:, i:i + self.WINDOW], axis=-1)
+                                for i in range(0, len(years), self.WINDOW)], axis=-1)
+        valid = np.isfinite(annual)
+        csum = np.concatenate([np.zeros((len(names), 1)), np.cumsum(np.where(valid, annual, 0), axis=-1)], axis=-1)
+        ccount = np.concatenate([np.zeros((len(names), 1)), np.cumsum(valid, axis=-1)], axis=-1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rolling = (csum[:, self.WINDOW:] - csum[:, :-self.WINDOW]) / (ccount[:, self.WINDOW:] - ccount[:, :-self.WINDOW])
+        
+        significant = (trends['low'] > 0) | (trends['high'] < 0)
+        month_up = (monthly['low'] > 0)
+        month_down = (monthly['high'] < 0)
+        shift = np.abs(change['t']) >= self.CHANGE_T
+        table = pd.DataFrame({
+            'Subdivision': names,
+            'Years': trends['n'][:, 0],
+            'Mean_Annual_mm': np.nanmean(annual, axis=-1),
+            'Annual_Slope_mm_per_decade': trends['slope'][:, 0],
+            'Annual_Slope_CI_Low': trends['low'][:, 0],
+            'Annual_Slope_CI_High': trends['high'][:, 0],
+            'Annual_Trend': np.where(significant[:, 0], np.where(trends['slope'][:, 0] > 0, 'rising', 'falling'), 'none'),
+            'Monsoon_Slope_mm_per_decade': trends['slope'][:, 1],
+            'Monsoon_Trend': np.where(significant[:, 1], np.where(trends['slope'][:, 1] > 0, 'rising', 'falling'), 'none'),
+            'Months_Rising': [', '.join(np.array(MONTH_COLUMNS)[row]) for row in month_up],
+            'Months_Falling': [', '.join(np.array(MONTH_COLUMNS)[row]) for row in month_down],
+            'First_Decade_Mean_mm': decades[:, 0] if decades.shape[1] else np.nan,
+            'Last_Decade_Mean_mm': decades[:, -1] if decades.shape[1] else np.nan,
+            'Change_Point_Year': np.where(shift, change['year'], None),
+            'Mean_Before_Change_mm': np.where(shift, change['before'], np.nan),
+            'Mean_After_Change_mm': np.where(shift, change['after'], np.nan)
+        })
+        
+        selected = np.ones(len(names), dtype=bool)
+        if subdivisions:
+            selected = np.isin(names, [name.upper() for name in subdivisions])
+            table = table[selected].reset_index(drop=True)
+        if table.empty:
+            return table, None
+        
+        # Summary over the selected rows only, so other regions' figures never stand in for them
+        summary = {
+            'subdivisions': int(len(table)),
+            'years': [int(years[0]), int(years[-1])] if len(years) else [],
+            'annual_trend_counts': table['Annual_Trend'].value_counts().to_dict(),
+            'monsoon_trend_counts': table['Monsoon_Trend'].value_counts().to_dict(),
+            'median_annual_slope_mm_per_decade': round(float(np.nanmedian(trends['slope'][selected, 0])), 2),
+            'change_points': int(shift[selected].sum())
+        }
+        
+        # Decadal and rolling means only for the requested subdivisions, to keep the answer small
+        decadal = {}
+        if subdivisions:
+            for row in np.flatnonzero(selected):
+                decadal[str(names[row])] = {
+                    f"{int(start)}-{min(int(start) + self.WINDOW - 1, int(years[-1]))}": round(float(value), 1)
+                    for start, value in zip(starts, decades[row]) if np.isfinite(value)
+                }
+                if rolling.shape[1] and np.isfinite(rolling[row]).any():
+                    peak = int(np.nanargmax(rolling[row]))
+                    low = int(np.nanargmin(rolling[row]))
+                    decadal[str(names[row])]['wettest_10yr_window'] = f"{years[peak]}-{years[peak] + self.WINDOW - 1}"
+                    decadal[str(names[row])]['driest_10yr_window'] = f"{years[low]}-{years[low] + self.WINDOW - 1}"
+        if decadal:
+            summary['decadal_means_mm'] = decadal
+        return table, summary
+
+
+# Global instance used by DataQueryEngine for aggregation "trend"
+rainfall_trends = RainfallTrends()
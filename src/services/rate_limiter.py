@@ -0,0 +1,129 @@
+"""Per-host token buckets with priority classes for the throttled upstream APIs"""
+import asyncio
+import heapq
+import itertools
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+# Priority classes: lower value is served first
+INTERACTIVE = 0
+PREFETCH = 1
+PRIORITY_NAMES = {INTERACTIVE: 'interactive', PREFETCH: 'prefetch'}
+
+# Priority of upstream calls made from the current context (task or thread)
+request_priority: ContextVar[int] = ContextVar('request_priority', default=INTERACTIVE)
+
+
+async def as_prefetch(coro):
+    """Await coro with every upstream call it makes queued behind interactive ones"""
+    token = request_priority.set(PREFETCH)
+    try:
+        return await coro
+    finally:
+        request_priority.reset(token)
+
+
+class HostRateLimiter:
+    """
+    Token bucket for one upstream host. When no token is free, callers queue
+    by (priority, arrival) and a dispatcher hands out tokens as they refill,
+    so interactive requests overtake queued prefetch work. A 429 halves the
+    rate and pauses the bucket; each success wins back 5% of the base rate.
+    """
+    
+    def __init__(self, host: str, rate: float, burst: Optional[float] = None):
+        self.host = host
+        self.base_rate = rate
+        self.rate = rate
+        self.min_rate = rate / 16
+        self.burst = burst or max(1.0, rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._arrivals = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self.throttled = 0
+        self._granted = {priority: 0 for priority in PRIORITY_NAMES}
+        self._wait_total = {priority: 0.0 for priority in PRIORITY_NAMES}
+        self._wait_max = {priority: 0.0 for priority in PRIORITY_NAMES}
+    
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def _delay(self) -> float:
+        """Seconds until the next token can be handed out (0 = now)"""
+        now = time.monotonic()
+        self._refill(now)
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+    
+    async def acquire(self, priority: int = INTERACTIVE):
+        """Wait for a token; must run on the event loop that owns the limiter"""
+        started = time.monotonic()
+        if not self._waiters and self._delay() == 0:
+            self.tokens -= 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._arrivals), future))
+            if self._dispatcher is None or self._dispatcher.done():
+                self._dispatcher = asyncio.create_task(self._dispatch())
+            await future
+        
+        waited = time.monotonic() - started
+        self._granted[priority] += 1
+        self._wait_total[priority] += waited
+        self._wait_max[priority] = max(self._wait_max[priority], waited)
+    
+    async def _dispatch(self):
+        """Hand tokens to the best queued waiter as they become available"""
+        while self._waiters:
+            delay = self._delay()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():  # Caller gave up while queued
+                continue
+            self.tokens -= 1
+            future.set_result(None)
+    
+    def on_throttled(self, retry_after: Optional[float] = None):
+        """Upstream answered 429: back off multiplicatively and pause"""
+        self.throttled += 1
+        self.rate = max(self.min_rate, self.rate / 2)
+        self.tokens = 0
+        pause = min(retry_after, 60.0) if retry_after is not None else 1 / self.rate
+        self.paused_until = time.monotonic() + pause
+        print(f"⚠️ {self.host} is throttling us, slowing to {self.rate:.2f} req/s")
+    
+    def on_success(self):
+        """Recover additively towards the configured rate"""
+        if self.rate < self.base_rate:
+            self.rate = min(self.base_rate, self.rate + self.base_rate * 0.05)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, wait times and current rate for the health endpoint"""
+        queued = {name: 0 for name in PRIORITY_NAMES.values()}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                queued[PRIORITY_NAMES[priority]] += 1
+        
+        return {
+            'rate_per_second': round(self.rate, 3),
+            'base_rate_per_second': self.base_rate,
+            'queued': queued,
+            'granted': {PRIORITY_NAMES[p]: n for p, n in self._granted.items()},
+            'avg_wait_ms': {
+                PRIORITY_NAMES[p]: round(self._wait_total[p] / n * 1000, 1) if n else 0.0
+                for p, n in self._granted.items()
+            },
+            'max_wait_ms': {PRIORITY_NAMES[p]: round(w * 1000, 1) for p, w in self._wait_max.items()},
+            'throttled': self.throttled
+        }
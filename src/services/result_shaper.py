@@ -0,0 +1,141 @@
+"""Projection, top-k and summaries applied to query results before they are serialized"""
+import json
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+from config.settings import settings
+
+# Monthly columns of the historical rainfall resource; the seasonal and annual totals are kept
+MONTH_COLUMNS = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
+
+# Numeric columns that label a row rather than measure something
+KEY_COLUMNS = {'Year', 'year', 'Month', 'month', 'Crop_Year'}
+
+
+class ResultShaper:
+    """
+    Shapes one result frame for the answer prompt: drops columns the answer
+    does not need (per-type noise, all-null columns, and columns holding a
+    single value, which are reported once under fixed_columns), keeps the top
+    max_rows rows by the result's ranking measure in their original order,
+    summarizes every measure over all rows, and rounds floats. A result that
+    already fits in max_rows is returned unchanged when shaping would not make
+    it smaller (fixed_columns costs more than it saves on a few rows). Sizes
+    are compact JSON bytes; above SAMPLE_ROWS the unshaped size is
+    extrapolated from a sample so shaping never serializes the full frame.
+    """
+    
+    # result type -> (ranking measure, columns dropped)
+    PROFILES = {
+        'crop_data': ('Production', []),
+        'top_crops': ('Production', []),
+        'averages': ('Production', []),
+        'rainfall_data': ('Annual_Rainfall', []),
+        'average_rainfall': ('Annual_Rainfall', []),
+        'apeda_production': ('Production', []),
+        'daily_rainfall': ('Avg_rainfall', []),
+        'daily_rainfall_summary': ('Total_Rainfall_mm', []),
+        'historical_rainfall': ('annual', MONTH_COLUMNS),
+        'historical_rainfall_average': ('Average_Annual_Rainfall_mm', []),
+        'correlation': (None, []),  # Already ranked by |Pearson|
+        'historical_rainfall_trend': ('Annual_Slope_mm_per_decade', []),
+    }
+    
+    SAMPLE_ROWS = 200
+    DECIMALS = 2
+    
+    def __init__(self, max_rows: Optional[int] = None):
+        self.max_rows = max_rows if max_rows is not None else settings.RESULT_MAX_ROWS
+    
+    @staticmethod
+    def _json_bytes(value: Any) -> int:
+        return len(json.dumps(value, default=str))
+    
+    def _bytes_before(self, df: pd.DataFrame) -> int:
+        """Compact JSON size of df.to_dict('records') (extrapolated from a sample for large frames)"""
+        if len(df) <= self.SAMPLE_ROWS:
+            return self._json_bytes(df.to_dict('records'))
+        sample = df.sample(self.SAMPLE_ROWS, random_state=0)
+        return 2 + round((self._json_bytes(sample.to_dict('records')) - 2) * len(df) / self.SAMPLE_ROWS)
+    
+    def _project(self, result_type: str, df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """Drop unneeded columns; single-valued ones come back separately"""
+        _, dropped = self.PROFILES.get(result_type, (None, []))
+        df = df.drop(columns=[col for col in dropped if col in df.columns])
+        df = df.dropna(axis=1, how='all')
+        
+        fixed = {}
+        if len(df) > 1:
+            for col in df.columns:
+                values = df[col].unique()
+                if len(values) == 1:
+                    fixed[col] = values[0].item() if hasattr(values[0], 'item') else values[0]
+            df = df.drop(columns=list(fixed))
+        return df, fixed
+    
+    def _measure(self, result_type: str, df: pd.DataFrame) -> Optional[str]:
+        """Column to rank rows by: the type's measure, else the first numeric non-key column
+        (None keeps the incoming order)"""
+        measure, _ = self.PROFILES.get(result_type, (None, []))
+        if measure in df.columns:
+            return measure
+        if result_type in self.PROFILES and measure is None:
+            return None
+        numeric = [col for col in df.select_dtypes('number').columns if col not in KEY_COLUMNS]
+        return numeric[0] if numeric else None
+    
+    def _summary(self, df: pd.DataFrame, kept: int, measure: Optional[str]) -> Dict[str, Any]:
+        """Row counts plus sum/mean/min/max of every measure over all rows"""
+        measures = [col for col in df.select_dtypes('number').columns if col not in KEY_COLUMNS]
+        stats = df[measures].agg(['sum', 'mean', 'min', 'max']).round(self.DECIMALS)
+        return {
+            'rows_total': len(df),
+            'rows_returned': kept,
+            'ranked_by': measure,
+            'all_rows': {col: stats[col].to_dict() for col in measures}
+        }
+    
+    def shape(self, result_type: str, df: pd.DataFrame,
+              max_rows: Optional[int] = None) -> Tuple[Dict[str, Any], Dict[str, int]]:
+        """Result fields ('data' plus optional 'fixed_columns'/'summary') and the row/byte sizes"""
+        max_rows = self.max_rows if max_rows is None else max_rows
+        rows_before = len(df)
+        bytes_before = self._bytes_before(df)
+        raw = df
+        df, fixed = self._project(result_type, df)
+        
+        measure = self._measure(result_type, df)
+        summary = None
+        if max_rows and len(df) > max_rows:
+            summary = self._summary(df, max_rows, measure)
+            if measure:
+                ranked = df[measure].reset_index(drop=True).sort_values(ascending=False, kind='stable')
+                df = df.iloc[sorted(ranked.index[:max_rows])]
+            else:
+                df = df.head(max_rows)
+        
+        floats = df.select_dtypes('float').columns
+        if len(floats):
+            df = df.assign(**{col: df[col].round(self.DECIMALS) for col in floats})
+        
+        fields: Dict[str, Any] = {'data': df.to_dict('records')}
+        if fixed:
+            fields['fixed_columns'] = fixed
+        if summary:
+            fields['summary'] = summary
+        bytes_after = self._json_bytes(fields)
+        
+        # Nothing was cut, so shaping may only shrink the payload, never grow it
+        if summary is None and bytes_after >= bytes_before:
+            fields, bytes_after = {'data': raw.to_dict('records')}, bytes_before
+        return fields, {
+            'rows_before': rows_before,
+            'rows_after': len(df),
+            'bytes_before': bytes_before,
+            'bytes_after': bytes_after
+        }
+
+
+# Global instance shared by the query engine and the agent tools
+result_shaper = ResultShaper()
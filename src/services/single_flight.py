@@ -0,0 +1,42 @@
+"""Single-flight coalescing of identical in-flight requests"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one execution.
+    The first caller starts the work; callers arriving while it is still
+    running await the same task and receive the same result (or exception).
+    """
+    
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.executions = 0
+        self.coalesced = 0
+    
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Run func() once per key among concurrent callers"""
+        task = self._in_flight.get(key)
+        
+        if task is not None:
+            self.coalesced += 1
+            print(f"🔗 Coalesced duplicate in-flight request (key: {key[:12]}...)")
+        else:
+            self.executions += 1
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        
+        # Shield so one disconnected client does not cancel the work for the others
+        return await asyncio.shield(task)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters for the health endpoint"""
+        total = self.executions + self.coalesced
+        return {
+            "in_flight": len(self._in_flight),
+            "executions": self.executions,
+            "coalesced_requests": self.coalesced,
+            "coalesce_rate": round(self.coalesced / total, 4) if total else 0.0
+        }
@@ -0,0 +1,168 @@
+"""Versioned, atomically swapped snapshots of the in-memory datasets"""
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+import pandas as pd
+
+from config.settings import settings
+from database.warehouse import frame_sha256
+from .crop_index import CropIndex
+from .aggregate_cubes import AggregateCubes
+from .sql_engine import SQLQueryEngine, DUCKDB_AVAILABLE
+from .data_integration import DataGovIntegration
+from .query_engine import DataQueryEngine
+
+
+# Columns each dataset must have before a snapshot is published
+REQUIRED_COLUMNS = {
+    'crop_production': ['State_Name', 'District_Name', 'Crop_Year', 'Season', 'Crop', 'Area', 'Production'],
+    'rainfall': ['State', 'Year', 'Annual_Rainfall', 'Monsoon_Rainfall']
+}
+
+
+class DataSnapshot:
+    """
+    One immutable generation of the datasets, their indexes and the
+    DataQueryEngine that serves them; never modified after publishing, so the
+    engine's memoized filter results stay valid for the snapshot's lifetime.
+    """
+    
+    def __init__(self, version: int, frames: Dict[str, pd.DataFrame], previous: Optional['DataSnapshot'] = None,
+                 data_gov: Optional[DataGovIntegration] = None, checksums: Optional[Dict[str, str]] = None):
+        started = time.perf_counter()
+        self.version = version
+        self.checksums = checksums or {}
+        self.crop_production = frames['crop_production']
+        self.rainfall = frames['rainfall']
+        self.crop_index = CropIndex(self.crop_production)
+        # Only partitions that changed since the previous snapshot are rolled up again
+        self.cubes = AggregateCubes(self.crop_production, self.rainfall, previous.cubes if previous else None)
+        self.sql_engine = self._build_sql_engine()
+        self.query_engine = DataQueryEngine(
+            self.crop_production,
+            self.rainfall,
+            data_gov,
+            crop_index=self.crop_index,
+            cubes=self.cubes,
+            sql_engine=self.sql_engine
+        )
+        self.build_seconds = round(time.perf_counter() - started, 3)
+        self.memory_bytes = self._memory_bytes()
+        self.loaded_at = datetime.now()
+    
+    def _build_sql_engine(self) -> Optional[SQLQueryEngine]:
+        """DuckDB tables for this generation when QUERY_ENGINE=duckdb (None = pandas path)"""
+        if settings.QUERY_ENGINE != 'duckdb':
+            return None
+        if not DUCKDB_AVAILABLE:
+            print("⚠️ QUERY_ENGINE=duckdb but duckdb is not installed, using pandas")
+            return None
+        try:
+            return SQLQueryEngine(self.crop_production, self.rainfall, threads=settings.SQL_ENGINE_THREADS)
+        except Exception as e:
+            print(f"⚠️ Could not build SQL engine, using pandas: {e}")
+            return None
+    
+    def _memory_bytes(self) -> Dict[str, Optional[int]]:
+        """Approximate resident size of each part, measured once at build time"""
+        return {
+            'frames': int(self.crop_production.memory_usage(deep=True).sum() + self.rainfall.memory_usage(deep=True).sum()),
+            'crop_index': self.crop_index.nbytes,
+            'aggregate_cubes': self.cubes.nbytes,
+            'sql_engine': self.sql_engine.nbytes if self.sql_engine else None
+        }
+    
+    def age_seconds(self) -> float:
+        """Seconds since this snapshot was published"""
+        return (datetime.now() - self.loaded_at).total_seconds()
+
+
+class SnapshotManager:
+    """
+    Holds the current DataSnapshot. A refresh builds and validates the new
+    frames in a worker thread, then publishes them with a single reference
+    swap, so requests never wait on a reload and a request that already took
+    a snapshot keeps reading that version until it finishes.
+    """
+    
+    def __init__(self, loader: Callable[[], Dict[str, pd.DataFrame]], data_gov: Optional[DataGovIntegration] = None):
+        self.loader = loader
+        self.data_gov = data_gov
+        self._current: Optional[DataSnapshot] = None
+        self._refresh_lock = asyncio.Lock()
+        self.last_error: Optional[str] = None
+        self.unchanged_refreshes = 0
+    
+    @property
+    def current(self) -> Optional[DataSnapshot]:
+        """The snapshot new requests should use (None until the first load)"""
+        return self._current
+    
+    @staticmethod
+    def validate(frames: Dict[str, pd.DataFrame]):
+        """Raise ValueError if a dataset is missing, empty or lacks a required column"""
+        for name, columns in REQUIRED_COLUMNS.items():
+            df = frames.get(name)
+            if df is None or len(df) == 0:
+                raise ValueError(f"{name} is empty")
+            missing = [col for col in columns if col not in df.columns]
+            if missing:
+                raise ValueError(f"{name} is missing columns: {', '.join(missing)}")
+    
+    def _build(self, version: int) -> Optional[DataSnapshot]:
+        """Load, validate and index a new generation (runs in a worker thread); None if the data is unchanged"""
+        frames = self.loader()
+        self.validate(frames)
+        checksums = {name: frame_sha256(frames[name]) for name in REQUIRED_COLUMNS}
+        if self._current is not None and checksums == self._current.checksums:
+            return None
+        return DataSnapshot(version, frames, previous=self._current, data_gov=self.data_gov, checksums=checksums)
+    
+    async def refresh(self) -> bool:
+        """Build a new snapshot off the event loop and swap it in; keeps the old one on failure"""
+        async with self._refresh_lock:
+            version = self._current.version + 1 if self._current else 1
+            try:
+                snapshot = await asyncio.to_thread(self._build, version)
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"❌ Data snapshot refresh failed, keeping version "
+                      f"{self._current.version if self._current else 'none'}: {e}")
+                return False
+            
+            self.last_error = None
+            if snapshot is None:
+                # Same data: keep the current snapshot and its warm engine
+                self.unchanged_refreshes += 1
+                print(f"✅ Data unchanged, keeping snapshot v{self._current.version}")
+                return True
+            
+            self._current = snapshot
+            print(f"✅ Data snapshot v{version} published in {snapshot.build_seconds}s. "
+                  f"Crop records: {len(snapshot.crop_production)}, Rainfall records: {len(snapshot.rainfall)}")
+            return True
+    
+    async def run_refresher(self, interval_seconds: float):
+        """Background job: rebuild the snapshot every interval_seconds"""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            await self.refresh()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Version and age for the health endpoint"""
+        snapshot = self._current
+        return {
+            'version': snapshot.version if snapshot else None,
+            'loaded_at': snapshot.loaded_at.isoformat() if snapshot else None,
+            'age_seconds': round(snapshot.age_seconds(), 1) if snapshot else None,
+            'build_seconds': snapshot.build_seconds if snapshot else None,
+            'memory_bytes': snapshot.memory_bytes if snapshot else None,
+            'unchanged_refreshes': self.unchanged_refreshes,
+            'query_engine': snapshot.query_engine.get_stats() if snapshot else None,
+            'crop_index': snapshot.crop_index.get_stats() if snapshot else None,
+            'aggregate_cubes': snapshot.cubes.get_stats() if snapshot else None,
+            'sql_engine': snapshot.sql_engine.get_stats() if snapshot and snapshot.sql_engine else None,
+            'last_error': self.last_error
+        }
@@ -0,0 +1,173 @@
+"""Optional embedded SQL (DuckDB) execution of crop and rainfall queries"""
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    import duckdb
+    DUCKDB_AVAILABLE = True
+except ImportError:
+    DUCKDB_AVAILABLE = False
+
+
+class SQLQueryEngine:
+    """
+    Loads one snapshot's frames into an in-process DuckDB database as columnar
+    tables (sorted by state and year, so zone maps let filters skip row
+    groups) and compiles router params into one SQL statement per source:
+    filters, year resolution and the top/average aggregates all run inside
+    DuckDB's parallel executor and only the final rows come back as pandas.
+    """
+    
+    # Query parameter -> normalized crop table column
+    CROP_FILTERS = {
+        'states': '_state',
+        'districts': '_district',
+        'crops': '_crop',
+        'seasons': '_season'
+    }
+    
+    def __init__(self, crop_df: pd.DataFrame, rainfall_df: pd.DataFrame, threads: int = 0):
+        if not DUCKDB_AVAILABLE:
+            raise RuntimeError("duckdb is not installed")
+        
+        self.conn = duckdb.connect(':memory:')
+        if threads:
+            self.conn.execute(f"SET threads = {int(threads)}")
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        
+        self.conn.register('crop_frame', crop_df)
+        self.conn.execute("""
+            CREATE TABLE crop AS
+            SELECT *,
+                   row_number() OVER () AS _row,
+                   lower(trim(CAST(State_Name AS VARCHAR))) AS _state,
+                   lower(trim(CAST(District_Name AS VARCHAR))) AS _district,
+                   lower(trim(CAST(Crop AS VARCHAR))) AS _crop,
+                   lower(trim(CAST(Season AS VARCHAR))) AS _season,
+                   coalesce(TRY_CAST(substr(CAST(Crop_Year AS VARCHAR), 1, 4) AS INTEGER), 0) AS _year
+            FROM crop_frame
+            ORDER BY _state, _year
+        """)
+        self.conn.unregister('crop_frame')
+        self.crop_columns = list(crop_df.columns)
+        
+        self.conn.register('rainfall_frame', rainfall_df)
+        self.conn.execute("""
+            CREATE TABLE rainfall AS
+            SELECT *,
+                   row_number() OVER () AS _row,
+                   lower(trim(CAST(State AS VARCHAR))) AS _state
+            FROM rainfall_frame
+            ORDER BY _state, Year
+        """)
+        self.conn.unregister('rainfall_frame')
+        self.rainfall_columns = list(rainfall_df.columns)
+        
+        self.rows = {'crop': len(crop_df), 'rainfall': len(rainfall_df)}
+        self.queries = 0
+    
+    def _cursor(self):
+        """This thread's cursor (cursors share the database; one connection must not be shared by threads)"""
+        cursor = getattr(self._local, 'cursor', None)
+        if cursor is None:
+            with self._lock:
+                cursor = self._local.cursor = self.conn.cursor()
+        return cursor
+    
+    def _run(self, sql: str, args: List[Any]) -> pd.DataFrame:
+        """Execute a compiled statement and fetch the result as a DataFrame"""
+        self.queries += 1
+        return self._cursor().execute(sql, args).df()
+    
+    @staticmethod
+    def _where(filters: Dict[str, Optional[List[Any]]]) -> Tuple[str, List[Any]]:
+        """WHERE clause of IN lists over normalized columns (an empty filter is skipped)"""
+        clauses = []
+        args: List[Any] = []
+        for column, values in filters.items():
+            if not values:
+                continue
+            if column in ('_year', 'Year'):
+                values = [int(value) for value in values]
+            else:
+                values = [str(value).strip().lower() for value in values]
+            clauses.append(f"{column} IN ({', '.join('?' for _ in values)})")
+            args.extend(values)
+        return (f"WHERE {' AND '.join(clauses)}" if clauses else ""), args
+    
+    def _crop_where(self, years: Optional[List[Any]], filters: Dict[str, Optional[List[str]]]) -> Tuple[str, List[Any]]:
+        columns = {self.CROP_FILTERS[field]: values for field, values in filters.items() if field in self.CROP_FILTERS}
+        columns['_year'] = years
+        return self._where(columns)
+    
+    def start_years(self, **filters: Optional[List[str]]) -> List[int]:
+        """Distinct start years among the crop rows matching the name filters"""
+        where, args = self._crop_where(None, filters)
+        df = self._run(f"SELECT DISTINCT _year FROM crop {where} ORDER BY _year", args)
+        return [int(year) for year in df['_year'] if year]
+    
+    def crop_production(self, aggregation: Optional[str], years: Optional[List[Any]] = None,
+                        limit: int = 10, **filters: Optional[List[str]]) -> pd.DataFrame:
+        """Matching crop rows, or their top-crops / per-state averages, in the pandas path's shape"""
+        where, args = self._crop_where(years, filters)
+        if aggregation == 'top':
+            sql = f"""
+                SELECT arg_min(State_Name, _row) AS State_Name, arg_min(Crop, _row) AS Crop,
+                       sum(Production) AS Production
+                FROM crop {where}
+                GROUP BY _state, _crop
+                ORDER BY Production DESC NULLS LAST, min(_row)
+                LIMIT {int(limit)}
+            """
+        elif aggregation == 'average':
+            sql = f"""
+                SELECT arg_min(State_Name, _row) AS State_Name, avg(Production) AS Production, avg(Area) AS Area
+                FROM crop {where}
+                GROUP BY _state
+                ORDER BY State_Name
+            """
+        else:
+            columns = ', '.join(f'"{column}"' for column in self.crop_columns)
+            sql = f"SELECT {columns} FROM crop {where} ORDER BY _row"
+        return self._run(sql, args)
+    
+    def rainfall(self, aggregation: Optional[str], states: Optional[List[str]] = None,
+                 years: Optional[List[int]] = None) -> Tuple[pd.DataFrame, List[int]]:
+        """Matching rainfall rows (or per-state averages) plus the years that contributed"""
+        where, args = self._where({'_state': states, 'Year': years})
+        if aggregation == 'average':
+            sql = f"""
+                SELECT arg_min(State, _row) AS State,
+                       avg(Annual_Rainfall) AS Annual_Rainfall, avg(Monsoon_Rainfall) AS Monsoon_Rainfall,
+                       list(DISTINCT Year) AS _years
+                FROM rainfall {where}
+                GROUP BY _state
+                ORDER BY State
+            """
+            df = self._run(sql, args)
+            years_used = sorted({int(year) for group in df['_years'] for year in group})
+            return df.drop(columns='_years'), years_used
+        
+        columns = ', '.join(f'"{column}"' for column in self.rainfall_columns)
+        df = self._run(f"SELECT {columns} FROM rainfall {where} ORDER BY _row", args)
+        return df, sorted(df['Year'].unique().tolist()) if len(df) > 0 else []
+    
+    @property
+    def nbytes(self) -> Optional[int]:
+        """Memory DuckDB reports for this database (None if it cannot say)"""
+        try:
+            used = self._cursor().execute("SELECT sum(memory_usage_bytes) FROM duckdb_memory()").fetchone()[0]
+            return int(used)
+        except Exception:
+            return None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Table sizes and query count for the health endpoint"""
+        return {
+            'engine': f"duckdb {duckdb.__version__}",
+            'rows': self.rows,
+            'queries': self.queries
+        }
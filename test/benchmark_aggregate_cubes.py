@@ -0,0 +1,142 @@
+"""
+Benchmark the precomputed aggregate cubes against on-the-fly groupby.
+
+Builds a synthetic district-level crop frame (the real dataset has ~250k rows)
+plus a state x year rainfall frame, then times the top/average queries both
+ways and checks that they agree. Also times a full cube build versus an
+incremental rebuild after one state's rows change.
+
+Usage:
+    python test/benchmark_aggregate_cubes.py --rows 250000 --repeat 50
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add src to path
+src_path = Path(__file__).parent.parent / 'src'
+sys.path.insert(0, str(src_path))
+
+from services.aggregate_cubes import AggregateCubes
+
+
+def make_frames(rows, seed=0):
+    """Synthetic crop and rainfall frames with the snapshot's columns"""
+    rng = np.random.default_rng(seed)
+    states = [f"State {i}" for i in range(33)]
+    crops = [f"Crop {i}" for i in range(120)]
+    state_ids = rng.integers(0, len(states), rows)
+    start_years = rng.integers(1997, 2015, rows)
+
+    crop_df = pd.DataFrame({
+        'State_Name': [states[i] for i in state_ids],
+        'District_Name': [f"District {d} of {s}" for d, s in zip(rng.integers(0, 20, rows), state_ids)],
+        'Crop_Year': [f"{y}-{str(y + 1)[-2:]}" for y in start_years],
+        'Season': rng.choice(['Kharif', 'Rabi', 'Whole Year'], rows),
+        'Crop': [crops[i] for i in rng.integers(0, len(crops), rows)],
+        'Area': rng.random(rows) * 1000,
+        'Production': rng.random(rows) * 5000
+    })
+    rainfall_df = pd.DataFrame(
+        [(state, year, rng.random() * 3000, rng.random() * 2000) for state in states for year in range(1950, 2015)],
+        columns=['State', 'Year', 'Annual_Rainfall', 'Monsoon_Rainfall']
+    )
+    return crop_df, rainfall_df
+
+
+def groupby_top(df, states, crops, years):
+    """What query_crop_production did before the cubes"""
+    if states:
+        df = df[df['State_Name'].str.lower().isin([s.lower() for s in states])]
+    if crops:
+        df = df[df['Crop'].str.lower().isin([c.lower() for c in crops])]
+    if years:
+        df = df[df['Crop_Year'].str.split('-').str[0].isin([str(y) for y in years])]
+    top = df.groupby(['State_Name', 'Crop'])['Production'].sum().reset_index()
+    return top.sort_values('Production', ascending=False).head(10)
+
+
+def groupby_average(df, states, years):
+    if states:
+        df = df[df['State_Name'].str.lower().isin([s.lower() for s in states])]
+    if years:
+        df = df[df['Crop_Year'].str.split('-').str[0].isin([str(y) for y in years])]
+    return df.groupby('State_Name').agg({'Production': 'mean', 'Area': 'mean'}).reset_index()
+
+
+def timed(func, repeat):
+    """Median milliseconds over repeat runs, plus the last result"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate cube vs groupby benchmark")
+    parser.add_argument("--rows", type=int, default=250_000, help="Synthetic crop rows")
+    parser.add_argument("--repeat", type=int, default=50, help="Runs per query")
+    args = parser.parse_args()
+
+    crop_df, rainfall_df = make_frames(args.rows)
+
+    print("=" * 60)
+    print(f"AGGREGATE CUBE BENCHMARK ({args.rows} crop rows)")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    cubes = AggregateCubes(crop_df, rainfall_df)
+    full_build = time.perf_counter() - start
+
+    changed = crop_df.copy()
+    changed.loc[changed['State_Name'] == 'State 3', 'Production'] *= 1.1
+    start = time.perf_counter()
+    rebuilt = AggregateCubes(changed, rainfall_df, previous=cubes)
+    incremental_build = time.perf_counter() - start
+
+    print(f"\n🧊 Full build:         {full_build:.2f}s  {cubes.get_stats()}")
+    print(f"🧊 Incremental build:  {incremental_build:.2f}s  "
+          f"(rebuilt {rebuilt.rebuilt_partitions}, reused {rebuilt.reused_partitions} partitions)")
+
+    cases = [
+        ("top, all states", 'top', None, None, None),
+        ("top, 2 states", 'top', ['State 3', 'State 7'], None, None),
+        ("top, 1 crop x 2 years", 'top', None, ['Crop 5'], [2010, 2012]),
+        ("average, all states", 'average', None, None, None),
+        ("average, 3 states x 1 year", 'average', ['State 1', 'State 2', 'State 9'], None, [2005]),
+    ]
+
+    print(f"\n{'query':<30}{'groupby':>12}{'cube':>12}{'speedup':>10}  match")
+    for label, aggregation, states, crops, years in cases:
+        if aggregation == 'top':
+            slow_ms, expected = timed(lambda: groupby_top(crop_df, states, crops, years), args.repeat)
+            fast_ms, actual = timed(
+                lambda: cubes.top_crops(limit=10, states=states, crops=crops, years=years), args.repeat
+            )
+            match = np.allclose(expected['Production'].to_numpy(), actual['Production'].to_numpy())
+        else:
+            slow_ms, expected = timed(lambda: groupby_average(crop_df, states, years), args.repeat)
+            fast_ms, actual = timed(lambda: cubes.crop_averages(states=states, years=years), args.repeat)
+            match = np.allclose(expected[['Production', 'Area']].to_numpy(), actual[['Production', 'Area']].to_numpy())
+
+        print(f"{label:<30}{slow_ms:>10.2f}ms{fast_ms:>10.2f}ms{slow_ms / fast_ms:>9.1f}x  {'✅' if match else '❌'}")
+
+    slow_ms, expected = timed(
+        lambda: rainfall_df.groupby('State').agg({'Annual_Rainfall': 'mean', 'Monsoon_Rainfall': 'mean'}).reset_index(),
+        args.repeat
+    )
+    fast_ms, (actual, _) = timed(lambda: cubes.rainfall_averages(), args.repeat)
+    match = np.allclose(expected['Annual_Rainfall'].to_numpy(), actual['Annual_Rainfall'].to_numpy())
+    print(f"{'rainfall average, all states':<30}{slow_ms:>10.2f}ms{fast_ms:>10.2f}ms"
+          f"{slow_ms / fast_ms:>9.1f}x  {'✅' if match else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
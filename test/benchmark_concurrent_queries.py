@@ -0,0 +1,118 @@
+"""
+Benchmark concurrent throughput of /api/query on a single uvicorn worker.
+
+Fires N distinct questions at the same time and, while they are in flight,
+keeps polling /api/health. When the agent blocks the event loop every health
+probe waits for a whole query; with the async agent path they stay fast.
+
+Usage (run once against the old build and once against the new one):
+    uvicorn app_modular:app --workers 1
+    python test/benchmark_concurrent_queries.py --concurrency 8
+"""
+import argparse
+import statistics
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+API_URL = "http://localhost:8000"
+
+QUESTIONS = [
+    "What is the rice production in Punjab for 2022?",
+    "Compare wheat production in Punjab and Haryana in 2023",
+    "What was the rainfall in Maharashtra in 2021?",
+    "Which state produced the most maize in 2020?",
+    "Tell me about mango production in Uttar Pradesh in 2023",
+    "What is the average rainfall in Kerala between 1950 and 1960?",
+    "How much milk did Gujarat produce in 2022?",
+    "What are the top crops in Karnataka?",
+]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def run_query(question):
+    """POST one question and return (latency_seconds, status_code)"""
+    start = time.perf_counter()
+    try:
+        # Unique suffix so the MongoDB answer cache never short-circuits the run
+        response = requests.post(
+            f"{API_URL}/api/query",
+            json={"question": f"{question} (bench {uuid.uuid4().hex[:8]})"},
+            timeout=300
+        )
+        status = response.status_code
+    except Exception as e:
+        print(f"❌ Query failed: {e}")
+        status = 0
+    return time.perf_counter() - start, status
+
+
+def poll_health(stop_event, latencies):
+    """Probe /api/health every 250ms until stopped"""
+    while not stop_event.is_set():
+        start = time.perf_counter()
+        try:
+            requests.get(f"{API_URL}/api/health", timeout=300)
+            latencies.append(time.perf_counter() - start)
+        except Exception as e:
+            print(f"❌ Health probe failed: {e}")
+        time.sleep(0.25)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent /api/query benchmark")
+    parser.add_argument("--concurrency", type=int, default=8, help="Questions sent at once")
+    parser.add_argument("--rounds", type=int, default=1, help="How many bursts to send")
+    args = parser.parse_args()
+
+    questions = [QUESTIONS[i % len(QUESTIONS)] for i in range(args.concurrency)]
+
+    print("=" * 60)
+    print(f"CONCURRENT QUERY BENCHMARK ({args.concurrency} at once, {args.rounds} round(s))")
+    print("=" * 60)
+
+    query_latencies = []
+    health_latencies = []
+    failures = 0
+
+    stop_event = threading.Event()
+    poller = threading.Thread(target=poll_health, args=(stop_event, health_latencies), daemon=True)
+    poller.start()
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for _ in range(args.rounds):
+            for latency, status in pool.map(run_query, questions):
+                query_latencies.append(latency)
+                if status != 200:
+                    failures += 1
+    wall_time = time.perf_counter() - wall_start
+
+    stop_event.set()
+    poller.join()
+
+    total = len(query_latencies)
+    print(f"\n📊 Queries:     {total} ({failures} failed)")
+    print(f"⏱️  Wall time:   {wall_time:.2f}s")
+    print(f"🚀 Throughput:  {total / wall_time:.2f} queries/s")
+    print(f"   Query p50:   {statistics.median(query_latencies):.2f}s")
+    print(f"   Query p95:   {percentile(query_latencies, 95):.2f}s")
+    if health_latencies:
+        print(f"\n💓 /api/health while loaded ({len(health_latencies)} probes)")
+        print(f"   p50:         {statistics.median(health_latencies) * 1000:.0f}ms")
+        print(f"   max:         {max(health_latencies) * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Benchmark the embedded DuckDB engine against the pandas path of DataQueryEngine.
+
+Runs the same router params through query_crop_production / query_rainfall
+with and without a SQLQueryEngine, on the bundled sample data and on a
+synthetic full-size crop frame (the real dataset has ~250k rows), and checks
+that both paths return the same answer.
+
+Requires: pip install duckdb
+
+Usage:
+    python test/benchmark_sql_engine.py --rows 250000 --repeat 20
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add src to path
+src_path = Path(__file__).parent.parent / 'src'
+sys.path.insert(0, str(src_path))
+
+from services.data_integration import DataGovIntegration
+from services.query_engine import DataQueryEngine
+from services.sql_engine import SQLQueryEngine, DUCKDB_AVAILABLE
+
+
+CASES = [
+    ("crop rows, 1 state", 'crop_production', {'states': ['State 3'], 'aggregation': None}),
+    ("crop rows, 2 crops x 1 year", 'crop_production', {'crops': ['Crop 5', 'Crop 9'], 'years': ['2010']}),
+    ("top, all states", 'crop_production', {'aggregation': 'top'}),
+    ("top, 2 states x last 3 years", 'crop_production',
+     {'states': ['State 3', 'State 7'], 'years': ['last 3 years'], 'aggregation': 'top'}),
+    ("top, Kharif season", 'crop_production', {'seasons': ['Kharif'], 'aggregation': 'top'}),
+    ("average, 3 states", 'crop_production', {'states': ['State 1', 'State 2', 'State 9'], 'aggregation': 'average'}),
+    ("rainfall rows, 2 states", 'rainfall', {'states': ['State 1', 'State 2']}),
+    ("rainfall average, all states", 'rainfall', {'aggregation': 'average'}),
+]
+
+
+def make_frames(rows, seed=0):
+    """Synthetic crop and rainfall frames with the snapshot's columns"""
+    rng = np.random.default_rng(seed)
+    states = [f"State {i}" for i in range(33)]
+    crops = [f"Crop {i}" for i in range(120)]
+    state_ids = rng.integers(0, len(states), rows)
+    start_years = rng.integers(1997, 2015, rows)
+
+    crop_df = pd.DataFrame({
+        'State_Name': [states[i] for i in state_ids],
+        'District_Name': [f"District {d} of {s}" for d, s in zip(rng.integers(0, 20, rows), state_ids)],
+        'Crop_Year': [f"{y}-{str(y + 1)[-2:]}" for y in start_years],
+        'Season': rng.choice(['Kharif', 'Rabi', 'Whole Year'], rows),
+        'Crop': [crops[i] for i in rng.integers(0, len(crops), rows)],
+        'Area': rng.random(rows) * 1000,
+        'Production': rng.random(rows) * 5000
+    })
+    rainfall_df = pd.DataFrame(
+        [(state, year, rng.random() * 3000, rng.random() * 2000) for state in states for year in range(1950, 2015)],
+        columns=['State', 'Year', 'Annual_Rainfall', 'Monsoon_Rainfall']
+    )
+    return crop_df, rainfall_df
+
+
+def sample_frames():
+    """The bundled sample data the app falls back to without an API key"""
+    data_gov = DataGovIntegration()
+    return pd.DataFrame(data_gov._get_sample_crop_data()), pd.DataFrame(data_gov._get_sample_rainfall_data())
+
+
+def sample_cases(crop_df, rainfall_df):
+    """CASES with the synthetic names swapped for ones present in the sample data"""
+    states = crop_df['State_Name'].unique().tolist()
+    crops = crop_df['Crop'].unique().tolist()
+    rain_states = rainfall_df['State'].unique().tolist()
+    year = str(crop_df['Crop_Year'].astype(str).str[:4].iloc[0])
+    names = {f"State {i}": states[i % len(states)] for i in range(33)}
+    names.update({f"Crop {i}": crops[i % len(crops)] for i in range(120)})
+    rain_names = {f"State {i}": rain_states[i % len(rain_states)] for i in range(33)}
+
+    cases = []
+    for label, source, params in CASES:
+        mapping = rain_names if source == 'rainfall' else names
+        params = {key: [mapping.get(v, v) for v in value] if key in ('states', 'crops') else value
+                  for key, value in params.items()}
+        if params.get('years') == ['2010']:
+            params['years'] = [year]
+        cases.append((label, source, params))
+    return cases
+
+
+def timed(func, repeat):
+    """Median milliseconds over repeat runs, plus the last result"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def same_answer(expected, actual):
+    """Compare the data records of two query results (floats to a tolerance)"""
+    left = pd.DataFrame(expected[0][0]['data'])
+    right = pd.DataFrame(actual[0][0]['data'])
+    if left.shape != right.shape or list(left.columns) != list(right.columns):
+        return False
+    for column in left.columns:
+        if pd.api.types.is_numeric_dtype(left[column]):
+            if not np.allclose(left[column].to_numpy(dtype=float), right[column].to_numpy(dtype=float), equal_nan=True):
+                return False
+        elif left[column].astype(str).tolist() != right[column].astype(str).tolist():
+            return False
+    return True
+
+
+def run(title, crop_df, rainfall_df, cases, repeat):
+    print("\n" + "=" * 60)
+    print(f"{title} ({len(crop_df)} crop rows, {len(rainfall_df)} rainfall rows)")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    pandas_engine = DataQueryEngine(crop_df, rainfall_df, data_gov_integration=DataGovIntegration())
+    pandas_build = time.perf_counter() - start
+    start = time.perf_counter()
+    sql = SQLQueryEngine(crop_df, rainfall_df)
+    sql_build = time.perf_counter() - start
+    sql_engine = DataQueryEngine(crop_df, rainfall_df, data_gov_integration=pandas_engine.data_gov,
+                                 crop_index=pandas_engine.crop_index, cubes=pandas_engine.cubes, sql_engine=sql)
+
+    print(f"\n🏗️  Build: pandas index + cubes {pandas_build:.2f}s, duckdb tables {sql_build:.2f}s")
+    print(f"\n{'query':<34}{'pandas':>11}{'duckdb':>11}{'speedup':>10}  match")
+    for label, source, params in cases:
+        pandas_query = getattr(pandas_engine, f"query_{source}")
+        sql_query = getattr(sql_engine, f"query_{source}")
+        slow_ms, expected = timed(lambda: pandas_query(params), repeat)
+        fast_ms, actual = timed(lambda: sql_query(params), repeat)
+        match = same_answer(expected, actual)
+        print(f"{label:<34}{slow_ms:>9.2f}ms{fast_ms:>9.2f}ms{slow_ms / fast_ms:>9.1f}x  {'✅' if match else '❌'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DuckDB vs pandas query engine benchmark")
+    parser.add_argument("--rows", type=int, default=250_000, help="Synthetic crop rows")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per query")
+    args = parser.parse_args()
+
+    if not DUCKDB_AVAILABLE:
+        print("❌ duckdb is not installed (pip install duckdb)")
+        sys.exit(1)
+
+    crop_df, rainfall_df = sample_frames()
+    run("SAMPLE DATA", crop_df, rainfall_df, sample_cases(crop_df, rainfall_df), args.repeat)
+
+    crop_df, rainfall_df = make_frames(args.rows)
+    run("FULL-SIZE SYNTHETIC DATA", crop_df, rainfall_df, CASES, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Check the vectorized rainfall statistics against plain NumPy/pandas.
+
+Correlation (services/correlation.py): on synthetic crop and rainfall
+series with a planted rainfall effect, every per-series Pearson r, Spearman
+rho, lag-1 Pearson r and elasticity must match np.corrcoef / pandas
+rank().corr() / np.polyfit on that one series, including series with gaps.
+
+Trends (services/rainfall_trends.py): on a synthetic 1901-2015 subdivision
+x month matrix, the annual and monsoon slopes must match np.polyfit, a
+planted trend must be flagged with an interval that covers it, a planted
+level shift must be found near its year, a flat series must not be
+flagged, and the summary must only describe the requested subdivisions.
+
+Usage:
+    python test/check_rainfall_statistics.py --series 7920
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add src to path
+src_path = Path(__file__).parent.parent / 'src'
+sys.path.insert(0, str(src_path))
+
+from services.correlation import RainfallCorrelation
+from services.rainfall_trends import RainfallTrends
+from services.result_shaper import MONTH_COLUMNS
+
+failures = []
+
+
+def check(label, ok, detail=""):
+    print(f"{'✅' if ok else '❌'} {label}" + (f"  ({detail})" if detail else ""))
+    if not ok:
+        failures.append(label)
+
+
+def correlation_frames(states, crops, seed=0):
+    """Crop cells whose production partly follows the state's rainfall, with random gaps"""
+    rng = np.random.default_rng(seed)
+    years = np.arange(1997, 2015)
+    rainfall = pd.DataFrame(
+        [(f"state {s}", year, 800 + rng.random() * 2000) for s in range(states) for year in range(1990, 2015)],
+        columns=['state', 'Year', 'Annual_Rainfall']
+    )
+    rain = rainfall.set_index(['state', 'Year'])['Annual_Rainfall']
+
+    rows = []
+    for s in range(states):
+        for c in range(crops):
+            effect = rng.normal(0, 2)
+            for year in years:
+                if rng.random() < 0.1:
+                    continue  # Missing year
+                area = 100 + rng.random() * 900
+                production = max(1.0, 5000 + effect * rain[(f"state {s}", year)] + rng.normal(0, 1500))
+                rows.append((f"state {s}", f"State {s}", f"Crop {c}", year, production, area))
+    crop = pd.DataFrame(rows, columns=['state', 'State_Name', 'Crop', 'Year', 'Production', 'Area'])
+    return crop, rainfall
+
+
+def reference_row(crop, rainfall, state_name, crop_name, metric):
+    """Statistics of one series computed the plain way"""
+    series = crop[(crop['State_Name'] == state_name) & (crop['Crop'] == crop_name)].set_index('Year')
+    output = series['Production'] if metric == 'Production' else series['Production'] / series['Area']
+    rain = rainfall[rainfall['state'] == series['state'].iloc[0]].set_index('Year')['Annual_Rainfall']
+    joined = pd.DataFrame({'out': output, 'rain': rain.reindex(output.index)}).dropna()
+    lagged = pd.DataFrame({'out': output, 'rain': rain.reindex(output.index - 1).to_numpy()},
+                          index=output.index).dropna()
+    return {
+        'Years': len(joined),
+        'Pearson': np.corrcoef(joined['out'], joined['rain'])[0, 1],
+        'Spearman': joined['out'].rank().corr(joined['rain'].rank()),
+        'Lag1_Pearson': np.corrcoef(lagged['out'], lagged['rain'])[0, 1],
+        'Elasticity': np.polyfit(np.log(joined['rain']), np.log(joined['out']), 1)[0]
+    }
+
+
+def check_correlation(series):
+    print("\n" + "=" * 60)
+    print("RAINFALL CORRELATION")
+    print("=" * 60)
+
+    states = 33
+    crop, rainfall = correlation_frames(states, max(1, series // states))
+    engine = RainfallCorrelation(lags=(1,))
+    start = time.perf_counter()
+    table, summary = engine.compute(crop, rainfall, 'Annual_Rainfall')
+    elapsed = time.perf_counter() - start
+    print(f"{len(table)} rows from {crop.groupby(['state', 'Crop']).ngroups} series in {elapsed * 1000:.0f} ms")
+
+    sample = table.sample(min(200, len(table)), random_state=0)
+    worst = {column: 0.0 for column in ('Pearson', 'Spearman', 'Lag1_Pearson', 'Elasticity')}
+    years_match = True
+    for row in sample.itertuples(index=False):
+        expected = reference_row(crop, rainfall, row.State, row.Crop, row.Metric)
+        years_match &= expected['Years'] == row.Years
+        for column in worst:
+            worst[column] = max(worst[column], abs(expected[column] - getattr(row, column)))
+
+    check("Years per series match", years_match)
+    for column, error in worst.items():
+        check(f"{column} matches the single-series value", error < 1e-9, f"max abs error {error:.1e}")
+
+    inside = ((table['Pearson_CI_Low'] <= table['Pearson']) & (table['Pearson'] <= table['Pearson_CI_High'])).all()
+    check("Pearson lies inside its Fisher-z interval", inside)
+    check("Strongest series first", table['Pearson'].abs().is_monotonic_decreasing)
+    check("Planted rainfall effect shows in the pooled correlation",
+          abs(summary['Production']['pooled_pearson']) > 0.1,
+          f"pooled r {summary['Production']['pooled_pearson']:.3f}")
+
+
+def trend_frame(subdivisions, seed=0):
+    """Monthly rainfall 1901-2015: subdivision 0 trends, 1 shifts in 1960, the rest are flat noise"""
+    rng = np.random.default_rng(seed)
+    years = np.arange(1901, 2016)
+    base = np.array([20, 25, 30, 40, 80, 200, 300, 280, 200, 90, 40, 20], dtype=float)
+    rows = []
+    for s in range(subdivisions):
+        for year in years:
+            months = base * (1 + rng.normal(0, 0.25, 12))
+            if s == 0:
+                months[5:9] += (year - 1901) * 2.0 / 4  # +2 mm/year spread over June-September
+            if s == 1 and year >= 1960:
+                months[5:9] += 100.0  # +400 mm/year from 1960
+            rows.append((f"SUBDIVISION {s}", year, *months))
+    df = pd.DataFrame(rows, columns=['subdivision', 'year', *MONTH_COLUMNS])
+    df['annual'] = df[MONTH_COLUMNS].sum(axis=1)
+    return df
+
+
+def check_trends(subdivisions):
+    print("\n" + "=" * 60)
+    print("HISTORICAL RAINFALL TRENDS")
+    print("=" * 60)
+
+    df = trend_frame(subdivisions)
+    engine = RainfallTrends()
+    start = time.perf_counter()
+    table, summary = engine.analyze(df, ['SUBDIVISION 0', 'SUBDIVISION 1', 'SUBDIVISION 2'])
+    elapsed = time.perf_counter() - start
+    print(f"{df['subdivision'].nunique()} subdivisions analyzed in {elapsed * 1000:.1f} ms")
+    rows = table.set_index('Subdivision')
+
+    worst_annual = worst_monsoon = 0.0
+    for name, group in df.groupby('subdivision'):
+        if name not in rows.index:
+            continue
+        annual = np.polyfit(group['year'], group[MONTH_COLUMNS].sum(axis=1), 1)[0] * 10
+        monsoon = np.polyfit(group['year'], group[MONTH_COLUMNS[5:9]].sum(axis=1), 1)[0] * 10
+        worst_annual = max(worst_annual, abs(annual - rows.loc[name, 'Annual_Slope_mm_per_decade']))
+        worst_monsoon = max(worst_monsoon, abs(monsoon - rows.loc[name, 'Monsoon_Slope_mm_per_decade']))
+    check("Annual slope matches np.polyfit", worst_annual < 1e-8, f"max abs error {worst_annual:.1e}")
+    check("Monsoon slope matches np.polyfit", worst_monsoon < 1e-8, f"max abs error {worst_monsoon:.1e}")
+
+    trend = rows.loc['SUBDIVISION 0']
+    check("Planted +20 mm/decade trend is flagged rising", trend['Annual_Trend'] == 'rising',
+          f"slope {trend['Annual_Slope_mm_per_decade']:.1f}")
+    check("Its 95% interval covers the planted slope",
+          trend['Annual_Slope_CI_Low'] <= 20 <= trend['Annual_Slope_CI_High'],
+          f"[{trend['Annual_Slope_CI_Low']:.1f}, {trend['Annual_Slope_CI_High']:.1f}]")
+
+    shift = rows.loc['SUBDIVISION 1']
+    found = shift['Change_Point_Year'] is not None and abs(int(shift['Change_Point_Year']) - 1960) <= 2
+    check("Planted 1960 level shift is found", found, f"change point {shift['Change_Point_Year']}")
+    if found:
+        jump = shift['Mean_After_Change_mm'] - shift['Mean_Before_Change_mm']
+        check("Shift size is close to the planted +400 mm", abs(jump - 400) < 60, f"{jump:.0f} mm")
+
+    flat = rows.loc['SUBDIVISION 2']
+    check("Flat series has no trend and no change point",
+          flat['Annual_Trend'] == 'none' and flat['Change_Point_Year'] is None)
+
+    decades = summary.get('decadal_means_mm', {}).get('SUBDIVISION 0', {})
+    check("Decadal means run from 1901-1910 to 2011-2015",
+          '1901-1910' in decades and '2011-2015' in decades, f"{len(decades)} entries")
+
+    table, summary = engine.analyze(df, ['SUBDIVISION 0'])
+    check("Summary follows the subdivision filter",
+          summary['subdivisions'] == 1
+          and summary['median_annual_slope_mm_per_decade'] == round(table['Annual_Slope_mm_per_decade'][0], 2)
+          and summary['annual_trend_counts'] == {'rising': 1},
+          f"median slope {summary['median_annual_slope_mm_per_decade']}")
+    table, summary = engine.analyze(df, ['PUNJAB'])
+    check("No matching subdivision gives an empty table and no summary", table.empty and summary is None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Correlation and trend statistics checks")
+    parser.add_argument("--series", type=int, default=7920, help="Synthetic (state, crop) series")
+    parser.add_argument("--subdivisions", type=int, default=36, help="Synthetic rainfall subdivisions")
+    args = parser.parse_args()
+
+    check_correlation(args.series)
+    check_trends(args.subdivisions)
+
+    print("\n" + ("❌ " + ", ".join(failures) if failures else "✅ All checks passed"))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()